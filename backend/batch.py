@@ -0,0 +1,136 @@
+import asyncio
+import json
+import logging
+import os
+from typing import Any, List, Optional
+from urllib.parse import urlsplit
+
+from starlette.exceptions import HTTPException
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", "20"))
+CONCURRENCY = int(os.environ.get("BATCH_CONCURRENCY", "6"))
+
+# Streaming endpoints never finish (or are too large) to be buffered into a
+# batch response, and a batch must not contain another batch
+EXCLUDED_PREFIXES = ("/batch", "/stream/", "/me/export", "/me/import")
+
+# Only these request headers are passed on to sub-requests
+_FORWARDED_HEADERS = (b"authorization", b"accept-language", b"user-agent", b"x-forwarded-for")
+
+BATCH_SUBREQUESTS = metrics.registry.register(metrics.Counter(
+    "api_batch_subrequests_total", "Sub-requests executed through /api/batch.", ("method", "status"),
+))
+
+
+class SubResponse:
+    __slots__ = ("status", "headers", "chunks")
+
+    def __init__(self):
+        self.status = 500
+        self.headers = []
+        self.chunks: List[bytes] = []
+
+    def body(self) -> Any:
+        raw = b"".join(self.chunks)
+        if not raw:
+            return None
+        content_type = next((v for k, v in self.headers if k.lower() == b"content-type"), b"")
+        if content_type.startswith(b"application/json"):
+            return json.loads(raw)
+        return raw.decode("utf-8", errors="replace")
+
+
+def validate_path(path: str) -> Optional[str]:
+    """Return why ``path`` cannot be batched, or None if it can."""
+    if not path.startswith("/") or path.startswith("//"):
+        return "path must be relative to /api and start with '/'"
+    if urlsplit(path).path.startswith(EXCLUDED_PREFIXES):
+        return "this endpoint cannot be batched"
+    return None
+
+
+class BatchExecutor:
+    """Runs sub-requests in-process against an ASGI router.
+
+    Each sub-request gets a scope derived from the outer one (client,
+    forwarded headers, the app's exception handlers) plus ``extra_state``,
+    which is how the outer request's authentication is handed down so it
+    is not repeated per call. Bodies are collected in memory.
+    """
+
+    def __init__(self, router, prefix: str = "/api", concurrency: int = CONCURRENCY):
+        self.router = router
+        self.prefix = prefix
+        self.concurrency = concurrency
+
+    async def run(self, outer_scope: dict, requests: List[dict], extra_state: dict) -> List[SubResponse]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(request: dict) -> SubResponse:
+            async with semaphore:
+                return await self._call(outer_scope, request, extra_state)
+
+        return await asyncio.gather(*(bounded(r) for r in requests))
+
+    def _scope(self, outer_scope: dict, method: str, path: str, body: bytes, extra_state: dict) -> dict:
+        url = urlsplit(path)
+        headers = [(k, v) for k, v in outer_scope.get("headers", []) if k in _FORWARDED_HEADERS]
+        if body:
+            headers += [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        full_path = self.prefix + url.path
+        scope = {
+            key: outer_scope[key]
+            for key in ("type", "asgi", "http_version", "scheme", "server", "client", "app", "starlette.exception_handlers")
+            if key in outer_scope
+        }
+        scope.update({
+            "method": method,
+            "path": full_path,
+            "raw_path": full_path.encode(),
+            "root_path": outer_scope.get("root_path", ""),
+            "query_string": url.query.encode(),
+            "headers": headers,
+            "state": {**outer_scope.get("state", {}), **extra_state},
+        })
+        return scope
+
+    async def _call(self, outer_scope: dict, request: dict, extra_state: dict) -> SubResponse:
+        method = request["method"]
+        body = json.dumps(request["body"]).encode() if request.get("body") is not None else b""
+        scope = self._scope(outer_scope, method, request["path"], body, extra_state)
+        response = SubResponse()
+        body_sent = False
+
+        async def receive():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            # Nothing else will arrive; only reached by handlers watching for disconnects
+            await asyncio.Event().wait()
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response.status = message["status"]
+                response.headers = message.get("headers", [])
+            elif message["type"] == "http.response.body":
+                response.chunks.append(message.get("body", b""))
+
+        try:
+            await self.router(scope, receive, send)
+        except HTTPException as e:
+            # Raised outside a route (no match, wrong method)
+            response.status = e.status_code
+            response.headers = [(b"content-type", b"application/json")]
+            response.chunks = [json.dumps({"detail": e.detail}).encode()]
+        except Exception:
+            logger.exception("Batch sub-request %s %s failed", method, request["path"])
+            response.status = 500
+            response.headers = [(b"content-type", b"application/json")]
+            response.chunks = [b'{"detail": "Internal Server Error"}']
+        BATCH_SUBREQUESTS.inc(method=method, status=response.status)
+        return response
@@ -0,0 +1,42 @@
+"""Reproducible load test and benchmark suite for the backend API.
+
+Seeds a synthetic dataset (users, follows, projects, blogs, comments,
+reactions, bookmarks), drives a weighted mix of the main routes with N
+concurrent SSE listeners open, and reports throughput, p50/p95/p99 latency
+and MongoDB commands per request (read from ``/metrics``).
+
+Run from the ``backend`` directory::
+
+    pip install -r bench/requirements.txt
+
+    # against a real MongoDB (MONGO_URL), server started in-process
+    python -m bench --users 500 --duration 60 --save-baseline main
+
+    # later, fail if any route's p95 got more than 20% slower
+    python -m bench --users 500 --duration 60 --compare main
+
+    # quick smoke run with an in-memory stand-in for MongoDB
+    python -m bench --mongo memory --users 50 --duration 10
+
+Compression CPU cost vs bytes saved is measured separately, without a
+server or database::
+
+    python -m bench.compression
+
+and ``/uploads`` serving against Starlette's ``StaticFiles`` with::
+
+    python -m bench.uploads
+
+SSE vs WebSocket bytes and CPU per real-time event with::
+
+    python -m bench.realtime
+
+The seeded database (``--db-name``, default ``KudosDevBench``) is wiped on
+every run. Numbers from ``--mongo memory`` only compare with other memory
+runs: mongomock is synchronous and reports no command events. It also has
+no ``$lookup`` with a pipeline, so memory runs skip the followers and
+bookmarks routes.
+
+``bench/baselines/memory.json`` is a committed smoke baseline from the
+memory command above; save ``main`` on the machine that runs ``--compare``.
+"""
@@ -0,0 +1,154 @@
+"""Command line entry point: ``python -m bench`` from the backend directory."""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import socket
+import sys
+from dataclasses import asdict
+
+from bench.dataset import DatasetConfig
+from bench.load import RunConfig
+
+
+def _parse_args(argv=None):
+    p = argparse.ArgumentParser(prog="python -m bench", description=__doc__)
+    target = p.add_argument_group("target")
+    target.add_argument("--url", help="benchmark an already running server (e.g. http://localhost:8000); "
+                                      "it must use the same --db-name")
+    target.add_argument("--mongo", choices=["env", "memory"], default="env",
+                        help="'env' uses MONGO_URL; 'memory' uses an in-process mongomock stand-in")
+    target.add_argument("--db-name", default="KudosDevBench",
+                        help="database to seed; must contain 'bench' because it is wiped")
+    target.add_argument("--no-seed", action="store_true", help="reuse the data from a previous run")
+
+    data = p.add_argument_group("dataset")
+    for name, default in asdict(DatasetConfig()).items():
+        data.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, dest=f"data_{name}")
+
+    run = p.add_argument_group("load")
+    run.add_argument("--concurrency", type=int, default=RunConfig.concurrency)
+    run.add_argument("--duration", type=float, default=RunConfig.duration)
+    run.add_argument("--warmup", type=float, default=RunConfig.warmup)
+    run.add_argument("--sse-clients", type=int, default=RunConfig.sse_clients,
+                     help="all connect from one IP; with --url the server's SSE_MAX_PER_IP must allow them")
+
+    out = p.add_argument_group("output")
+    out.add_argument("--output", help="write the JSON summary to this path")
+    out.add_argument("--save-baseline", metavar="NAME", help="save the summary as bench/baselines/NAME.json")
+    out.add_argument("--compare", metavar="NAME", help="compare against bench/baselines/NAME.json")
+    out.add_argument("--max-regression", type=float, default=0.2,
+                     help="p95 increase (fraction) that fails --compare (default 0.2)")
+    return p.parse_args(argv)
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _main(args) -> int:
+    if "bench" not in args.db_name.lower():
+        print(f"Refusing to wipe database {args.db_name!r}: its name must contain 'bench'", file=sys.stderr)
+        return 2
+    # Must be set before the backend modules read their configuration
+    os.environ["DB_NAME"] = args.db_name
+    # Every SSE listener comes from 127.0.0.1; lift the per-IP cap to fit them
+    os.environ.setdefault("SSE_MAX_PER_IP", str(max(args.sse_clients, 10)))
+
+    import database
+    if args.mongo == "memory":
+        from mongomock_motor import AsyncMongoMockClient
+        database.client = AsyncMongoMockClient()
+        database.db = database.client[args.db_name]
+        database.listing_db = database.db
+
+    from bench.dataset import seed
+    from bench.load import run_load
+    from bench.report import compare, format_table, load_baseline, save_baseline, summarize
+
+    data_config = DatasetConfig(**{
+        k[len("data_"):]: v for k, v in vars(args).items() if k.startswith("data_")
+    })
+    if args.no_seed:
+        from bench.dataset import Fixture
+        fixture = Fixture()
+        fixture.usernames = await database.db.users.distinct("username")
+        fixture.emails = await database.db.users.distinct("email")
+        published = await database.db.blogs.find(
+            {"status": "published"}, {"_id": 0, "blog_id": 1, "slug": 1}
+        ).to_list(None)
+        fixture.blog_ids = [b["blog_id"] for b in published]
+        fixture.slugs = [b["slug"] for b in published]
+        fixture.project_ids = await database.db.projects.distinct("project_id")
+    else:
+        print(f"Seeding {args.db_name} ({args.mongo}) with {data_config}", file=sys.stderr)
+        fixture = await seed(database.db, data_config)
+
+    server = server_task = None
+    base_url = args.url
+    if base_url is None:
+        import uvicorn
+        import server as backend
+
+        port = _free_port()
+        # mongomock has no change streams, so skip the lifespan watchers in memory mode
+        config = uvicorn.Config(
+            backend.app, host="127.0.0.1", port=port, log_level="warning",
+            lifespan="off" if args.mongo == "memory" else "on",
+        )
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        base_url = f"http://127.0.0.1:{port}"
+
+    run_config = RunConfig(
+        concurrency=args.concurrency,
+        duration=args.duration,
+        warmup=args.warmup,
+        sse_clients=args.sse_clients,
+        seed=data_config.seed,
+        in_memory=args.mongo == "memory",
+    )
+    print(f"Driving {base_url} with {run_config}", file=sys.stderr)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        result = await run_load(base_url, fixture, run_config)
+    finally:
+        if server is not None:
+            server.should_exit = True
+            await server_task
+
+    if args.mongo == "memory":
+        result.mongo_ops.clear()  # mongomock emits no command events
+    summary = summarize(result, {
+        "dataset": asdict(data_config),
+        "run": asdict(run_config),
+        "mongo": args.mongo,
+        "in_process": args.url is None,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+    })
+    print(format_table(summary))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(summary, f, indent=2)
+    if args.save_baseline:
+        print(f"Saved baseline to {save_baseline(summary, args.save_baseline)}", file=sys.stderr)
+    if args.compare:
+        text, regressed = compare(summary, load_baseline(args.compare), args.max_regression)
+        print()
+        print(text)
+        if regressed:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(_main(_parse_args())))
@@ -0,0 +1,171 @@
+"""CPU cost vs bytes saved for response compression.
+
+Run from the ``backend`` directory::
+
+    python -m bench.compression
+    python -m bench.compression --blogs 50 --paragraphs 20 --output compression.json
+
+Builds representative payloads (a blog list page with full Markdown and
+rendered HTML, a project list, a stream of SSE frames) and times each
+encoder setting on them, plus a compressed-body cache hit. SSE frames are
+compressed one event at a time with a flush, the way the middleware sends
+them, so the per-event framing overhead shows up in the ratio.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List
+
+import compression
+from bench.dataset import _markdown, _sentence, _uuid
+from rendering import render_markdown
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def _payloads(args) -> Dict[str, bytes]:
+    rng = random.Random(args.seed)
+    blogs = []
+    for i in range(args.blogs):
+        content = _markdown(rng, args.paragraphs)
+        blog = {
+            "blog_id": _uuid(rng),
+            "slug": f"bench-{i}",
+            "title": _sentence(rng, 5),
+            "content_markdown": content,
+            "author_username": f"bench{i:05d}",
+            "tags": ["python", "performance"],
+            "view_count": rng.randint(0, 5000),
+        }
+        blog.update(render_markdown(content))
+        blogs.append(blog)
+    projects = [
+        {
+            "project_id": _uuid(rng),
+            "title": _sentence(rng, 3),
+            "description": " ".join(_sentence(rng, 15) for _ in range(3)),
+            "tech_stack": ["React", "FastAPI", "MongoDB"],
+        }
+        for _ in range(args.blogs)
+    ]
+    return {
+        "blog_list": json.dumps(blogs).encode(),
+        "project_list": json.dumps(projects).encode(),
+        "small_json": json.dumps(projects[:1]).encode(),
+    }
+
+
+def _sse_frames(args) -> List[bytes]:
+    rng = random.Random(args.seed + 1)
+    frames = []
+    for _ in range(args.events):
+        data = {"comment_id": _uuid(rng), "content": _sentence(rng, 15), "author_username": "bench00001"}
+        frames.append(f"event: comment:new\ndata: {json.dumps(data)}\n\n".encode())
+    return frames
+
+
+def _encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    encoders = {}
+    for level in (1, 6, 9):
+        def gzip(body, level=level):
+            c = zlib.compressobj(level, zlib.DEFLATED, 31)
+            return c.compress(body) + c.flush()
+        encoders[f"gzip-{level}"] = gzip
+    if brotli is not None:
+        for quality in (1, 4, 6, 11):
+            encoders[f"br-{quality}"] = lambda body, quality=quality: brotli.compress(body, quality=quality)
+    return encoders
+
+
+def _time(fn: Callable[[], object], min_seconds: float) -> float:
+    """Mean seconds per call over at least ``min_seconds`` of repetitions."""
+    runs = 0
+    start = time.perf_counter()
+    while True:
+        fn()
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / runs
+
+
+def run(args) -> List[dict]:
+    rows = []
+    for name, body in _payloads(args).items():
+        for label, encode in _encoders().items():
+            out = encode(body)
+            seconds = _time(lambda: encode(body), args.min_time)
+            rows.append(_row(name, label, len(body), len(out), seconds))
+        key = compression.body_cache.key(body, "gzip")
+        compression.body_cache.put(key, compression.compress(body, "gzip"))
+        seconds = _time(
+            lambda: compression.body_cache.get(compression.body_cache.key(body, "gzip")), args.min_time
+        )
+        rows.append(_row(name, "cache-hit", len(body), len(compression.body_cache.get(key)), seconds))
+
+    frames = _sse_frames(args)
+    raw = sum(len(f) for f in frames)
+    for encoding in compression.available_encodings():
+        def stream(encoding=encoding):
+            c = compression.StreamCompressor(encoding)
+            return sum(len(c.compress(f, flush=True)) for f in frames)
+        out = stream()
+        seconds = _time(stream, args.min_time)
+        rows.append(_row(f"sse_{args.events}_events", f"stream-{encoding}", raw, out, seconds))
+    return rows
+
+
+def _row(payload: str, encoder: str, size_in: int, size_out: int, seconds: float) -> dict:
+    return {
+        "payload": payload,
+        "encoder": encoder,
+        "bytes_in": size_in,
+        "bytes_out": size_out,
+        "ratio": round(size_in / max(size_out, 1), 2),
+        "saved_pct": round(100 * (1 - size_out / size_in), 1),
+        "us_per_op": round(seconds * 1e6, 1),
+        "mb_per_s": round(size_in / seconds / 1e6, 1),
+    }
+
+
+def format_table(rows: List[dict]) -> str:
+    header = (
+        f"{'payload':<18} {'encoder':<14} {'in':>9} {'out':>9} {'ratio':>7} "
+        f"{'saved':>7} {'us/op':>10} {'MB/s':>8}"
+    )
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['payload']:<18} {r['encoder']:<14} {r['bytes_in']:>9} {r['bytes_out']:>9} "
+            f"{r['ratio']:>7} {r['saved_pct']:>6}% {r['us_per_op']:>10} {r['mb_per_s']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.compression", description=__doc__)
+    p.add_argument("--blogs", type=int, default=20, help="items per list payload (default 20, one page)")
+    p.add_argument("--paragraphs", type=int, default=12)
+    p.add_argument("--events", type=int, default=100, help="SSE frames in the stream payload")
+    p.add_argument("--min-time", type=float, default=0.3, help="seconds to time each case for")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--output", help="write the rows as JSON to this path")
+    args = p.parse_args(argv)
+
+    rows = run(args)
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
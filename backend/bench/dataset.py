@@ -0,0 +1,231 @@
+"""Synthetic dataset seeding for the benchmark suite."""
+
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timezone, timedelta
+from typing import List
+
+import bcrypt
+
+from rendering import render_markdown
+
+BENCH_PASSWORD = "benchpass"
+
+_WORDS = (
+    "async api cache cluster deploy docker fastapi graph index latency mongo "
+    "pipeline python query react render rust schema shard stream tailwind "
+    "test thread token typescript vector worker"
+).split()
+_TAGS = ["python", "react", "devops", "databases", "performance", "rust", "ai", "web"]
+_CATEGORIES = ["devlog", "tutorial", "case-study", "opinion"]
+_PROJECT_CATEGORIES = ["Web App", "CLI", "Library", "Mobile", "Data"]
+_TECH = ["React", "FastAPI", "MongoDB", "Node.js", "Rust", "Docker", "Redis", "Go"]
+_REACTIONS = ["fire", "rocket", "bulb", "clap", "heart"]
+
+
+@dataclass
+class DatasetConfig:
+    users: int = 200
+    follows_per_user: int = 20
+    projects_per_user: int = 3
+    blogs_per_user: int = 4
+    comments_per_blog: int = 8
+    reactions_per_blog: int = 15
+    bookmarks_per_user: int = 10
+    paragraphs_per_blog: int = 12
+    seed: int = 42
+
+
+@dataclass
+class Fixture:
+    """Keys of the seeded documents, used to build request paths."""
+
+    usernames: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    blog_ids: List[str] = field(default_factory=list)
+    slugs: List[str] = field(default_factory=list)
+    project_ids: List[str] = field(default_factory=list)
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(_WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _markdown(rng: random.Random, paragraphs: int) -> str:
+    parts = []
+    for i in range(paragraphs):
+        if i % 4 == 0:
+            parts.append(f"## {_sentence(rng, 4)[:-1]}")
+        if i % 5 == 3:
+            parts.append("```python\nasync def handler():\n    return await db.blogs.find_one()\n```")
+        parts.append(" ".join(_sentence(rng, rng.randint(8, 20)) for _ in range(4)))
+    return "\n\n".join(parts)
+
+
+async def seed(db, config: DatasetConfig) -> Fixture:
+    """Drop the benchmark collections and fill them with a reproducible dataset."""
+    rng = random.Random(config.seed)
+    fixture = Fixture()
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def stamp(minutes: int) -> str:
+        return (start + timedelta(minutes=minutes)).isoformat()
+
+    for name in ("users", "follows", "projects", "blogs", "comments", "reactions", "bookmarks"):
+        await db[name].delete_many({})
+
+    # One bcrypt hash shared by every user keeps seeding fast
+    password = bcrypt.hashpw(BENCH_PASSWORD.encode("utf-8"), bcrypt.gensalt()).decode("utf-8")
+    users = []
+    for i in range(config.users):
+        username = f"bench{i:05d}"
+        users.append({
+            "email": f"{username}@bench.example.com",
+            "password": password,
+            "full_name": f"Bench User {i}",
+            "username": username,
+            "bio": _sentence(rng, 12),
+            "avatar_url": None,
+            "github_url": None,
+            "linkedin_url": None,
+            "website_url": None,
+            "location": None,
+            "skills": rng.sample(_TECH, 3),
+            "follower_count": 0,
+            "following_count": 0,
+            "created_at": stamp(i),
+        })
+    fixture.usernames = [u["username"] for u in users]
+    fixture.emails = [u["email"] for u in users]
+
+    follows = []
+    for i, user in enumerate(users):
+        k = min(config.follows_per_user, len(users) - 1)
+        for j in rng.sample(range(len(users) - 1), k):
+            target = users[j if j < i else j + 1]  # skip self
+            follows.append({
+                "follower_email": user["email"],
+                "follower_username": user["username"],
+                "following_email": target["email"],
+                "following_username": target["username"],
+                "created_at": stamp(len(follows)),
+            })
+            user["following_count"] += 1
+            target["follower_count"] += 1
+
+    projects = []
+    blogs = []
+    for user in users:
+        for _ in range(config.projects_per_user):
+            now = stamp(len(projects))
+            projects.append({
+                "project_id": _uuid(rng),
+                "user_email": user["email"],
+                "user_username": user["username"],
+                "user_full_name": user["full_name"],
+                "title": _sentence(rng, 3)[:-1],
+                "description": " ".join(_sentence(rng, 15) for _ in range(3)),
+                "tech_stack": rng.sample(_TECH, 3),
+                "category": rng.choice(_PROJECT_CATEGORIES),
+                "status": rng.choice(["in_progress", "completed"]),
+                "thumbnail_url": None,
+                "live_url": None,
+                "github_url": None,
+                "media_urls": [],
+                "created_at": now,
+                "updated_at": now,
+            })
+        for _ in range(config.blogs_per_user):
+            now = stamp(len(blogs))
+            blog_id = _uuid(rng)
+            content = _markdown(rng, config.paragraphs_per_blog)
+            blog = {
+                "blog_id": blog_id,
+                "slug": f"bench-{blog_id[:8]}",
+                "title": _sentence(rng, 5)[:-1],
+                "subtitle": _sentence(rng, 8),
+                "content_markdown": content,
+                "cover_image_url": None,
+                "author_email": user["email"],
+                "author_username": user["username"],
+                "author_full_name": user["full_name"],
+                "tags": rng.sample(_TAGS, 3),
+                "category": rng.choice(_CATEGORIES),
+                "tech_stack": rng.sample(_TECH, 2),
+                "linked_project_id": None,
+                "seo_title": None,
+                "seo_description": None,
+                "status": "published" if rng.random() < 0.85 else "draft",
+                "view_count": rng.randint(0, 5000),
+                "comment_count": 0,
+                "reaction_count": 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            blog.update(render_markdown(content))
+            blog["published_at"] = now if blog["status"] == "published" else None
+            blogs.append(blog)
+
+    comments = []
+    reactions = []
+    for blog in blogs:
+        for _ in range(config.comments_per_blog):
+            author = rng.choice(users)
+            comments.append({
+                "comment_id": _uuid(rng),
+                "blog_id": blog["blog_id"],
+                "parent_comment_id": None,
+                "author_email": author["email"],
+                "author_username": author["username"],
+                "author_full_name": author["full_name"],
+                "content": _sentence(rng, 15),
+                "upvotes": 0,
+                "created_at": stamp(len(comments)),
+            })
+            blog["comment_count"] += 1
+        seen = set()
+        for _ in range(config.reactions_per_blog):
+            user = rng.choice(users)
+            kind = rng.choice(_REACTIONS)
+            if (user["email"], kind) in seen:
+                continue
+            seen.add((user["email"], kind))
+            reactions.append({
+                "blog_id": blog["blog_id"],
+                "user_email": user["email"],
+                "type": kind,
+                "created_at": stamp(len(reactions)),
+            })
+            blog["reaction_count"] += 1
+
+    published = [b for b in blogs if b["status"] == "published"]
+    bookmarks = []
+    for user in users:
+        for blog in rng.sample(published, min(config.bookmarks_per_user, len(published))):
+            bookmarks.append({
+                "user_email": user["email"],
+                "blog_id": blog["blog_id"],
+                "created_at": stamp(len(bookmarks)),
+            })
+
+    for name, docs in (
+        ("users", users),
+        ("follows", follows),
+        ("projects", projects),
+        ("blogs", blogs),
+        ("comments", comments),
+        ("reactions", reactions),
+        ("bookmarks", bookmarks),
+    ):
+        if docs:
+            await db[name].insert_many(docs, ordered=False)
+
+    fixture.blog_ids = [b["blog_id"] for b in published]
+    fixture.slugs = [b["slug"] for b in published]
+    fixture.project_ids = [p["project_id"] for p in projects]
+    return fixture
@@ -0,0 +1,177 @@
+"""Load driver: weighted route mix over HTTP plus concurrent SSE listeners."""
+
+import asyncio
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from bench.dataset import BENCH_PASSWORD, Fixture
+
+
+@dataclass
+class Operation:
+    route: str  # route template, matches the label used in /metrics
+    method: str
+    path: Callable[[random.Random, Fixture], str]
+    weight: int
+    auth: bool = False
+    body: Optional[Callable[[random.Random], dict]] = None
+    lookup_pipeline: bool = False  # uses $lookup with a pipeline, which mongomock lacks
+
+
+SCENARIO: List[Operation] = [
+    Operation("/api/blogs", "GET", lambda r, f: "/api/blogs", 15),
+    Operation("/api/blogs/{slug}", "GET", lambda r, f: f"/api/blogs/{r.choice(f.slugs)}", 25),
+    Operation("/api/blogs/{blog_id}/comments", "GET",
+              lambda r, f: f"/api/blogs/{r.choice(f.blog_ids)}/comments", 10),
+    Operation("/api/blogs/{blog_id}/reactions", "GET",
+              lambda r, f: f"/api/blogs/{r.choice(f.blog_ids)}/reactions", 10),
+    Operation("/api/projects", "GET", lambda r, f: "/api/projects", 8),
+    Operation("/api/projects/{project_id}", "GET",
+              lambda r, f: f"/api/projects/{r.choice(f.project_ids)}", 8),
+    Operation("/api/developers", "GET", lambda r, f: "/api/developers", 5),
+    Operation("/api/users/{username}", "GET",
+              lambda r, f: f"/api/users/{r.choice(f.usernames)}", 6),
+    Operation("/api/users/{username}/followers", "GET",
+              lambda r, f: f"/api/users/{r.choice(f.usernames)}/followers", 5, lookup_pipeline=True),
+    Operation("/api/bookmarks", "GET", lambda r, f: "/api/bookmarks", 4, auth=True, lookup_pipeline=True),
+    Operation("/api/blogs/{blog_id}/reactions", "POST",
+              lambda r, f: f"/api/blogs/{r.choice(f.blog_ids)}/reactions", 4, auth=True,
+              body=lambda r: {"type": r.choice(["fire", "rocket", "bulb", "clap", "heart"])}),
+]
+
+
+@dataclass
+class RunConfig:
+    concurrency: int = 16
+    duration: float = 30.0
+    warmup: float = 3.0
+    sse_clients: int = 50
+    auth_users: int = 8
+    seed: int = 42
+    in_memory: bool = False  # drop the operations the mongomock stand-in cannot serve
+
+
+@dataclass
+class RunResult:
+    duration: float
+    latencies: Dict[str, List[float]] = field(default_factory=dict)  # "METHOD route" -> seconds
+    errors: Dict[str, int] = field(default_factory=dict)
+    mongo_ops: Dict[str, float] = field(default_factory=dict)  # mean commands per request
+    sse_connected: int = 0
+    sse_events: int = 0
+
+
+async def _login(client: httpx.AsyncClient, fixture: Fixture, n: int) -> List[dict]:
+    headers = []
+    for email in fixture.emails[:n]:
+        r = await client.post("/api/auth/login", json={"email": email, "password": BENCH_PASSWORD})
+        r.raise_for_status()
+        headers.append({"Authorization": f"Bearer {r.json()['access_token']}"})
+    return headers
+
+
+async def _sse_client(base_url: str, result: RunResult, stop: asyncio.Event):
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=None) as client:
+            async with client.stream("GET", "/api/stream/events") as response:
+                if response.status_code != 200:
+                    return
+                result.sse_connected += 1
+                async for line in response.aiter_lines():
+                    if line.startswith("event:"):
+                        result.sse_events += 1
+                    if stop.is_set():
+                        break
+    except (httpx.HTTPError, asyncio.CancelledError):
+        pass
+
+
+async def run_load(base_url: str, fixture: Fixture, config: RunConfig) -> RunResult:
+    """Drive the scenario for ``config.duration`` seconds after a warmup."""
+    ops = [op for op in SCENARIO if not (config.in_memory and op.lookup_pipeline)]
+    weights = [op.weight for op in ops]
+    result = RunResult(duration=config.duration)
+    stop = asyncio.Event()
+
+    limits = httpx.Limits(max_connections=config.concurrency * 2)
+    async with httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits) as client:
+        auth_headers = await _login(client, fixture, config.auth_users)
+
+        sse_tasks = [
+            asyncio.create_task(_sse_client(base_url, result, stop))
+            for _ in range(config.sse_clients)
+        ]
+
+        recording = False
+
+        async def worker(index: int):
+            rng = random.Random(config.seed * 1000 + index)
+            while not stop.is_set():
+                op = rng.choices(ops, weights)[0]
+                headers = rng.choice(auth_headers) if op.auth else None
+                body = op.body(rng) if op.body else None
+                key = f"{op.method} {op.route}"
+                start = time.perf_counter()
+                try:
+                    r = await client.request(
+                        op.method, op.path(rng, fixture), headers=headers, json=body
+                    )
+                    failed = r.status_code >= 400
+                except httpx.HTTPError:
+                    failed = True
+                elapsed = time.perf_counter() - start
+                if not recording:
+                    continue
+                if failed:
+                    result.errors[key] = result.errors.get(key, 0) + 1
+                else:
+                    result.latencies.setdefault(key, []).append(elapsed)
+
+        workers = [asyncio.create_task(worker(i)) for i in range(config.concurrency)]
+        await asyncio.sleep(config.warmup)
+        before = await scrape_mongo_counts(client)
+        recording = True
+        started = time.perf_counter()
+        await asyncio.sleep(config.duration)
+        stop.set()
+        await asyncio.gather(*workers)
+        result.duration = time.perf_counter() - started
+        after = await scrape_mongo_counts(client)
+
+        for key, (commands, requests) in after.items():
+            prev_commands, prev_requests = before.get(key, (0.0, 0.0))
+            if requests > prev_requests:
+                result.mongo_ops[key] = (commands - prev_commands) / (requests - prev_requests)
+
+        for task in sse_tasks:
+            task.cancel()
+        await asyncio.gather(*sse_tasks, return_exceptions=True)
+
+    return result
+
+
+async def scrape_mongo_counts(client: httpx.AsyncClient) -> Dict[str, List[float]]:
+    """Read per-route ``[commands_sum, request_count]`` from the /metrics endpoint."""
+    text = (await client.get("/metrics")).text
+    counts: Dict[str, List[float]] = {}
+    for line in text.splitlines():
+        if not line.startswith("http_request_mongo_commands_"):
+            continue
+        name, _, value = line.rpartition(" ")
+        metric, _, labels = name.partition("{")
+        fields = dict(
+            part.split("=", 1) for part in labels.rstrip("}").split(",") if "=" in part
+        )
+        method = fields.get("method", "").strip('"')
+        route = fields.get("route", "").strip('"')
+        key = f"{method} {route}"
+        slot = counts.setdefault(key, [0.0, 0.0])
+        if metric.endswith("_sum"):
+            slot[0] = float(value)
+        elif metric.endswith("_count"):
+            slot[1] = float(value)
+    return counts
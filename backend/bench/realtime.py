@@ -0,0 +1,190 @@
+"""Bytes and CPU per event: SSE frames vs the MessagePack WebSocket stream.
+
+Run from the ``backend`` directory::
+
+    python -m bench.realtime
+    python -m bench.realtime --events 2000 --output realtime.json
+
+Builds a representative event mix (comments, project updates, full blog
+documents) and encodes it the way each transport sends it to one client:
+
+- ``sse``: JSON text frames plus HTTP/1.1 chunk framing, as written by
+  ``/api/stream/events``; ``sse+gzip`` and friends add the streaming
+  compressor used when ``COMPRESSION_SSE`` is on.
+- ``ws-json``: the same JSON as WebSocket text messages, for reference.
+- ``ws-msgpack``: ``/api/stream/ws`` messages from one connection's
+  ``FieldDictionary``; ``+deflate`` adds permessage-deflate with context
+  takeover, as negotiated with browsers.
+
+Sizes include transport framing. CPU is encoding (and compression) time
+per event for one connection. SSE encodes each event once for all
+clients, while the WebSocket stream encodes per connection, so compare
+``us_per_event`` against the fan-out being planned for.
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List
+
+import compression
+import ws_stream
+from bench.dataset import _markdown, _sentence, _uuid
+from rendering import render_markdown
+
+
+def _events(args) -> List[dict]:
+    rng = random.Random(args.seed)
+    users = [f"bench{i:05d}" for i in range(50)]
+    events = []
+    for _ in range(args.events):
+        roll = rng.random()
+        author = rng.choice(users)
+        now = "2025-01-01T00:00:00+00:00"
+        if roll < 0.7:
+            events.append({"type": "comment:new", "data": {
+                "comment_id": _uuid(rng), "blog_id": _uuid(rng), "parent_id": None,
+                "content": _sentence(rng, rng.randint(5, 30)),
+                "author_email": f"{author}@bench.local", "author_username": author,
+                "author_full_name": author.title(), "created_at": now, "updated_at": now,
+                "is_deleted": False, "reply_count": 0,
+            }})
+        elif roll < 0.9:
+            events.append({"type": "project:updated", "data": {
+                "project_id": _uuid(rng), "title": _sentence(rng, 3),
+                "description": " ".join(_sentence(rng, 15) for _ in range(3)),
+                "tech_stack": rng.sample(["React", "FastAPI", "MongoDB", "Go", "Rust", "Redis"], 3),
+                "category": "Web", "status": "in_progress", "media_urls": [],
+                "user_email": f"{author}@bench.local", "user_username": author,
+                "user_full_name": author.title(), "view_count": rng.randint(0, 5000),
+                "created_at": now, "updated_at": now,
+            }})
+        else:
+            content = _markdown(rng, args.paragraphs)
+            blog = {
+                "blog_id": _uuid(rng), "slug": f"bench-{_uuid(rng)[:8]}", "title": _sentence(rng, 5),
+                "content_markdown": content, "excerpt": _sentence(rng, 20),
+                "tags": ["python", "performance"], "category": "Engineering", "status": "published",
+                "author_email": f"{author}@bench.local", "author_username": author,
+                "author_full_name": author.title(), "view_count": 0, "comment_count": 0,
+                "reaction_count": 0, "created_at": now, "updated_at": now, "published_at": now,
+            }
+            blog.update(render_markdown(content))
+            events.append({"type": rng.choice(["blog:new", "blog:updated"]), "data": blog})
+    return events
+
+
+def _chunked(size: int) -> int:
+    # "<hex length>\r\n" + body + "\r\n"
+    return size + len(f"{size:x}") + 4
+
+
+def _ws_frame(size: int) -> int:
+    # Server-to-client frames are unmasked
+    return size + (2 if size < 126 else 4 if size < 65536 else 10)
+
+
+def _deflater():
+    c = zlib.compressobj(6, zlib.DEFLATED, -15)
+
+    def deflate(payload: bytes) -> bytes:
+        # permessage-deflate strips the sync-flush trailer
+        return (c.compress(payload) + c.flush(zlib.Z_SYNC_FLUSH))[:-4]
+    return deflate
+
+
+def _transports() -> Dict[str, Callable[[], Callable[[dict], int]]]:
+    """Name -> factory of a per-connection encoder returning bytes on the wire."""
+    def sse():
+        return lambda e: _chunked(len(f"event: {e['type']}\ndata: {json.dumps(e['data'])}\n\n".encode()))
+
+    def sse_compressed(encoding):
+        def factory():
+            stream = compression.StreamCompressor(encoding)
+
+            def encode(e):
+                frame = f"event: {e['type']}\ndata: {json.dumps(e['data'])}\n\n".encode()
+                return _chunked(len(stream.compress(frame, flush=True)))
+            return encode
+        return factory
+
+    def ws_json():
+        return lambda e: _ws_frame(len(json.dumps({"type": e["type"], "data": e["data"]}).encode()))
+
+    def ws_msgpack():
+        dictionary = ws_stream.FieldDictionary()
+        return lambda e: _ws_frame(len(dictionary.encode(e)))
+
+    def ws_msgpack_deflate():
+        dictionary = ws_stream.FieldDictionary()
+        deflate = _deflater()
+        return lambda e: _ws_frame(len(deflate(dictionary.encode(e))))
+
+    transports = {"sse": sse}
+    for encoding in compression.available_encodings():
+        transports[f"sse+{encoding}"] = sse_compressed(encoding)
+    transports.update({"ws-json": ws_json, "ws-msgpack": ws_msgpack, "ws-msgpack+deflate": ws_msgpack_deflate})
+    return transports
+
+
+def run(args) -> List[dict]:
+    events = _events(args)
+    rows = []
+    for name, factory in _transports().items():
+        encode = factory()
+        total = sum(encode(e) for e in events)
+        runs, start = 0, time.perf_counter()
+        while True:
+            encode = factory()
+            for e in events:
+                encode(e)
+            runs += 1
+            elapsed = time.perf_counter() - start
+            if elapsed >= args.min_time:
+                break
+        rows.append({
+            "transport": name,
+            "events": len(events),
+            "bytes": total,
+            "bytes_per_event": round(total / len(events), 1),
+            "us_per_event": round(elapsed / runs / len(events) * 1e6, 2),
+        })
+    baseline = rows[0]["bytes"]
+    for row in rows:
+        row["vs_sse_pct"] = round(100 * (row["bytes"] / baseline - 1), 1)
+    return rows
+
+
+def format_table(rows: List[dict]) -> str:
+    header = f"{'transport':<20} {'events':>7} {'bytes':>11} {'B/event':>9} {'vs sse':>8} {'us/event':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['transport']:<20} {r['events']:>7} {r['bytes']:>11} {r['bytes_per_event']:>9} "
+            f"{r['vs_sse_pct']:>7}% {r['us_per_event']:>9}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.realtime", description=__doc__)
+    p.add_argument("--events", type=int, default=1000, help="events in the stream (default 1000)")
+    p.add_argument("--paragraphs", type=int, default=8, help="Markdown paragraphs per blog event")
+    p.add_argument("--min-time", type=float, default=0.5, help="seconds to time each transport for")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--output", help="write the rows as JSON to this path")
+    args = p.parse_args(argv)
+
+    rows = run(args)
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
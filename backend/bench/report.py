@@ -0,0 +1,107 @@
+"""Summaries of a load run and comparison against saved baselines."""
+
+import json
+import math
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from bench.load import RunResult
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(result: RunResult, meta: dict) -> dict:
+    routes = {}
+    all_latencies = []
+    for key in sorted(set(result.latencies) | set(result.errors)):
+        latencies = result.latencies.get(key, [])
+        all_latencies.extend(latencies)
+        routes[key] = {
+            "requests": len(latencies),
+            "errors": result.errors.get(key, 0),
+            "rps": round(len(latencies) / result.duration, 2),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+            "mongo_ops": _round(result.mongo_ops.get(key)),
+        }
+    total = len(all_latencies)
+    return {
+        "meta": meta,
+        "total": {
+            "requests": total,
+            "errors": sum(result.errors.values()),
+            "rps": round(total / result.duration, 2),
+            "p50_ms": round(percentile(all_latencies, 50) * 1000, 2),
+            "p95_ms": round(percentile(all_latencies, 95) * 1000, 2),
+            "p99_ms": round(percentile(all_latencies, 99) * 1000, 2),
+        },
+        "sse": {"connected": result.sse_connected, "events": result.sse_events},
+        "routes": routes,
+    }
+
+
+def _round(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+
+def format_table(summary: dict) -> str:
+    header = f"{'route':<44} {'req':>7} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'mongo':>6}"
+    lines = [header, "-" * len(header)]
+    rows = list(summary["routes"].items()) + [("TOTAL", summary["total"])]
+    for key, row in rows:
+        mongo = row.get("mongo_ops")
+        lines.append(
+            f"{key:<44} {row['requests']:>7} {row['errors']:>5} {row['rps']:>8} "
+            f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8} "
+            f"{'-' if mongo is None else mongo:>6}"
+        )
+    sse = summary["sse"]
+    lines.append(f"SSE clients connected: {sse['connected']}, events received: {sse['events']}")
+    return "\n".join(lines)
+
+
+def save_baseline(summary: dict, name: str) -> Path:
+    BASELINE_DIR.mkdir(exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    path.write_text(json.dumps(summary, indent=2) + "\n")
+    return path
+
+
+def load_baseline(name: str) -> dict:
+    return json.loads((BASELINE_DIR / f"{name}.json").read_text())
+
+
+def compare(summary: dict, baseline: dict, max_regression: float) -> Tuple[str, bool]:
+    """Compare p95 latency and throughput per route against a baseline.
+
+    Returns the report text and whether any route's p95 regressed by more
+    than ``max_regression`` (a fraction, e.g. 0.2 for 20%).
+    """
+    lines = [f"{'route':<44} {'p95 base':>9} {'p95 now':>9} {'delta':>8} {'rps delta':>10}"]
+    regressed = False
+    rows: Dict[str, dict] = dict(summary["routes"], TOTAL=summary["total"])
+    base_rows: Dict[str, dict] = dict(baseline["routes"], TOTAL=baseline["total"])
+    for key, row in rows.items():
+        base = base_rows.get(key)
+        if not base or not base["p95_ms"]:
+            continue
+        delta = (row["p95_ms"] - base["p95_ms"]) / base["p95_ms"]
+        rps_delta = (row["rps"] - base["rps"]) / base["rps"] if base["rps"] else 0.0
+        flag = ""
+        if delta > max_regression:
+            regressed = True
+            flag = "  REGRESSION"
+        lines.append(
+            f"{key:<44} {base['p95_ms']:>9} {row['p95_ms']:>9} {delta:>+8.1%} {rps_delta:>+10.1%}{flag}"
+        )
+    return "\n".join(lines), regressed
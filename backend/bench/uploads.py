@@ -0,0 +1,170 @@
+"""Throughput of the ``/uploads`` server against Starlette's ``StaticFiles``.
+
+Run from the ``backend`` directory::
+
+    python -m bench.uploads
+    python -m bench.uploads --concurrency 32 --duration 10 --output uploads.json
+
+Writes a set of random files to a temporary directory, serves it with both
+implementations from in-process uvicorn servers, and drives each with the
+same request mix: full downloads of small and large files, revalidation with
+the ETag from a previous response (what a browser does on reload), and
+64 KiB range requests (what a video player or resumed download does).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import socket
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.routing import Mount
+from starlette.staticfiles import StaticFiles
+
+from bench.report import percentile
+from uploads import UploadFiles
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _write_files(directory: Path, count: int, size: int, rng: random.Random, prefix: str) -> List[str]:
+    names = []
+    for i in range(count):
+        name = f"{prefix}-{i:04d}.png"
+        (directory / name).write_bytes(rng.randbytes(size))
+        names.append(name)
+    return names
+
+
+async def _serve(app):
+    port = _free_port()
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+    return server, task, f"http://127.0.0.1:{port}"
+
+
+async def _drive(base_url: str, make_request: Callable, args) -> dict:
+    latencies: List[float] = []
+    transferred = 0
+    errors = 0
+    stop = time.perf_counter() + args.duration
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        async def worker(index: int):
+            nonlocal transferred, errors
+            rng = random.Random(index)
+            while time.perf_counter() < stop:
+                path, headers = make_request(rng)
+                start = time.perf_counter()
+                r = await client.get(path, headers=headers)
+                latencies.append(time.perf_counter() - start)
+                if r.status_code >= 400:
+                    errors += 1
+                transferred += len(r.content)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "mb_per_s": round(transferred / elapsed / 1e6, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+    }
+
+
+async def run(args) -> List[dict]:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        small = _write_files(directory, args.files, args.small_kb * 1024, rng, "small")
+        large = _write_files(directory, max(1, args.files // 10), args.large_kb * 1024, rng, "large")
+
+        apps = {
+            "StaticFiles": Starlette(routes=[Mount("/uploads", StaticFiles(directory=str(directory)))]),
+            "UploadFiles": Starlette(routes=[Mount("/uploads", UploadFiles(directory))]),
+        }
+        rows = []
+        for label, app in apps.items():
+            server, task, base_url = await _serve(app)
+            try:
+                # Validators as a browser would have cached them from an earlier response
+                async with httpx.AsyncClient(base_url=base_url) as client:
+                    etags = {
+                        name: (await client.get(f"/uploads/{name}")).headers.get("etag", "")
+                        for name in small
+                    }
+
+                def revalidate(r):
+                    name = r.choice(small)
+                    return f"/uploads/{name}", {"If-None-Match": etags[name]}
+
+                def range_64k(r):
+                    first = r.randrange(0, args.large_kb * 1024 - 65536)
+                    return f"/uploads/{r.choice(large)}", {"Range": f"bytes={first}-{first + 65535}"}
+
+                scenarios: Dict[str, Callable] = {
+                    "full_small": lambda r: (f"/uploads/{r.choice(small)}", None),
+                    "full_large": lambda r: (f"/uploads/{r.choice(large)}", None),
+                    "revalidate": revalidate,
+                    "range_64k": range_64k,
+                }
+                for scenario, make_request in scenarios.items():
+                    result = await _drive(base_url, make_request, args)
+                    rows.append({"server": label, "scenario": scenario, **result})
+            finally:
+                server.should_exit = True
+                await task
+        return rows
+
+
+def format_table(rows: List[dict]) -> str:
+    header = f"{'server':<12} {'scenario':<12} {'req':>7} {'err':>5} {'rps':>9} {'MB/s':>8} {'p50':>8} {'p95':>8}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['server']:<12} {r['scenario']:<12} {r['requests']:>7} {r['errors']:>5} {r['rps']:>9} "
+            f"{r['mb_per_s']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(prog="python -m bench.uploads", description=__doc__)
+    p.add_argument("--files", type=int, default=50)
+    p.add_argument("--small-kb", type=int, default=48)
+    p.add_argument("--large-kb", type=int, default=4096)
+    p.add_argument("--concurrency", type=int, default=16)
+    p.add_argument("--duration", type=float, default=5.0, help="seconds per scenario")
+    p.add_argument("--seed", type=int, default=42)
+    p.add_argument("--output", help="write the rows as JSON to this path")
+    args = p.parse_args(argv)
+
+    rows = asyncio.run(run(args))
+    print(format_table(rows))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,251 @@
+import asyncio
+import logging
+import os
+import re
+from collections import Counter
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.environ.get("CASCADE_BATCH_SIZE", "500"))
+BATCH_DELAY = float(os.environ.get("CASCADE_BATCH_DELAY", "0.05"))  # seconds between batches
+MAX_ATTEMPTS = 10
+PRIORITY = 10  # ahead of media and rendering work
+
+_UPLOAD_REF = re.compile(r"/uploads/([\w.-]+)")
+
+
+def referenced_uploads(*texts: Optional[str]) -> List[str]:
+    """Return the upload filenames referenced by the given URLs / Markdown bodies."""
+    names = set()
+    for text in texts:
+        if text:
+            names.update(_UPLOAD_REF.findall(text))
+    return sorted(names)
+
+
+class CascadeDeleter:
+    """Removes the dependents of deleted blogs and users in the background.
+
+    The request handler deletes the parent document and enqueues a job on
+    the ``cascade`` queue; ``process`` then walks the job's steps, deleting
+    dependents in throttled batches. The current step is checkpointed on the
+    job, so a retried or resumed job continues where the last run stopped.
+    """
+
+    QUEUE = "cascade"
+
+    def __init__(self, db, upload_dir: Path, jobs):
+        self._db = db
+        self._upload_dir = upload_dir
+        self._jobs = jobs
+        self._steps = {
+            "blog": [
+                self._blog_comments,
+                self._blog_reactions,
+                self._blog_bookmarks,
+                self._blog_media,
+                self._blog_views,
+                self._blog_revisions,
+            ],
+            "user": [
+                self._user_blogs,
+                self._user_projects,
+                self._user_comments,
+                self._user_reactions,
+                self._user_bookmarks,
+                self._user_follows_out,
+                self._user_follows_in,
+                self._user_media,
+                self._user_blog_views,
+                self._user_stats,
+                self._user_tombstone,
+            ],
+        }
+        jobs.register(self.QUEUE, self.process, max_attempts=MAX_ATTEMPTS)
+
+    async def enqueue(self, kind: str, target: str, context: Optional[dict] = None) -> str:
+        """Queue a cascade job for an already-deleted parent."""
+        return await self._jobs.enqueue(
+            self.QUEUE, {"kind": kind, "target": target, "context": context or {}}, priority=PRIORITY,
+        )
+
+    async def adopt_legacy_jobs(self):
+        """Move unfinished jobs left in ``deletion_jobs`` by older versions onto the queue."""
+        async for legacy in self._db.deletion_jobs.find({"status": "pending"}):
+            job_id = await self._jobs.enqueue(
+                self.QUEUE,
+                {
+                    "kind": legacy["kind"], "target": legacy["target"],
+                    "context": legacy.get("context", {}), "step": legacy.get("step", 0),
+                },
+                priority=PRIORITY,
+                dedupe_key=f"deletion_jobs:{legacy['job_id']}",
+            )
+            await self._db.deletion_jobs.update_one(
+                {"_id": legacy["_id"]}, {"$set": {"status": "moved", "moved_to": job_id}},
+            )
+
+    async def process(self, job):
+        payload = job.payload
+        steps = self._steps[payload["kind"]]
+        # Adopted legacy jobs start at the step they had reached
+        first = job.state.get("step", payload.get("step", 0))
+        for index in range(first, len(steps)):
+            await steps[index](payload)
+            await job.checkpoint(step=index + 1)
+        logger.info("Cascade delete finished for %s %s", payload["kind"], payload["target"])
+
+    async def _delete_in_batches(
+        self,
+        collection,
+        query: dict,
+        projection: Optional[dict] = None,
+        before_delete: Optional[Callable[[List[dict]], Awaitable[None]]] = None,
+    ):
+        """Delete every document matching ``query`` a batch at a time.
+
+        ``before_delete`` runs on a batch while its documents still exist, so
+        if the job stops partway a retry finds the batch again.
+        """
+        while True:
+            batch = await collection.find(query, projection or {"_id": 1}).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+            if not batch:
+                return
+            if before_delete:
+                await before_delete(batch)
+            await collection.delete_many({"_id": {"$in": [d["_id"] for d in batch]}})
+            await asyncio.sleep(BATCH_DELAY)
+
+    def _recount(self, source, source_field: str, target, key_field: str, counter: str):
+        """A ``before_delete`` hook setting ``counter`` on the ``target``
+        documents a batch points at to the number of ``source`` documents
+        left once the batch is gone.
+
+        Unlike a decrement after the delete, this is idempotent: a retry after
+        a crash between the two finds the batch again and lands on the same
+        counts.
+        """
+        async def recount(batch: List[dict]):
+            keys = list({d[source_field] for d in batch})
+            counts = Counter({key: 0 for key in keys})
+            async for row in source.aggregate([
+                {"$match": {source_field: {"$in": keys}, "_id": {"$nin": [d["_id"] for d in batch]}}},
+                {"$group": {"_id": f"${source_field}", "n": {"$sum": 1}}},
+            ]):
+                counts[row["_id"]] = row["n"]
+            await target.bulk_write(
+                [UpdateOne({key_field: key}, {"$set": {counter: n}}) for key, n in counts.items()],
+                ordered=False,
+            )
+
+        return recount
+
+    async def _remove_media(self, query: dict):
+        async for media in self._db.media.find(query, {"_id": 1, "filename": 1}):
+            try:
+                await asyncio.to_thread((self._upload_dir / media["filename"]).unlink, missing_ok=True)
+            except OSError as e:
+                logger.warning("Could not remove upload %s: %s", media["filename"], e)
+                continue
+            await self._db.media.delete_one({"_id": media["_id"]})
+
+    # -- blog steps ---------------------------------------------------------
+
+    async def _blog_comments(self, job):
+        await self._delete_in_batches(self._db.comments, {"blog_id": job["target"]})
+
+    async def _blog_reactions(self, job):
+        await self._delete_in_batches(self._db.reactions, {"blog_id": job["target"]})
+
+    async def _blog_bookmarks(self, job):
+        await self._delete_in_batches(self._db.bookmarks, {"blog_id": job["target"]})
+
+    async def _blog_media(self, job):
+        author = job["context"].get("author_email")
+        for filename in job["context"].get("media", []):
+            # Keep files that another of the author's blogs still points at
+            in_use = await self._db.blogs.count_documents({
+                "author_email": author,
+                "$or": [
+                    {"cover_image_url": {"$regex": re.escape(filename)}},
+                    {"content_markdown": {"$regex": re.escape(filename)}},
+                ],
+            }, limit=1)
+            if not in_use:
+                await self._remove_media({"filename": filename, "owner_email": author})
+
+    async def _blog_views(self, job):
+        for collection in (self._db.blog_views_hourly, self._db.blog_views_daily):
+            await self._delete_in_batches(collection, {"blog_id": job["target"]})
+
+    async def _blog_revisions(self, job):
+        await self._delete_in_batches(self._db.blog_revisions, {"blog_id": job["target"]})
+
+    # -- user steps ---------------------------------------------------------
+
+    async def _user_blogs(self, job):
+        async def drop_dependents(blogs):
+            blog_ids = [b["blog_id"] for b in blogs]
+            for collection in (self._db.comments, self._db.reactions, self._db.bookmarks, self._db.blog_revisions):
+                await self._delete_in_batches(collection, {"blog_id": {"$in": blog_ids}})
+
+        await self._delete_in_batches(
+            self._db.blogs, {"author_email": job["target"]},
+            before_delete=drop_dependents, projection={"_id": 1, "blog_id": 1},
+        )
+
+    async def _user_projects(self, job):
+        await self._delete_in_batches(self._db.projects, {"user_email": job["target"]})
+
+    async def _user_comments(self, job):
+        await self._delete_in_batches(
+            self._db.comments, {"author_email": job["target"]},
+            before_delete=self._recount(self._db.comments, "blog_id", self._db.blogs, "blog_id", "comment_count"),
+            projection={"_id": 1, "blog_id": 1},
+        )
+
+    async def _user_reactions(self, job):
+        await self._delete_in_batches(
+            self._db.reactions, {"user_email": job["target"]},
+            before_delete=self._recount(self._db.reactions, "blog_id", self._db.blogs, "blog_id", "reaction_count"),
+            projection={"_id": 1, "blog_id": 1},
+        )
+
+    async def _user_bookmarks(self, job):
+        await self._delete_in_batches(self._db.bookmarks, {"user_email": job["target"]})
+
+    async def _user_follows_out(self, job):
+        await self._delete_in_batches(
+            self._db.follows, {"follower_email": job["target"]},
+            before_delete=self._recount(
+                self._db.follows, "following_email", self._db.users, "email", "follower_count",
+            ),
+            projection={"_id": 1, "following_email": 1},
+        )
+
+    async def _user_follows_in(self, job):
+        await self._delete_in_batches(
+            self._db.follows, {"following_email": job["target"]},
+            before_delete=self._recount(
+                self._db.follows, "follower_email", self._db.users, "email", "following_count",
+            ),
+            projection={"_id": 1, "follower_email": 1},
+        )
+
+    async def _user_media(self, job):
+        await self._remove_media({"owner_email": job["target"]})
+
+    async def _user_blog_views(self, job):
+        for collection in (self._db.blog_views_hourly, self._db.blog_views_daily):
+            await self._delete_in_batches(collection, {"author_email": job["target"]})
+
+    async def _user_stats(self, job):
+        await self._db.user_stats.delete_one({"_id": job["target"]})
+
+    async def _user_tombstone(self, job):
+        # Everything keyed by the email is gone; it may be registered again
+        await self._db.deleted_accounts.delete_one({"_id": job["target"]})
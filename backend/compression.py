@@ -0,0 +1,274 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.environ.get("COMPRESSION_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.environ.get("COMPRESSION_BROTLI_QUALITY", "4"))
+CACHE_MAX_BYTES = int(os.environ.get("COMPRESSION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+CACHE_MAX_ENTRY = 1024 * 1024
+COMPRESS_SSE = os.environ.get("COMPRESSION_SSE", "false").lower() in ("1", "true", "yes")
+
+_COMPRESSIBLE = (
+    b"application/json",
+    b"application/x-ndjson",
+    b"application/javascript",
+    b"application/xml",
+    b"image/svg+xml",
+    b"text/",
+)
+
+COMPRESSION_BYTES = metrics.registry.register(metrics.Counter(
+    "http_compression_bytes_total", "Response bytes before and after compression.",
+    ("encoding", "stage"),
+))
+COMPRESSION_SECONDS = metrics.registry.register(metrics.Histogram(
+    "http_compression_seconds", "CPU time spent compressing one response body.",
+    ("encoding",), buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1),
+))
+COMPRESSION_CACHE = metrics.registry.register(metrics.Counter(
+    "http_compression_cache_total", "Compressed-body cache lookups.", ("result",),
+))
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header, or None."""
+    offered = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        offered[name.strip().lower()] = quality
+    for encoding in available_encodings():
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """One-shot compression with the configured level for ``encoding``."""
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+class StreamCompressor:
+    """Incremental compressor; ``flush=True`` makes each chunk decodable on arrival."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=BROTLI_QUALITY)
+        else:
+            self._zlib = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes, flush: bool = False) -> bytes:
+        if self.encoding == "br":
+            out = self._brotli.process(data)
+            return out + self._brotli.flush() if flush else out
+        out = self._zlib.compress(data)
+        return out + self._zlib.flush(zlib.Z_SYNC_FLUSH) if flush else out
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._brotli.finish()
+        return self._zlib.flush()
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (encoding, digest of the raw body).
+
+    Keying on the body rather than the URL means identical responses share
+    an entry and a changed response can never be served stale.
+    """
+
+    def __init__(self, max_bytes: int = CACHE_MAX_BYTES):
+        self._max_bytes = max_bytes
+        self._size = 0
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(body: bytes, encoding: str) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value: bytes):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= len(old)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self._max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+body_cache = CompressedBodyCache()
+
+
+def _header(headers, name: bytes) -> Optional[bytes]:
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing responses with brotli or gzip.
+
+    Whole bodies smaller than ``MIN_SIZE`` or of a non-text content type are
+    passed through. Compressed bodies of cacheable GET responses are kept in
+    ``body_cache``. Streaming responses are compressed incrementally; SSE
+    streams only when ``COMPRESSION_SSE`` is set, flushing after every event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = scope.get("headers", [])
+        encoding = choose_encoding((_header(request_headers, b"accept-encoding") or b"").decode("latin-1"))
+        if encoding is None or _header(request_headers, b"range") is not None:
+            await self.app(scope, receive, send)
+            return
+
+        state = {"start": None, "compressor": None, "passthrough": False, "sse": False}
+        cacheable_method = scope["method"] == "GET"
+
+        async def send_wrapper(message):
+            if state["passthrough"]:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                content_type = (_header(headers, b"content-type") or b"").lower()
+                state["sse"] = content_type.startswith(b"text/event-stream")
+                if (
+                    _header(headers, b"content-encoding") is not None
+                    or message["status"] in (204, 206, 304)
+                    or not content_type.startswith(_COMPRESSIBLE)
+                    or (state["sse"] and not COMPRESS_SSE)
+                ):
+                    state["passthrough"] = True
+                    await send(message)
+                    return
+                state["start"] = message
+                return
+
+            if message["type"] != "http.response.body":
+                # e.g. a zero-copy file send: nothing to compress, let it through untouched
+                state["passthrough"] = True
+                if state["start"] is not None:
+                    await send(state["start"])
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            start = state["start"]
+
+            if state["compressor"] is None and not more_body:
+                # The whole body in one message
+                if len(body) < MIN_SIZE:
+                    state["passthrough"] = True
+                    await send(start)
+                    await send(message)
+                    return
+                compressed = self._compress_whole(body, encoding, start, cacheable_method)
+                await send(self._start_message(start, encoding, len(compressed)))
+                await send({"type": "http.response.body", "body": compressed})
+                return
+
+            if state["compressor"] is None:
+                state["compressor"] = StreamCompressor(encoding)
+                await send(self._start_message(start, encoding, None))
+
+            started = time.perf_counter()
+            chunk = state["compressor"].compress(body, flush=state["sse"])
+            if not more_body:
+                chunk += state["compressor"].finish()
+            COMPRESSION_SECONDS.observe(time.perf_counter() - started, encoding=encoding)
+            COMPRESSION_BYTES.inc(len(body), encoding=encoding, stage="in")
+            COMPRESSION_BYTES.inc(len(chunk), encoding=encoding, stage="out")
+            if chunk or not more_body:
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _compress_whole(body: bytes, encoding: str, start: dict, cacheable_method: bool) -> bytes:
+        cache_control = (_header(start.get("headers", []), b"cache-control") or b"").lower()
+        cacheable = (
+            cacheable_method
+            and start["status"] == 200
+            and len(body) <= CACHE_MAX_ENTRY
+            and b"no-store" not in cache_control
+        )
+        if cacheable:
+            key = body_cache.key(body, encoding)
+            compressed = body_cache.get(key)
+            if compressed is not None:
+                COMPRESSION_CACHE.inc(result="hit")
+                return compressed
+            COMPRESSION_CACHE.inc(result="miss")
+
+        started = time.perf_counter()
+        compressed = compress(body, encoding)
+        COMPRESSION_SECONDS.observe(time.perf_counter() - started, encoding=encoding)
+        COMPRESSION_BYTES.inc(len(body), encoding=encoding, stage="in")
+        COMPRESSION_BYTES.inc(len(compressed), encoding=encoding, stage="out")
+        if cacheable:
+            body_cache.put(key, compressed)
+        return compressed
+
+    @staticmethod
+    def _start_message(start: dict, encoding: str, length: Optional[int]) -> dict:
+        headers = [
+            (k, v) for k, v in start.get("headers", [])
+            if k.lower() not in (b"content-length", b"vary")
+        ]
+        vary = _header(start.get("headers", []), b"vary")
+        if vary and b"accept-encoding" not in vary.lower():
+            vary += b", Accept-Encoding"
+        headers.append((b"vary", vary or b"Accept-Encoding"))
+        headers.append((b"content-encoding", encoding.encode("latin-1")))
+        # The compressed representation is not byte-identical, so a strong ETag becomes weak
+        for i, (key, value) in enumerate(headers):
+            if key.lower() == b"etag" and not value.startswith(b"W/"):
+                headers[i] = (key, b"W/" + value)
+        if length is not None:
+            headers.append((b"content-length", str(length).encode("latin-1")))
+        return {**start, "headers": headers}
@@ -2,16 +2,69 @@ import os
 import logging
 from pathlib import Path
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Primary, SecondaryPreferred
 from dotenv import load_dotenv
 
+import metrics
+from logging_config import configure_logging
+from metrics import mongo_listener, pool_listener, pool_stats
+
 # Set up logging
-logging.basicConfig(level=logging.INFO)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+
+def _int_env(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _available_compressors(requested: str) -> list:
+    """Keep only the compressors whose libraries are installed."""
+    available = []
+    for name in (c.strip() for c in requested.split(',') if c.strip()):
+        module = {'zstd': 'zstandard', 'snappy': 'snappy', 'zlib': 'zlib'}.get(name)
+        try:
+            __import__(module)
+        except (ImportError, TypeError):
+            logger.warning("MongoDB compressor '%s' unavailable, skipping", name)
+            continue
+        available.append(name)
+    return available
+
+
+# Pool sizing, timeouts and compression (all overridable from the environment)
+MONGO_OPTIONS = {
+    'maxPoolSize': _int_env('MONGO_MAX_POOL_SIZE', 100),
+    'minPoolSize': _int_env('MONGO_MIN_POOL_SIZE', 0),
+    'maxIdleTimeMS': _int_env('MONGO_MAX_IDLE_TIME_MS', 60000),
+    'maxConnecting': _int_env('MONGO_MAX_CONNECTING', 2),
+    'waitQueueTimeoutMS': _int_env('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000),
+    'connectTimeoutMS': _int_env('MONGO_CONNECT_TIMEOUT_MS', 10000),
+    'serverSelectionTimeoutMS': _int_env('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000),
+}
+# No socket timeout unless configured: a fixed one would abort long exports and rebuilds
+if os.environ.get('MONGO_SOCKET_TIMEOUT_MS'):
+    MONGO_OPTIONS['socketTimeoutMS'] = _int_env('MONGO_SOCKET_TIMEOUT_MS', 0)
+_compressors = _available_compressors(os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib'))
+if _compressors:
+    MONGO_OPTIONS['compressors'] = _compressors
+
+# Public listings tolerate slightly stale data, so they may read from
+# secondaries; anything that must see the caller's own writes uses `db`.
+# Set MONGO_LISTING_READ_PREFERENCE=primary to route everything to the primary.
+_max_staleness = _int_env('MONGO_MAX_STALENESS_SECONDS', -1)
+LISTING_READ_PREFERENCES = {
+    'primary': Primary(),
+    'secondaryPreferred': SecondaryPreferred(max_staleness=_max_staleness),
+}
+
+# Imported after load_dotenv so the SLOW_OP_* settings are read
+from slow_ops import slow_operations  # noqa: E402
+
 # MongoDB connection
 try:
     mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
@@ -23,9 +76,35 @@ try:
     if not db_name:
         logger.warning("DB_NAME not found in env, using default: KudosDev")
 
-    client = AsyncIOMotorClient(mongo_url)
+    listing_preference = os.environ.get('MONGO_LISTING_READ_PREFERENCE', 'secondaryPreferred')
+    if listing_preference not in LISTING_READ_PREFERENCES:
+        raise ValueError(
+            f"MONGO_LISTING_READ_PREFERENCE must be one of {sorted(LISTING_READ_PREFERENCES)}"
+        )
+
+    client = AsyncIOMotorClient(
+        mongo_url,
+        event_listeners=[mongo_listener, pool_listener, slow_operations],
+        **MONGO_OPTIONS,
+    )
     db = client[db_name]
+    listing_db = client.get_database(
+        db_name, read_preference=LISTING_READ_PREFERENCES[listing_preference]
+    )
     logger.info("MongoDB client initialized")
 except Exception as e:
-    logger.error(f"Failed to initialize MongoDB client: {e}")
+    logger.error("Failed to initialize MongoDB client: %s", e)
     raise
+
+
+metrics.registry.register(metrics.Gauge(
+    "mongo_pool_max_size", "Configured maximum connections per server pool.",
+    function=lambda: MONGO_OPTIONS['maxPoolSize'],
+))
+metrics.registry.register(metrics.Gauge(
+    "mongo_pool_utilization", "Fraction of the pool checked out per server.", ("address",),
+    function=lambda: {
+        (address,): stats['in_use'] / max(MONGO_OPTIONS['maxPoolSize'], 1)
+        for address, stats in pool_stats.snapshot().items()
+    },
+))
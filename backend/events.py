@@ -1,5 +1,5 @@
 import asyncio
-from typing import Set
+from typing import List, Set
 
 class EventBus:
     """In-memory pub/sub for broadcasting SSE events."""
@@ -15,6 +15,14 @@ class EventBus:
     def unsubscribe(self, queue: asyncio.Queue):
         self._subscribers.discard(queue)
 
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def queue_depths(self) -> List[int]:
+        """Pending events per subscriber queue."""
+        return [queue.qsize() for queue in self._subscribers]
+
     async def publish(self, event: dict):
         for queue in self._subscribers:
             await queue.put(event)
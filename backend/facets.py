@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import uuid
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+REBUILD_SECONDS = float(os.environ.get("FACET_REBUILD_SECONDS", "3600"))
+LEASE_SECONDS = 900
+_WRITE_BATCH = 500
+
+# Facetable fields per collection; list fields count each element once
+FIELDS: Dict[str, Tuple[str, ...]] = {
+    "blogs": ("tags", "category"),
+    "projects": ("category", "tech_stack", "status"),
+}
+
+
+def _counted(kind: str, doc: Optional[dict]) -> bool:
+    # Blog facets describe what the public listing can show
+    return doc is not None and (kind != "blogs" or doc.get("status") == "published")
+
+
+def facet_values(kind: str, doc: Optional[dict]) -> Set[Tuple[str, str]]:
+    """The ``(field, value)`` pairs ``doc`` contributes to ``kind``'s counters."""
+    if not _counted(kind, doc):
+        return set()
+    pairs = set()
+    for field in FIELDS[kind]:
+        value = doc.get(field)
+        values = value if isinstance(value, list) else [value]
+        pairs.update((field, v) for v in values if isinstance(v, str) and v)
+    return pairs
+
+
+def _facet_id(kind: str, field: str, value: str) -> str:
+    return f"{kind}|{field}|{value}"
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class FacetCounter:
+    """Value counts for the filterable fields of blogs and projects.
+
+    ``facet_counts`` holds one document per (collection, field, value). Write
+    handlers call ``apply(kind, before, after)`` with the document as it was
+    and as it now is, and only the values that differ are ``$inc``-ed, so a
+    write costs one small bulk update and reading every facet of a
+    collection is a single indexed scan of its counters. ``rebuild()``
+    recounts from the collection; it backfills an empty counter set on
+    startup and repairs drift from bulk paths (cascade deletes, imports)
+    every ``REBUILD_SECONDS``. Rebuilds of a collection are serialized across
+    workers by a lease in ``facet_rebuilds``, since each one ends by deleting
+    the counters it did not write.
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    async def apply(self, kind: str, before: Optional[dict], after: Optional[dict]):
+        await self.apply_many(kind, [(before, after)])
+
+    async def apply_many(self, kind: str, changes: Sequence[Tuple[Optional[dict], Optional[dict]]]):
+        deltas: Counter = Counter()
+        for before, after in changes:
+            old, new = facet_values(kind, before), facet_values(kind, after)
+            deltas.update(new - old)
+            deltas.subtract(old - new)
+        deltas = {pair: delta for pair, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        ops = [
+            UpdateOne(
+                {"_id": _facet_id(kind, field, value)},
+                {"$inc": {"count": delta}, "$setOnInsert": {"kind": kind, "field": field, "value": value}},
+                upsert=True,
+            )
+            for (field, value), delta in deltas.items()
+        ]
+        try:
+            await self._db.facet_counts.bulk_write(ops, ordered=False)
+        except Exception as e:
+            # Counters are advisory; the next rebuild corrects them
+            logger.warning("Facet update for %s failed: %s", kind, e)
+
+    async def get(self, kind: str, fields: Sequence[str], limit: int) -> Dict[str, List[dict]]:
+        """``{field: [{"value", "count"}, ...]}``, most common first, zero counts omitted."""
+        result: Dict[str, List[dict]] = {field: [] for field in fields}
+        cursor = self._db.facet_counts.find(
+            {"kind": kind, "field": {"$in": list(fields)}, "count": {"$gt": 0}},
+            {"_id": 0, "field": 1, "value": 1, "count": 1},
+        ).sort([("kind", 1), ("field", 1), ("count", -1)])
+        async for doc in cursor:
+            values = result[doc["field"]]
+            if len(values) < limit:
+                values.append({"value": doc["value"], "count": doc["count"]})
+        return result
+
+    async def rebuild(self, kind: str, max_age: Optional[float] = None) -> bool:
+        """Recount ``kind``'s facets from the source collection.
+
+        Skipped (returning False) while another worker holds the lease, or
+        when ``max_age`` is given and a rebuild finished more recently.
+        """
+        owner = await self._acquire(kind, max_age)
+        if owner is None:
+            return False
+        try:
+            await self._recount(kind, owner)
+        finally:
+            await self._db.facet_rebuilds.update_one(
+                {"_id": kind, "owner": owner}, {"$set": {"locked_until": _now().isoformat()}},
+            )
+        return True
+
+    async def _acquire(self, kind: str, max_age: Optional[float]) -> Optional[str]:
+        now = _now()
+        owner = uuid.uuid4().hex
+        query = {"_id": kind, "locked_until": {"$lt": now.isoformat()}}
+        if max_age is not None:
+            query["$or"] = [
+                {"rebuilt_at": {"$exists": False}},
+                {"rebuilt_at": {"$lt": (now - timedelta(seconds=max_age)).isoformat()}},
+            ]
+        try:
+            # Upserting onto an existing _id that didn't match raises instead
+            await self._db.facet_rebuilds.update_one(
+                query,
+                {"$set": {"owner": owner, "locked_until": (now + timedelta(seconds=LEASE_SECONDS)).isoformat()}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            return None
+        return owner
+
+    async def _recount(self, kind: str, owner: str):
+        generation = str(uuid.uuid4())
+        match = {"status": "published"} if kind == "blogs" else {}
+        ops = []
+        for field in FIELDS[kind]:
+            pipeline = [
+                {"$match": match},
+                {"$project": {"_id": 0, "value": f"${field}"}},
+                {"$unwind": "$value"},
+                {"$match": {"value": {"$type": "string", "$ne": ""}}},
+                {"$group": {"_id": "$value", "count": {"$sum": 1}}},
+            ]
+            async for row in self._db[kind].aggregate(pipeline):
+                ops.append(UpdateOne(
+                    {"_id": _facet_id(kind, field, row["_id"])},
+                    {"$set": {
+                        "kind": kind, "field": field, "value": row["_id"],
+                        "count": row["count"], "generation": generation,
+                    }},
+                    upsert=True,
+                ))
+                if len(ops) >= _WRITE_BATCH:
+                    await self._db.facet_counts.bulk_write(ops, ordered=False)
+                    ops = []
+        if ops:
+            await self._db.facet_counts.bulk_write(ops, ordered=False)
+
+        # Only sweep if the lease is still ours: a rebuild that outlived it
+        # would delete the rows of the worker that took over
+        now = _now()
+        held = await self._db.facet_rebuilds.update_one(
+            {"_id": kind, "owner": owner, "locked_until": {"$gt": now.isoformat()}},
+            {"$set": {"rebuilt_at": now.isoformat()}},
+        )
+        if not held.matched_count:
+            logger.warning("Facet rebuild for %s outlived its lease; skipping the sweep", kind)
+            return
+        # Values no longer present anywhere
+        await self._db.facet_counts.delete_many({"kind": kind, "generation": {"$ne": generation}})
+
+    async def run(self):
+        """Backfill missing counters, then rebuild every ``REBUILD_SECONDS`` until cancelled."""
+        try:
+            backfill = True
+            while True:
+                for kind in FIELDS:
+                    try:
+                        if not backfill:
+                            # Every worker wakes up hourly; the first one rebuilds
+                            await self.rebuild(kind, max_age=REBUILD_SECONDS / 2)
+                        elif await self._db.facet_counts.find_one({"kind": kind}) is None:
+                            await self.rebuild(kind)
+                    except Exception as e:
+                        logger.error("Facet rebuild for %s failed: %s", kind, e)
+                backfill = False
+                await asyncio.sleep(REBUILD_SECONDS)
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,235 @@
+import asyncio
+import os
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Collection, Dict, Hashable, Optional, Tuple
+
+import metrics
+
+HOT_CACHE_EVENTS = metrics.registry.register(metrics.Counter(
+    "hot_cache_requests_total", "Hot-document cache lookups by outcome.", ("cache", "result"),
+))
+
+
+_ALL = object()  # marks a load as stale after clear()
+
+
+class _Entry:
+    __slots__ = ("key", "doc", "extra", "freq")
+
+    def __init__(self, key: Hashable, doc: dict, extra: dict):
+        self.key = key
+        self.doc = doc
+        self.extra = extra
+        self.freq = 1
+
+
+class HotDocumentCache:
+    """Size-bounded LFU cache of whole documents, kept fresh by a change stream.
+
+    ``loader(key)`` fetches a document (including ``_id``) or returns None.
+    Concurrent misses for one key share a single load. Entries are tracked by
+    ``_id`` so change events, which only carry the document key, can refresh
+    or drop them; a change's ``fullDocument`` replaces the cached copy in
+    place, so counter bumps on hot posts do not empty the cache.
+
+    The cache only serves reads while ``enable()`` is in effect, i.e. while
+    the change stream feeding it is running; otherwise every call goes to
+    ``loader``. Frequencies are halved every ``10 * max_entries`` lookups so
+    yesterday's trending post can be evicted.
+
+    ``annotate(doc)`` returns extra fields derived from a document, added to
+    every copy handed out; it runs once per load or change rather than on
+    every read. With ``annotate_fields`` (the fields it reads), an update
+    event touching none of them keeps the previous annotation.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        key_field: str,
+        loader: Callable[[Any], Awaitable[Optional[dict]]],
+        max_entries: int,
+        annotate: Optional[Callable[[dict], dict]] = None,
+        annotate_fields: Optional[Collection[str]] = None,
+    ):
+        self.name = name
+        self._annotate = annotate
+        self._annotate_fields = frozenset(annotate_fields) if annotate_fields is not None else None
+        self._key_field = key_field
+        self._loader = loader
+        self._max_entries = max_entries
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._by_id: Dict[Any, Hashable] = {}
+        self._buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}  # freq -> keys, oldest first
+        self._min_freq = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._changed_during_load: list = []  # one set of changed _ids per in-flight load
+        self._lookups = 0
+        self._enabled = False
+        metrics.registry.register(metrics.Gauge(
+            f"hot_cache_{name}_entries", f"Documents held in the {name} hot cache.",
+            function=lambda: len(self._entries),
+        ))
+
+    # -- lifecycle ----------------------------------------------------------
+
+    def enable(self):
+        self._enabled = True
+
+    def disable(self):
+        """Stop serving from the cache (the change stream is down) and empty it."""
+        self._enabled = False
+        self.clear()
+
+    def clear(self):
+        self._note_change(_ALL)
+        self._entries.clear()
+        self._by_id.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    # -- reads --------------------------------------------------------------
+
+    async def get(self, key: Hashable) -> Optional[dict]:
+        """Return a copy of the document for ``key`` without ``_id``, or None."""
+        if not self._enabled:
+            doc = await self._loader(key)
+            return _public(doc, self._extra(doc))
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            HOT_CACHE_EVENTS.inc(cache=self.name, result="hit")
+            self._touch(entry)
+            return _public(entry.doc, entry.extra)
+
+        task = self._inflight.get(key)
+        if task is not None:
+            HOT_CACHE_EVENTS.inc(cache=self.name, result="coalesced")
+        else:
+            HOT_CACHE_EVENTS.inc(cache=self.name, result="miss")
+            # A separate task, so a caller that disconnects does not cancel the
+            # load for everyone else waiting on it
+            task = asyncio.ensure_future(self._load(key))
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._inflight[key] = task
+        return _public(*await asyncio.shield(task))
+
+    def _extra(self, doc: Optional[dict]) -> dict:
+        return self._annotate(doc) if self._annotate is not None and doc is not None else {}
+
+    async def _load(self, key: Hashable) -> Tuple[Optional[dict], dict]:
+        changed = set()
+        self._changed_during_load.append(changed)
+        try:
+            doc = await self._loader(key)
+        finally:
+            self._inflight.pop(key, None)
+            self._changed_during_load.remove(changed)
+        extra = self._extra(doc)
+        # A change that landed while we were loading may have made ``doc`` stale
+        if doc is not None and self._enabled and not changed & {doc.get("_id"), _ALL}:
+            self._insert(key, doc, extra)
+        return doc, extra
+
+    def _note_change(self, doc_id):
+        for changed in self._changed_during_load:
+            changed.add(doc_id)
+
+    # -- invalidation -------------------------------------------------------
+
+    def apply_change(self, change: dict):
+        """Refresh or drop the cached copy of the document a change event refers to."""
+        doc_id = change.get("documentKey", {}).get("_id")
+        self._note_change(doc_id)
+        key = self._by_id.get(doc_id)
+        if key is None:
+            return
+        doc = change.get("fullDocument")
+        if change["operationType"] in ("update", "replace") and doc and doc.get(self._key_field) == key:
+            entry = self._entries[key]
+            if self._annotation_stale(change):
+                entry.extra = self._extra(doc)
+            entry.doc = doc
+        else:
+            self._remove(key)
+
+    def _annotation_stale(self, change: dict) -> bool:
+        if self._annotate_fields is None or change["operationType"] != "update":
+            return True
+        updated = change.get("updateDescription", {})
+        fields = list(updated.get("updatedFields", {})) + list(updated.get("removedFields", []))
+        # Dotted paths ("toc.0.text") belong to their top-level field
+        return any(field.split(".", 1)[0] in self._annotate_fields for field in fields)
+
+    def discard_id(self, doc_id):
+        """Drop a document this process just wrote, ahead of its change event."""
+        self._note_change(doc_id)
+        key = self._by_id.get(doc_id)
+        if key is not None:
+            self._remove(key)
+
+    # -- LFU bookkeeping ----------------------------------------------------
+
+    def _insert(self, key: Hashable, doc: dict, extra: dict):
+        if key in self._entries:
+            entry = self._entries[key]
+            entry.doc, entry.extra = doc, extra
+            return
+        if len(self._entries) >= self._max_entries:
+            victim, _ = self._buckets[self._min_freq].popitem(last=False)
+            if not self._buckets[self._min_freq]:
+                del self._buckets[self._min_freq]
+            self._by_id.pop(self._entries.pop(victim).doc.get("_id"), None)
+        entry = _Entry(key, doc, extra)
+        self._entries[key] = entry
+        self._by_id[doc.get("_id")] = key
+        self._buckets.setdefault(1, OrderedDict())[key] = None
+        self._min_freq = 1
+
+    def _touch(self, entry: _Entry):
+        bucket = self._buckets[entry.freq]
+        del bucket[entry.key]
+        if not bucket:
+            del self._buckets[entry.freq]
+            if self._min_freq == entry.freq:
+                self._min_freq += 1
+        entry.freq += 1
+        self._buckets.setdefault(entry.freq, OrderedDict())[entry.key] = None
+
+        self._lookups += 1
+        if self._lookups >= 10 * self._max_entries:
+            self._decay()
+
+    def _decay(self):
+        self._lookups = 0
+        buckets: Dict[int, "OrderedDict[Hashable, None]"] = {}
+        for freq in sorted(self._buckets):
+            for key in self._buckets[freq]:
+                entry = self._entries[key]
+                entry.freq = max(1, entry.freq // 2)
+                buckets.setdefault(entry.freq, OrderedDict())[key] = None
+        self._buckets = buckets
+        self._min_freq = min(buckets, default=0)
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key)
+        self._by_id.pop(entry.doc.get("_id"), None)
+        bucket = self._buckets[entry.freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[entry.freq]
+            if self._min_freq == entry.freq:
+                self._min_freq = min(self._buckets, default=0)
+
+
+def _public(doc: Optional[dict], extra: dict) -> Optional[dict]:
+    if doc is None:
+        return None
+    copy = dict(doc)
+    copy.pop("_id", None)
+    copy.update(extra)
+    return copy
+
+
+def cache_size(name: str, default: int) -> int:
+    return int(os.environ.get(f"HOT_CACHE_{name.upper()}", str(default)))
@@ -0,0 +1,370 @@
+import asyncio
+import logging
+import os
+import random
+import uuid
+from datetime import datetime, timezone, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = float(os.environ.get("JOBS_POLL_SECONDS", "5"))
+BACKOFF_BASE = float(os.environ.get("JOBS_BACKOFF_BASE_SECONDS", "5"))
+BACKOFF_MAX = float(os.environ.get("JOBS_BACKOFF_MAX_SECONDS", "3600"))
+SHUTDOWN_SECONDS = 10.0
+
+PENDING = "pending"
+RUNNING = "running"
+FAILED = "failed"
+
+JOBS_PROCESSED = metrics.registry.register(metrics.Counter(
+    "jobs_processed_total", "Background job runs, by queue and outcome.", ("queue", "outcome"),
+))
+JOB_SECONDS = metrics.registry.register(metrics.Histogram(
+    "job_seconds", "Time spent running one background job.", ("queue",),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30, 60, 300),
+))
+JOB_WAIT_SECONDS = metrics.registry.register(metrics.Histogram(
+    "job_wait_seconds", "Time from a job becoming due to a worker claiming it.", ("queue",),
+    buckets=(0.1, 0.5, 1, 5, 10, 30, 60, 300, 900),
+))
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _concurrency_overrides(value: str) -> Dict[str, int]:
+    """Parse ``JOBS_CONCURRENCY``, e.g. ``media=4,render=1``."""
+    overrides = {}
+    for part in (p.strip() for p in value.split(",") if p.strip()):
+        name, _, n = part.partition("=")
+        overrides[name.strip()] = int(n)
+    return overrides
+
+
+CONCURRENCY = _concurrency_overrides(os.environ.get("JOBS_CONCURRENCY", ""))
+
+
+class LeaseLost(Exception):
+    """Another worker took over the job after this one's lease expired."""
+
+
+class Job:
+    """A claimed job as seen by its handler."""
+
+    __slots__ = ("id", "queue", "payload", "state", "attempts", "_jobs", "_lease", "_lease_seconds")
+
+    def __init__(self, jobs: "JobQueue", doc: dict, lease: str, lease_seconds: float):
+        self.id = doc["_id"]
+        self.queue = doc["queue"]
+        self.payload = doc["payload"]
+        self.state = doc.get("state", {})
+        self.attempts = doc["attempts"]
+        self._jobs = jobs
+        self._lease = lease
+        self._lease_seconds = lease_seconds
+
+    async def checkpoint(self, **state):
+        """Persist progress in ``state`` (kept across retries) and extend the lease."""
+        self.state.update(state)
+        await self._jobs._extend(self, {f"state.{k}": v for k, v in state.items()})
+
+
+class _Queue:
+    __slots__ = ("name", "handler", "concurrency", "max_attempts", "lease_seconds", "wakeup")
+
+    def __init__(self, name, handler, concurrency, max_attempts, lease_seconds):
+        self.name = name
+        self.handler = handler
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.lease_seconds = lease_seconds
+        self.wakeup = asyncio.Event()
+
+
+class JobQueue:
+    """Durable background jobs in the ``jobs`` collection.
+
+    Handlers are registered per queue; ``enqueue()`` stores a job and
+    ``run()`` serves every queue, claiming due jobs (highest ``priority``
+    first, then oldest) with ``find_one_and_update`` so several processes
+    can share the collection. A claim is a lease of ``lease_seconds`` that
+    is renewed while the handler runs; if a process dies its jobs become
+    claimable again once their lease runs out. A handler that raises is
+    retried with exponential backoff (``JOBS_BACKOFF_BASE_SECONDS`` doubled
+    per attempt, with jitter, capped at ``JOBS_BACKOFF_MAX_SECONDS``) until
+    ``max_attempts``, after which the job stays in the collection as
+    ``failed`` for an admin to inspect and retry. Finished jobs are deleted.
+
+    Each process runs at most ``concurrency`` jobs of a queue at once
+    (overridable per queue with ``JOBS_CONCURRENCY``). Handlers should be
+    idempotent, or record progress with ``Job.checkpoint()``: a job can run
+    again after a crash or a lost lease.
+
+    A ``dedupe_key`` makes enqueueing collapse into the pending job with the
+    same key, whose due time moves to the later of the two; a job already
+    running does not absorb new requests, so work requested while it runs
+    is done again.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._queues: Dict[str, _Queue] = {}
+        self._running: set = set()
+
+    def register(
+        self,
+        name: str,
+        handler: Callable[[Job], Awaitable[None]],
+        concurrency: int = 1,
+        max_attempts: int = 5,
+        lease_seconds: float = 60,
+    ):
+        self._queues[name] = _Queue(
+            name, handler, CONCURRENCY.get(name, concurrency), max_attempts, lease_seconds,
+        )
+
+    async def enqueue(
+        self,
+        queue: str,
+        payload: dict,
+        priority: int = 0,
+        delay: float = 0,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[str]:
+        """Store a job; returns its id (None when it merged into a pending duplicate)."""
+        if queue not in self._queues:
+            raise ValueError(f"no handler registered for queue {queue!r}")
+        now = _now()
+        job_id = str(uuid.uuid4())
+        doc = {
+            "_id": job_id,
+            "queue": queue,
+            "payload": payload,
+            "priority": priority,
+            "status": PENDING,
+            "attempts": 0,
+            "state": {},
+            "lease": None,
+            "last_error": None,
+            "created_at": now.isoformat(),
+        }
+        run_at = (now + timedelta(seconds=delay)).isoformat()
+        if dedupe_key is None:
+            await self._db.jobs.insert_one({**doc, "run_at": run_at})
+        else:
+            try:
+                result = await self._db.jobs.update_one(
+                    {"dedupe_key": dedupe_key, "status": PENDING},
+                    {"$setOnInsert": {**doc, "dedupe_key": dedupe_key}, "$max": {"run_at": run_at}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                return None  # a concurrent enqueue of the same key won
+            if result.upserted_id is None:
+                return None
+        if delay <= 0:
+            self._queues[queue].wakeup.set()
+        return job_id
+
+    async def run(self):
+        """Serve every registered queue until cancelled."""
+        try:
+            await asyncio.gather(*(self._serve(q) for q in self._queues.values()))
+        except asyncio.CancelledError:
+            pass
+
+    async def shutdown(self):
+        """Stop running jobs and hand them back so another worker resumes them."""
+        tasks = list(self._running)
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            await asyncio.wait(tasks, timeout=SHUTDOWN_SECONDS)
+
+    # -- worker -------------------------------------------------------------
+
+    async def _serve(self, queue: _Queue):
+        slots = asyncio.Semaphore(queue.concurrency)
+        while True:
+            await slots.acquire()
+            try:
+                claimed = await self._claim(queue)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error("Claiming a %s job failed: %s", queue.name, e)
+                claimed = None
+            if claimed is None:
+                slots.release()
+                try:
+                    await asyncio.wait_for(queue.wakeup.wait(), timeout=POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                queue.wakeup.clear()
+                continue
+            task = asyncio.create_task(self._execute(queue, claimed))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            task.add_done_callback(lambda _: slots.release())
+
+    async def _claim(self, queue: _Queue) -> Optional[Job]:
+        now = _now()
+        lease = uuid.uuid4().hex
+        # A running job whose lease (run_at) has passed was abandoned
+        doc = await self._db.jobs.find_one_and_update(
+            {"queue": queue.name, "status": {"$in": [PENDING, RUNNING]}, "run_at": {"$lte": now.isoformat()}},
+            {
+                "$set": {
+                    "status": RUNNING,
+                    "lease": lease,
+                    "run_at": (now + timedelta(seconds=queue.lease_seconds)).isoformat(),
+                },
+                "$inc": {"attempts": 1},
+            },
+            sort=[("priority", -1), ("run_at", 1)],
+            return_document=ReturnDocument.BEFORE,
+        )
+        if doc is None:
+            return None
+        JOB_WAIT_SECONDS.observe(
+            max((now - datetime.fromisoformat(doc["run_at"])).total_seconds(), 0), queue=queue.name,
+        )
+        doc["attempts"] += 1
+        return Job(self, doc, lease, queue.lease_seconds)
+
+    async def _extend(self, job: Job, fields: Optional[dict] = None):
+        run_at = (_now() + timedelta(seconds=job._lease_seconds)).isoformat()
+        result = await self._db.jobs.update_one(
+            {"_id": job.id, "lease": job._lease}, {"$set": {"run_at": run_at, **(fields or {})}},
+        )
+        if not result.matched_count:
+            raise LeaseLost(job.id)
+
+    async def _heartbeat(self, job: Job, handler: asyncio.Task):
+        while True:
+            await asyncio.sleep(job._lease_seconds / 3)
+            try:
+                await self._extend(job)
+            except LeaseLost:
+                logger.warning("Lost the lease on %s job %s; abandoning it", job.queue, job.id)
+                handler.cancel()
+                return
+            except Exception as e:
+                logger.warning("Could not extend the lease on %s job %s: %s", job.queue, job.id, e)
+
+    async def _execute(self, queue: _Queue, job: Job):
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        handler = asyncio.create_task(queue.handler(job))
+        heartbeat = asyncio.create_task(self._heartbeat(job, handler))
+        outcome = "done"
+        try:
+            await handler
+            await self._db.jobs.delete_one({"_id": job.id, "lease": job._lease})
+        except asyncio.CancelledError:
+            if heartbeat.done() and not heartbeat.cancelled():
+                outcome = "lost"  # the heartbeat gave the job up
+            else:
+                # Shutting down (the handler is cancelled with us): give the job back at once
+                outcome = "released"
+                await self._release(job)
+                raise
+        except LeaseLost:
+            outcome = "lost"
+        except Exception as e:
+            outcome = await self._fail(queue, job, e)
+        finally:
+            heartbeat.cancel()
+            JOBS_PROCESSED.inc(queue=queue.name, outcome=outcome)
+            JOB_SECONDS.observe(loop.time() - start, queue=queue.name)
+
+    async def _release(self, job: Job):
+        try:
+            await self._db.jobs.update_one(
+                {"_id": job.id, "lease": job._lease},
+                {"$set": {"status": PENDING, "lease": None, "run_at": _now().isoformat()}, "$inc": {"attempts": -1}},
+            )
+        except Exception as e:
+            logger.warning("Could not release %s job %s: %s", job.queue, job.id, e)
+
+    async def _fail(self, queue: _Queue, job: Job, error: Exception) -> str:
+        message = f"{type(error).__name__}: {error}"
+        if job.attempts >= queue.max_attempts:
+            logger.error("%s job %s failed for good after %d attempts: %s", queue.name, job.id, job.attempts, message)
+            update = {"status": FAILED, "lease": None, "last_error": message, "failed_at": _now().isoformat()}
+            outcome = "failed"
+        else:
+            delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** (job.attempts - 1)) * random.uniform(0.5, 1.0)
+            logger.warning(
+                "%s job %s failed (attempt %d of %d), retrying in %.0fs: %s",
+                queue.name, job.id, job.attempts, queue.max_attempts, delay, message,
+            )
+            update = {
+                "status": PENDING, "lease": None, "last_error": message,
+                "run_at": (_now() + timedelta(seconds=delay)).isoformat(),
+            }
+            outcome = "retry"
+        try:
+            await self._db.jobs.update_one({"_id": job.id, "lease": job._lease}, {"$set": update})
+        except DuplicateKeyError:
+            # A newer request for the same work is already pending; it covers this one
+            await self._db.jobs.delete_one({"_id": job.id, "lease": job._lease})
+        except Exception as e:
+            logger.error("Could not record the failure of %s job %s: %s", queue.name, job.id, e)
+        return outcome
+
+    # -- admin --------------------------------------------------------------
+
+    async def stats(self) -> List[dict]:
+        """Job counts per queue and status, with the oldest due time of each."""
+        rows = await self._db.jobs.aggregate([
+            {"$group": {
+                "_id": {"queue": "$queue", "status": "$status"},
+                "count": {"$sum": 1},
+                "oldest_run_at": {"$min": "$run_at"},
+            }},
+        ]).to_list(None)
+        by_queue = {
+            name: {"queue": name, "concurrency": q.concurrency, "max_attempts": q.max_attempts, "statuses": {}}
+            for name, q in self._queues.items()
+        }
+        for row in rows:
+            name = row["_id"]["queue"]
+            entry = by_queue.setdefault(name, {"queue": name, "statuses": {}})
+            entry["statuses"][row["_id"]["status"]] = {
+                "count": row["count"], "oldest_run_at": row["oldest_run_at"],
+            }
+        return sorted(by_queue.values(), key=lambda e: e["queue"])
+
+    async def failed(self, queue: Optional[str], limit: int) -> List[dict]:
+        query = {"status": FAILED}
+        if queue:
+            query["queue"] = queue
+        docs = await self._db.jobs.find(query, {"lease": 0}).sort("failed_at", -1).limit(limit).to_list(limit)
+        for doc in docs:
+            doc["job_id"] = doc.pop("_id")
+        return docs
+
+    async def retry(self, job_id: str) -> bool:
+        """Put a failed job back in its queue with a fresh set of attempts."""
+        try:
+            doc = await self._db.jobs.find_one_and_update(
+                {"_id": job_id, "status": FAILED},
+                {"$set": {"status": PENDING, "attempts": 0, "run_at": _now().isoformat()}, "$unset": {"failed_at": ""}},
+            )
+        except DuplicateKeyError:
+            # The same work is already pending again
+            await self._db.jobs.delete_one({"_id": job_id, "status": FAILED})
+            return True
+        if doc is None:
+            return False
+        if doc["queue"] in self._queues:
+            self._queues[doc["queue"]].wakeup.set()
+        return True
@@ -0,0 +1,194 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+# Attributes every LogRecord has; anything else was passed via ``extra``
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+_REDACTIONS = [
+    (re.compile(r"eyJ[\w-]+\.[\w-]+\.[\w-]+"), "[REDACTED_JWT]"),
+    (re.compile(r"(?i)(bearer\s+)[\w.~+/-]+=*"), r"\1[REDACTED]"),
+    (
+        re.compile(r"""(?i)((?:password|passwd|secret|token|api_key|authorization)["']?\s*[:=]\s*["']?)[^\s"',}]+"""),
+        r"\1[REDACTED]",
+    ),
+]
+
+
+def redact(text: str) -> str:
+    for pattern, replacement in _REDACTIONS:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, including any ``extra`` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and key != "redact" and value is not None:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class RedactingFormatter(logging.Formatter):
+    """Wraps another formatter and scrubs secrets from its output."""
+
+    def __init__(self, inner: logging.Formatter):
+        super().__init__()
+        self._inner = inner
+
+    def format(self, record: logging.LogRecord) -> str:
+        if not getattr(record, "redact", True):
+            return self._inner.format(record)
+        # Scrub a copy before the inner formatter escapes or decorates the text
+        clean = logging.makeLogRecord(vars(record))
+        clean.msg = redact(record.getMessage())
+        clean.args = None
+        if record.exc_info:
+            clean.exc_text = redact(self._inner.formatException(record.exc_info))
+            clean.exc_info = None
+        return self._inner.format(clean)
+
+
+class RateLimitFilter(logging.Filter):
+    """Token bucket per (logger, message template) for records below ERROR.
+
+    Runs on the request path, so it only touches a dict and a clock. When a
+    message gets through after others were dropped, the number dropped is
+    attached as ``suppressed``.
+    """
+
+    def __init__(self, rate: float, burst: int, sample: Optional[Dict[str, float]] = None):
+        super().__init__()
+        self._rate = rate
+        self._burst = burst
+        self._sample = sample or {}
+        self._buckets: Dict[Tuple[str, str], list] = {}  # key -> [tokens, last, suppressed]
+        self._lock = threading.Lock()
+        self._counter = 0
+
+    def _sample_rate(self, name: str) -> float:
+        while name:
+            if name in self._sample:
+                return self._sample[name]
+            name = name.rpartition(".")[0]
+        return 1.0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.ERROR:
+            return True
+
+        rate = self._sample_rate(record.name)
+        if rate < 1.0:
+            # Deterministic 1-in-N sampling, cheaper than random()
+            self._counter += 1
+            if rate <= 0 or self._counter % max(1, round(1 / rate)):
+                return False
+
+        if self._rate <= 0:
+            return True
+        key = (record.name, str(record.msg))
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = [float(self._burst), now, 0]
+            bucket[0] = min(self._burst, bucket[0] + (now - bucket[1]) * self._rate)
+            bucket[1] = now
+            if bucket[0] < 1:
+                bucket[2] += 1
+                return False
+            bucket[0] -= 1
+            if bucket[2]:
+                record.suppressed = bucket[2]
+                bucket[2] = 0
+        return True
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Queues the record as-is so message formatting happens on the listener thread."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[QueueListener] = None
+
+
+def _parse_sample(spec: str) -> Dict[str, float]:
+    sample = {}
+    for part in spec.split(","):
+        name, _, value = part.partition(":")
+        if name.strip() and value.strip():
+            sample[name.strip()] = float(value)
+    return sample
+
+
+def configure_logging():
+    """Route all logging through a queue drained by a background thread.
+
+    Configured from the environment: ``LOG_LEVEL`` (INFO), ``LOG_FORMAT``
+    (json | text), ``LOG_RATE_LIMIT`` messages/second per message template
+    (10, 0 disables) with ``LOG_RATE_BURST`` (20), and ``LOG_SAMPLE`` as
+    ``logger:fraction`` pairs, e.g. ``uvicorn.access:0.1``. Safe to call
+    more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if os.environ.get("LOG_FORMAT", "json") == "text":
+        inner = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    else:
+        inner = JsonFormatter()
+    stream = logging.StreamHandler()
+    stream.setFormatter(RedactingFormatter(inner))
+
+    log_queue = queue.SimpleQueue()
+    handler = DeferredQueueHandler(log_queue)
+    handler.addFilter(RateLimitFilter(
+        rate=float(os.environ.get("LOG_RATE_LIMIT", "10")),
+        burst=int(os.environ.get("LOG_RATE_BURST", "20")),
+        sample=_parse_sample(os.environ.get("LOG_SAMPLE", "")),
+    ))
+
+    root = logging.getLogger()
+    root.handlers = [handler]
+    root.setLevel(os.environ.get("LOG_LEVEL", "INFO").upper())
+
+    # uvicorn installs its own synchronous handlers; send its records through the queue too
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers = []
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, stream, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,390 @@
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+
+def _format_labels(names: Sequence[str], values: Tuple) -> str:
+    if not names:
+        return ""
+    pairs = []
+    for name, value in zip(names, values):
+        escaped = str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        pairs.append(f'{name}="{escaped}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.labels = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> Tuple:
+        return tuple(labels.get(name, "") for name in self.labels)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+    def _samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Gauge(_Metric):
+    """A settable gauge, or one read from ``function`` at scrape time.
+
+    ``function`` returns either a number (unlabelled gauge) or a mapping of
+    label-value tuples to numbers.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, *args, function: Optional[Callable] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple, float] = {}
+        self._function = function
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _samples(self):
+        if self._function is not None:
+            result = self._function()
+            items = result.items() if isinstance(result, dict) else [((), result)]
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labels, key)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = LATENCY_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._values: Dict[Tuple, list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[i] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def _samples(self):
+        with self._lock:
+            items = [(key, list(state)) for key, state in self._values.items()]
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                labels = _format_labels(self.labels + ("le",), key + (_format_value(bound),))
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labels, key)
+            yield f"{self.name}_sum{labels} {_format_value(state[-2])}"
+            yield f"{self.name}_count{labels} {state[-1]}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+registry = Registry()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+HTTP_REQUEST_SECONDS = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template.",
+    ("method", "route", "status"),
+))
+MONGO_COMMANDS_PER_REQUEST = registry.register(Histogram(
+    "http_request_mongo_commands", "MongoDB commands issued per request.",
+    ("method", "route"), buckets=COUNT_BUCKETS,
+))
+MONGO_SECONDS_PER_REQUEST = registry.register(Histogram(
+    "http_request_mongo_seconds", "Time spent in MongoDB commands per request.",
+    ("method", "route"),
+))
+MONGO_COMMAND_SECONDS = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency by command name.",
+    ("command", "outcome"),
+))
+CHANGE_STREAM_EVENTS = registry.register(Counter(
+    "change_stream_events_total", "Change stream events received.", ("collection",),
+))
+CHANGE_STREAM_LAG = registry.register(Gauge(
+    "change_stream_lag_seconds", "Delay between a write and its change event arriving.",
+    ("collection",),
+))
+
+
+# ---------------------------------------------------------------------------
+# Per-request MongoDB accounting
+# ---------------------------------------------------------------------------
+
+
+class RequestStats:
+    """MongoDB work attributed to the current request.
+
+    Setting ``trace`` to a list (done for profiled requests) also logs each
+    command: name, collection, start offset and duration. ``scope`` is the
+    request's ASGI scope, which gains the matched route once routing ran.
+    """
+
+    __slots__ = ("commands", "seconds", "trace", "scope", "_started", "_pending", "_lock")
+
+    TRACE_LIMIT = 1000
+
+    def __init__(self):
+        self.commands = 0
+        self.seconds = 0.0
+        self.trace: Optional[list] = None
+        self.scope: Optional[dict] = None
+        self._started = time.perf_counter()
+        self._pending: Dict[int, Tuple[str, str, float]] = {}
+        self._lock = threading.Lock()
+
+    def begin(self, event):
+        if self.trace is None:
+            return
+        name = event.command_name
+        collection = event.command.get(name)
+        with self._lock:
+            self._pending[event.request_id] = (
+                name, collection if isinstance(collection, str) else "", time.perf_counter(),
+            )
+
+    def add(self, seconds: float, event=None, outcome: str = "ok"):
+        with self._lock:
+            self.commands += 1
+            self.seconds += seconds
+            if self.trace is None or event is None:
+                return
+            pending = self._pending.pop(event.request_id, None)
+            if pending is not None and len(self.trace) < self.TRACE_LIMIT:
+                name, collection, started = pending
+                self.trace.append({
+                    "command": name,
+                    "collection": collection,
+                    "at_ms": round((started - self._started) * 1000, 2),
+                    "ms": round(seconds * 1000, 2),
+                    "outcome": outcome,
+                })
+
+
+# Motor copies the calling context into its executor threads, so the command
+# listener sees the stats object of the request that issued the command.
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        stats = current_request.get()
+        if stats is not None:
+            stats.begin(event)
+
+    def succeeded(self, event):
+        self._record(event, "ok")
+
+    def failed(self, event):
+        self._record(event, "error")
+
+    def _record(self, event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, command=event.command_name, outcome=outcome)
+        stats = current_request.get()
+        if stats is not None:
+            stats.add(seconds, event, outcome)
+
+
+mongo_listener = MongoCommandListener()
+
+
+# ---------------------------------------------------------------------------
+# Connection pool
+# ---------------------------------------------------------------------------
+
+MONGO_POOL_CHECKOUT_WAIT = registry.register(Histogram(
+    "mongo_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection.",
+))
+MONGO_POOL_CHECKOUT_FAILURES = registry.register(Counter(
+    "mongo_pool_checkout_failures_total", "Connection checkouts that failed, by reason.",
+    ("reason",),
+))
+
+
+class PoolStats:
+    """Live connection counts per server, fed by a pymongo pool listener."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts: Dict[str, Dict[str, int]] = {}
+
+    def adjust(self, address, kind: str, delta: int):
+        """Change the ``open`` or ``in_use`` count for a server by ``delta``."""
+        key = f"{address[0]}:{address[1]}"
+        with self._lock:
+            counts = self._counts.setdefault(key, {"open": 0, "in_use": 0})
+            counts[kind] = max(0, counts[kind] + delta)
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        with self._lock:
+            return {address: dict(counts) for address, counts in self._counts.items()}
+
+
+pool_stats = PoolStats()
+
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    _local = threading.local()
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        pool_stats.adjust(event.address, "open", 1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        pool_stats.adjust(event.address, "open", -1)
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter()
+
+    def connection_check_out_failed(self, event):
+        self._local.started = None
+        MONGO_POOL_CHECKOUT_FAILURES.inc(reason=event.reason)
+
+    def connection_checked_out(self, event):
+        started = getattr(self._local, "started", None)
+        if started is not None:
+            MONGO_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+            self._local.started = None
+        pool_stats.adjust(event.address, "in_use", 1)
+
+    def connection_checked_in(self, event):
+        pool_stats.adjust(event.address, "in_use", -1)
+
+
+pool_listener = MongoPoolListener()
+
+registry.register(Gauge(
+    "mongo_pool_connections", "Open pooled connections per server.", ("address",),
+    function=lambda: {(a,): s["open"] for a, s in pool_stats.snapshot().items()},
+))
+registry.register(Gauge(
+    "mongo_pool_connections_in_use", "Checked-out pooled connections per server.", ("address",),
+    function=lambda: {(a,): s["in_use"] for a, s in pool_stats.snapshot().items()},
+))
+
+
+def observe_change(collection: str, change: dict):
+    """Record a change stream event and how far it lagged behind its write."""
+    CHANGE_STREAM_EVENTS.inc(collection=collection)
+    cluster_time = change.get("clusterTime")
+    if cluster_time is not None:
+        CHANGE_STREAM_LAG.set(max(0.0, time.time() - cluster_time.time), collection=collection)
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and MongoDB usage per route template."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        stats.scope = scope
+        token = current_request.set(stats)
+        start = time.perf_counter()
+        response = {"status": 500, "streaming": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                for name, value in message.get("headers", []):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        response["streaming"] = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request.reset(token)
+            # Long-lived streams would swamp the latency histogram
+            if not response["streaming"]:
+                route = getattr(scope.get("route"), "path", "unmatched")
+                method = scope["method"]
+                HTTP_REQUEST_SECONDS.observe(
+                    time.perf_counter() - start,
+                    method=method, route=route, status=response["status"],
+                )
+                MONGO_COMMANDS_PER_REQUEST.observe(stats.commands, method=method, route=route)
+                MONGO_SECONDS_PER_REQUEST.observe(stats.seconds, method=method, route=route)
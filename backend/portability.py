@@ -0,0 +1,169 @@
+import json
+import os
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from pymongo.errors import BulkWriteError
+
+FORMAT_VERSION = 1
+IMPORT_BATCH_SIZE = int(os.environ.get("IMPORT_BATCH_SIZE", "500"))
+MAX_LINE_BYTES = 4 * 1024 * 1024
+MAX_REPORTED_ERRORS = 1000
+_EXPORT_CHUNK_BYTES = 64 * 1024
+
+
+def _dumps(obj: dict) -> bytes:
+    return json.dumps(obj, default=str, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+async def export_ndjson(header: dict, sources: Iterable[Tuple[str, Any]]) -> AsyncIterator[bytes]:
+    """Yield NDJSON for a header line followed by every document of each cursor.
+
+    ``sources`` is a sequence of ``(type, cursor)`` pairs. Documents are read
+    in cursor batches and written out in ~64 KiB chunks, so memory use does
+    not depend on how much the user has.
+    """
+    buffer = bytearray(_dumps({"type": "meta", "version": FORMAT_VERSION, **header}))
+    for kind, cursor in sources:
+        async for doc in cursor:
+            buffer += _dumps({"type": kind, "data": doc})
+            if len(buffer) >= _EXPORT_CHUNK_BYTES:
+                yield bytes(buffer)
+                buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+async def iter_ndjson(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Parse NDJSON from a byte stream as it arrives.
+
+    Yields ``(line_number, row, error)`` with exactly one of ``row`` / ``error``
+    set. Blank lines are skipped; lines longer than ``MAX_LINE_BYTES`` are
+    reported and discarded without being buffered.
+    """
+    pending = bytearray()
+    line_no = 0
+    oversized = False
+
+    def parse(raw: bytes):
+        try:
+            row = json.loads(raw)
+        except ValueError as e:
+            return None, f"invalid JSON: {e}"
+        if not isinstance(row, dict):
+            return None, "expected a JSON object"
+        return row, None
+
+    async for chunk in chunks:
+        start = 0
+        while True:
+            end = chunk.find(b"\n", start)
+            if end < 0:
+                if not oversized:
+                    pending += chunk[start:]
+                    if len(pending) > MAX_LINE_BYTES:
+                        oversized = True
+                        pending.clear()
+                break
+            line_no += 1
+            if oversized:
+                oversized = False
+                yield line_no, None, f"line longer than {MAX_LINE_BYTES} bytes"
+            else:
+                pending += chunk[start:end]
+                if pending.strip():
+                    row, error = parse(bytes(pending))
+                    yield line_no, row, error
+                pending.clear()
+            start = end + 1
+
+    line_no += 1
+    if oversized:
+        yield line_no, None, f"line longer than {MAX_LINE_BYTES} bytes"
+    elif pending.strip():
+        row, error = parse(bytes(pending))
+        yield line_no, row, error
+
+
+class BulkImporter:
+    """Buffers upserts per row type and writes them with unordered ``bulk_write``.
+
+    Each buffered operation remembers the input line it came from, so write
+    errors are reported per row. Operations are expected to be
+    ``$setOnInsert`` upserts: rows that did not upsert a document are counted
+    as already existing.
+    """
+
+    def __init__(
+        self,
+        db,
+        collections: Dict[str, str],
+        depends_on: Optional[Dict[str, str]] = None,
+        on_inserted: Optional[Dict[str, Callable[[List[Any]], Awaitable[None]]]] = None,
+        batch_size: int = IMPORT_BATCH_SIZE,
+    ):
+        self._db = db
+        self._collections = collections  # row type -> collection name
+        self._depends_on = depends_on or {}  # row type -> type to flush first
+        self._on_inserted = on_inserted or {}
+        self._batch_size = batch_size
+        self._pending: Dict[str, List[Tuple[int, Any, Any]]] = {kind: [] for kind in collections}
+        self.inserted = {kind: 0 for kind in collections}
+        self.existing = {kind: 0 for kind in collections}
+        self.errors: List[dict] = []
+        self.error_count = 0
+
+    def error(self, line: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    async def add(self, kind: str, line: int, op, tag: Any = None):
+        """Queue ``op`` for ``kind``; ``tag`` is passed to ``on_inserted`` if it inserts."""
+        pending = self._pending[kind]
+        pending.append((line, op, tag))
+        if len(pending) >= self._batch_size:
+            await self.flush(kind)
+
+    async def flush(self, kind: Optional[str] = None):
+        if kind is None:
+            for name in self._collections:
+                await self.flush(name)
+            return
+        if kind in self._depends_on:
+            await self.flush(self._depends_on[kind])
+        batch = self._pending[kind]
+        if not batch:
+            return
+        self._pending[kind] = []
+
+        upserted = set()
+        failed = set()
+        try:
+            result = await self._db[self._collections[kind]].bulk_write(
+                [op for _, op, _ in batch], ordered=False
+            )
+            upserted.update(result.upserted_ids)
+        except BulkWriteError as e:
+            upserted.update(u["index"] for u in e.details.get("upserted", []))
+            for err in e.details.get("writeErrors", []):
+                failed.add(err["index"])
+                self.error(batch[err["index"]][0], err.get("errmsg", "write failed"))
+
+        tags = []
+        for index, (_, _, tag) in enumerate(batch):
+            if index in upserted:
+                tags.append(tag)
+            elif index not in failed:
+                self.existing[kind] += 1
+        self.inserted[kind] += len(tags)
+        if tags and kind in self._on_inserted:
+            await self._on_inserted[kind](tags)
+
+    def report(self, lines: int) -> dict:
+        return {
+            "lines": lines,
+            "inserted": self.inserted,
+            "existing": self.existing,
+            "error_count": self.error_count,
+            "errors": self.errors,
+        }
@@ -0,0 +1,253 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+SAMPLE_PATHS = tuple(p for p in os.environ.get("PROFILE_SAMPLE_PATHS", "").split(",") if p)
+INTERVAL = float(os.environ.get("PROFILE_INTERVAL_MS", "5")) / 1000
+RING_SIZE = int(os.environ.get("PROFILE_RING_SIZE", "50"))
+MAX_CONCURRENT = int(os.environ.get("PROFILE_MAX_CONCURRENT", "2"))
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", Path(__file__).parent / "profiles"))
+
+HEADER = b"x-profile"
+
+PROFILES_TAKEN = metrics.registry.register(metrics.Counter(
+    "request_profiles_total", "Requests profiled, by trigger.", ("trigger",),
+))
+
+
+def _label(code) -> str:
+    path = Path(code.co_filename)
+    return f"{code.co_qualname} ({path.parent.name}/{path.name}:{code.co_firstlineno})"
+
+
+def _task_branches(task: asyncio.Task, prefix: list) -> Iterator[list]:
+    """Stacks (root first) of a suspended task: its coroutine chain, then
+    what it is waiting on. Awaited tasks are followed, and each child of a
+    ``gather`` gets its own branch, so concurrent work shows up side by side."""
+    frames = list(prefix)
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "ag_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "ag_await", None) or getattr(coro, "gi_yieldfrom", None)
+        if coro is not None and not hasattr(coro, "send"):
+            break
+    # Only the innermost coroutine awaits a future, and the task records which
+    waiter = getattr(task, "_fut_waiter", None)
+    if isinstance(waiter, asyncio.Task):
+        yield from _task_branches(waiter, frames)
+        return
+    children = [t for t in getattr(waiter, "_children", None) or [] if isinstance(t, asyncio.Task) and not t.done()]
+    if children:
+        for child in children:
+            yield from _task_branches(child, frames + ["[gather]"])
+        return
+    if waiter is not None:
+        frames.append(f"[await {type(waiter).__name__}]")
+    yield frames
+
+
+class _Sampler(threading.Thread):
+    """Samples one request task from a side thread every ``INTERVAL``.
+
+    A sample where the event loop thread is executing the request's own
+    frames records that (on-CPU) stack; otherwise the request is suspended
+    and the sample records what it is awaiting.
+    """
+
+    def __init__(self, task: asyncio.Task, loop_thread: int):
+        super().__init__(name="request-profiler", daemon=True)
+        self._task = task
+        self._loop_thread = loop_thread
+        self._stop_event = threading.Event()
+        self.stacks: Counter = Counter()
+        self.running = 0
+        self.waiting = 0
+
+    def run(self):
+        while not self._stop_event.wait(INTERVAL):
+            try:
+                self._sample()
+            except Exception:
+                # The task's frames change under us; a torn read is just skipped
+                pass
+
+    def stop(self):
+        self._stop_event.set()
+        self.join(1.0)
+
+    def _sample(self):
+        branches = list(_task_branches(self._task, []))
+        # Frame -> the awaiting path above it (a running child task's stack
+        # starts at its own coroutine)
+        own = {
+            id(f): branch[:i]
+            for branch in branches for i, f in enumerate(branch) if not isinstance(f, str)
+        }
+        thread_stack = []
+        frame = sys._current_frames().get(self._loop_thread)
+        while frame is not None:
+            thread_stack.append(frame)
+            frame = frame.f_back
+        thread_stack.reverse()
+        if self._stop_event.is_set():
+            return  # the request is over; this would only show the profiler stopping
+        start = next((i for i, f in enumerate(thread_stack) if id(f) in own), None)
+        if start is not None:
+            self.running += 1
+            self._count(own[id(thread_stack[start])] + thread_stack[start:])
+            return
+        self.waiting += 1
+        for branch in branches:
+            self._count(branch)
+
+    def _count(self, stack: list):
+        self.stacks[";".join(f if isinstance(f, str) else _label(f.f_code) for f in stack)] += 1
+
+
+class ProfileStore:
+    """The last ``RING_SIZE`` profiles, one JSON file each under ``PROFILE_DIR``.
+
+    File names sort by creation time, so the ring is trimmed by name and is
+    shared by all workers using the directory.
+    """
+
+    def __init__(self, directory: Path = PROFILE_DIR, size: int = RING_SIZE):
+        self.directory = directory
+        self.size = size
+
+    def _files(self) -> List[Path]:
+        if not self.directory.is_dir():
+            return []
+        return sorted(self.directory.glob("*.json"))
+
+    def write(self, profile: dict):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"{profile['id']}.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(profile))
+        tmp.replace(path)
+        for old in self._files()[:-self.size]:
+            old.unlink(missing_ok=True)
+
+    def list(self) -> List[dict]:
+        summaries = []
+        for path in reversed(self._files()):
+            try:
+                profile = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue  # trimmed or half-written
+            profile.pop("folded", None)
+            profile.get("mongo", {}).pop("calls", None)
+            summaries.append(profile)
+        return summaries
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        if not profile_id.replace("-", "").isalnum():
+            return None
+        try:
+            return json.loads((self.directory / f"{profile_id}.json").read_text())
+        except (OSError, ValueError):
+            return None
+
+
+class ProfilingMiddleware:
+    """Profiles selected requests with a sampling profiler.
+
+    A request is profiled when it sends ``X-Profile: 1`` and ``authorize``
+    accepts its scope (admins only), or at random with probability
+    ``PROFILE_SAMPLE_RATE`` for paths under ``PROFILE_SAMPLE_PATHS`` (all
+    paths if unset). The profile holds the request's stacks in collapsed
+    ("folded") form, ready for flamegraph.pl or speedscope, how many
+    samples found it running versus awaiting, and each MongoDB command it
+    issued; the response carries its id in ``X-Profile-Id``. At most
+    ``PROFILE_MAX_CONCURRENT`` requests are profiled at once per worker.
+    Must sit inside ``MetricsMiddleware``, whose per-request stats carry
+    the command log.
+    """
+
+    def __init__(self, app, authorize: Callable[[dict], bool], store: Optional[ProfileStore] = None):
+        self.app = app
+        self.authorize = authorize
+        self.store = store or ProfileStore()
+        self.active = 0
+
+    def _trigger(self, scope) -> Optional[str]:
+        if any(k == HEADER and v in (b"1", b"true") for k, v in scope.get("headers", [])):
+            return "header" if self.authorize(scope) else None
+        if SAMPLE_RATE > 0 and scope["path"].startswith(SAMPLE_PATHS or ("/",)) and random.random() < SAMPLE_RATE:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or self.active >= MAX_CONCURRENT:
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        stats = metrics.current_request.get()
+        if trigger is None or stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        self.active += 1
+        profile_id = f"{int(time.time() * 1000):013d}-{uuid.uuid4().hex[:8]}"
+        status = {"code": 500}
+        stats.trace = []
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", profile_id.encode())]}
+            await send(message)
+
+        sampler = _Sampler(asyncio.current_task(), threading.get_ident())
+        started_at = datetime.now(timezone.utc).isoformat()
+        start = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start
+            sampler.stop()
+            self.active -= 1
+            profile = {
+                "id": profile_id,
+                "trigger": trigger,
+                "method": scope["method"],
+                "path": scope["path"],
+                "route": getattr(scope.get("route"), "path", "unmatched"),
+                "status": status["code"],
+                "started_at": started_at,
+                "duration_ms": round(duration * 1000, 2),
+                "interval_ms": INTERVAL * 1000,
+                "samples": {"running": sampler.running, "waiting": sampler.waiting},
+                "mongo": {
+                    "commands": stats.commands,
+                    "ms": round(stats.seconds * 1000, 2),
+                    "calls": stats.trace,
+                },
+                "folded": "\n".join(f"{stack} {n}" for stack, n in sampler.stacks.most_common()),
+            }
+            stats.trace = None
+            PROFILES_TAKEN.inc(trigger=trigger)
+            try:
+                await asyncio.to_thread(self.store.write, profile)
+            except OSError as e:
+                logger.warning("Could not store profile %s: %s", profile_id, e)
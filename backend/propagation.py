@@ -0,0 +1,79 @@
+import asyncio
+import logging
+import os
+from typing import Dict, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.environ.get("PROPAGATION_BATCH_SIZE", "500"))
+BATCH_DELAY = float(os.environ.get("PROPAGATION_BATCH_DELAY", "0.05"))  # seconds between batches
+
+# Where user fields are copied: (collection, field holding the user's email,
+# {copied field: user field})
+TARGETS: List[Tuple[str, str, Dict[str, str]]] = [
+    ("projects", "user_email", {"user_username": "username", "user_full_name": "full_name"}),
+    ("blogs", "author_email", {"author_username": "username", "author_full_name": "full_name"}),
+    ("comments", "author_email", {"author_username": "username", "author_full_name": "full_name"}),
+    ("follows", "follower_email", {"follower_username": "username"}),
+    ("follows", "following_email", {"following_username": "username"}),
+]
+
+# User fields with copies elsewhere; changing one of them needs a propagation job
+PROPAGATED_FIELDS = frozenset(f for _, _, fields in TARGETS for f in fields.values())
+
+
+class AuthorFieldPropagator:
+    """Keeps the user names embedded in other collections up to date.
+
+    Projects, blogs, comments and follows carry copies of their owner's
+    name so listings need no join. When a profile change touches one of
+    ``PROPAGATED_FIELDS`` the handler calls ``enqueue(email)``, which queues
+    a ``propagate`` job deduplicated per user; the job rewrites the stale
+    copies in throttled batches. The values are read from the user document
+    when the job runs, so repeated edits collapse into one pending job and a
+    retried or concurrent run just finds nothing left to change. A change
+    arriving while its job runs queues a new one, which runs again.
+    """
+
+    QUEUE = "propagate"
+
+    def __init__(self, db, jobs):
+        self._db = db
+        self._jobs = jobs
+        jobs.register(self.QUEUE, self.process)
+
+    async def enqueue(self, email: str):
+        await self._jobs.enqueue(self.QUEUE, {"email": email}, dedupe_key=f"propagate:{email}")
+
+    async def adopt_legacy_jobs(self):
+        """Move requests left in ``propagation_jobs`` by older versions onto the queue."""
+        async for legacy in self._db.propagation_jobs.find({}, {"_id": 1}):
+            await self.enqueue(legacy["_id"])
+            await self._db.propagation_jobs.delete_one({"_id": legacy["_id"]})
+
+    async def process(self, job):
+        email = job.payload["email"]
+        user = await self._db.users.find_one({"email": email}, {"_id": 0, "username": 1, "full_name": 1})
+        if user is None:
+            return  # a deleted user's content goes with the cascade delete
+        updated = 0
+        for collection, email_field, fields in TARGETS:
+            values = {copy: user[source] for copy, source in fields.items() if source in user}
+            if values:
+                updated += await self._rewrite(self._db[collection], email_field, email, values)
+        if updated:
+            logger.info("Propagated profile fields of %s to %d documents", email, updated)
+
+    async def _rewrite(self, collection, email_field: str, email: str, values: dict) -> int:
+        """Set ``values`` on every document of ``email`` that has a stale copy, a batch at a time."""
+        stale = {email_field: email, "$or": [{field: {"$ne": value}} for field, value in values.items()]}
+        total = 0
+        while True:
+            batch = await collection.find(stale, {"_id": 1}).limit(BATCH_SIZE).to_list(BATCH_SIZE)
+            if not batch:
+                return total
+            result = await collection.update_many(
+                {"_id": {"$in": [d["_id"] for d in batch]}}, {"$set": values}
+            )
+            total += result.modified_count
+            await asyncio.sleep(BATCH_DELAY)
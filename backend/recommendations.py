@@ -0,0 +1,374 @@
+import asyncio
+import logging
+import math
+import os
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TOP_K = int(os.environ.get("RECOMMEND_TOP_K", "10"))
+BATCH_ROWS = int(os.environ.get("RECOMMEND_BATCH_ROWS", "256"))
+# Cap on one dense similarity block (rows x items); batches shrink as the
+# catalogue grows so a block stays around 50 MB at the default
+MAX_CELLS = int(os.environ.get("RECOMMEND_MAX_CELLS", str(4_000_000)))
+REFRESH_SECONDS = float(os.environ.get("RECOMMEND_REFRESH_SECONDS", "5"))
+REBUILD_SECONDS = float(os.environ.get("RECOMMEND_REBUILD_SECONDS", "3600"))
+# Features in more than this share of items (e.g. a category every other post
+# uses) say little about relatedness and make the products dense
+MAX_DF_RATIO = 0.3
+MAX_TERMS = 40  # body terms kept per item, by weight
+BODY_CHARS = 4000
+
+TAG_WEIGHT = 3.0
+CATEGORY_WEIGHT = 1.0
+TITLE_WEIGHT = 2.0
+
+_WORD = re.compile(r"[a-z][a-z0-9+#]{2,}")
+_STOPWORDS = frozenset("""
+    the and for with that this from your you are was were has have had not but can will
+    into out about how what when where which who why all any our their them they its
+    use using used just more most also than then there here very much some such only
+    one two new get got like make made way being been over under each other these those
+""".split())
+
+RELATED_EVENTS = ("blog:new", "blog:updated", "blog:deleted", "project:new", "project:updated", "project:deleted")
+
+Key = Tuple[str, str]  # (kind, id) with kind "blog" or "project"
+
+
+def _terms(text: str) -> Counter:
+    return Counter(w for w in _WORD.findall(text.lower()) if w not in _STOPWORDS)
+
+
+def raw_features(kind: str, doc: dict) -> Dict[str, float]:
+    """Unweighted features: shared ``t:`` topics (blog tags and project tech
+    stack, so blogs and projects relate to each other), ``c:`` category, and
+    ``w:`` words from the title and body."""
+    features: Dict[str, float] = {}
+    topics = doc.get("tags") if kind == "blog" else doc.get("tech_stack")
+    for topic in topics or []:
+        if isinstance(topic, str) and topic.strip():
+            features[f"t:{topic.strip().lower()}"] = TAG_WEIGHT
+    if doc.get("category"):
+        features[f"c:{str(doc['category']).lower()}"] = CATEGORY_WEIGHT
+    body = doc.get("content_markdown") if kind == "blog" else doc.get("description")
+    words = _terms((body or "")[:BODY_CHARS])
+    for word, count in _terms(doc.get("title") or "").items():
+        words[word] += count * TITLE_WEIGHT
+    for word, count in words.most_common(MAX_TERMS):
+        features[f"w:{word}"] = 1.0 + math.log(count)
+    return features
+
+
+class _Index:
+    """Item vectors as CSR (by item) and CSC (by feature) NumPy arrays."""
+
+    def __init__(self, keys: List[Key], vectors: List[Dict[int, float]], n_features: int):
+        self.keys = keys
+        self.rows = {key: i for i, key in enumerate(keys)}
+        lengths = np.fromiter((len(v) for v in vectors), dtype=np.int64, count=len(vectors))
+        self.indptr = np.zeros(len(vectors) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.indptr[1:])
+        self.indices = np.fromiter((f for v in vectors for f in v), dtype=np.int64, count=int(lengths.sum()))
+        self.data = np.fromiter((w for v in vectors for w in v.values()), dtype=np.float32, count=int(lengths.sum()))
+
+        row_of = np.repeat(np.arange(len(vectors), dtype=np.int64), lengths)
+        order = np.argsort(self.indices, kind="stable")
+        self.col_rows = row_of[order]
+        self.col_data = self.data[order]
+        self.col_ptr = np.zeros(n_features + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.indices, minlength=n_features), out=self.col_ptr[1:])
+
+    def similarities(self, rows: np.ndarray) -> np.ndarray:
+        """Cosine similarity of each of ``rows`` against every item (``len(rows) x n``)."""
+        starts, ends = self.indptr[rows], self.indptr[rows + 1]
+        counts = ends - starts
+        local = np.repeat(np.arange(len(rows)), counts)
+        pos = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(int(counts.sum()))
+        feats, weights = self.indices[pos], self.data[pos]
+
+        # Every (query row, item) pair sharing a feature, via the feature's postings
+        post_len = self.col_ptr[feats + 1] - self.col_ptr[feats]
+        total = int(post_len.sum())
+        post_pos = (
+            np.repeat(self.col_ptr[feats] - np.cumsum(post_len) + post_len, post_len)
+            + np.arange(total)
+        )
+        n = len(self.keys)
+        # bincount over flattened (row, item) cells sums the products far faster than np.add.at
+        cells = np.repeat(local, post_len) * n + self.col_rows[post_pos]
+        products = np.repeat(weights, post_len) * self.col_data[post_pos]
+        scores = np.bincount(cells, weights=products, minlength=len(rows) * n)
+        scores = scores.reshape(len(rows), n).astype(np.float32)
+        scores[np.arange(len(rows)), rows] = 0.0  # not related to itself
+        return scores
+
+    def batches(self, rows: np.ndarray) -> Iterable[np.ndarray]:
+        """Split ``rows`` so each ``similarities`` block stays under ``MAX_CELLS``."""
+        size = max(1, min(BATCH_ROWS, MAX_CELLS // max(len(self.keys), 1)))
+        for start in range(0, len(rows), size):
+            yield rows[start:start + size]
+
+
+def _top_k(scores: np.ndarray, k: int) -> List[List[Tuple[int, float]]]:
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return [[] for _ in range(scores.shape[0])]
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_scores, axis=1)
+    top, top_scores = np.take_along_axis(top, order, axis=1), np.take_along_axis(top_scores, order, axis=1)
+    return [
+        [(int(j), float(s)) for j, s in zip(row, row_scores) if s > 0]
+        for row, row_scores in zip(top, top_scores)
+    ]
+
+
+class RelatedContent:
+    """Precomputed "related" lists for published blogs and all projects.
+
+    ``rebuild()`` loads every item, fits feature weights (TF-IDF style, with
+    features in more than ``MAX_DF_RATIO`` of items dropped), and computes
+    each item's ``TOP_K`` neighbours by cosine similarity in ``BATCH_ROWS``
+    sized NumPy batches off the event loop. Between rebuilds, blog/project
+    events mark items dirty; ``refresh()`` re-reads them, recomputes their
+    vectors with the current weights and their own neighbour lists, and
+    splices them into (or out of) other items' lists using the same
+    similarity row. Lists live in process memory; ``related()`` is a dict
+    lookup.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._features: Dict[str, int] = {}
+        self._idf: Dict[str, float] = {}
+        self._default_idf = 1.0
+        self._vectors: Dict[Key, Dict[int, float]] = {}
+        self._meta: Dict[Key, dict] = {}
+        self._neighbours: Dict[Key, List[Tuple[Key, float]]] = {}
+        self._by_object_id: Dict[str, Key] = {}
+        self._dirty: set = set()
+        self._wakeup = asyncio.Event()
+        self.ready = False
+
+    # -- reads --------------------------------------------------------------
+
+    def related(self, kind: str, item_id: str, limit: int = TOP_K) -> List[dict]:
+        result = []
+        for key, score in self._neighbours.get((kind, item_id), [])[:limit]:
+            meta = self._meta.get(key)
+            if meta is not None:
+                result.append({"kind": key[0], "id": key[1], "score": round(score, 4), **meta})
+        return result
+
+    # -- events -------------------------------------------------------------
+
+    def observe(self, event: dict):
+        """Mark the item an SSE-bus event refers to for the next refresh."""
+        if event.get("type") not in RELATED_EVENTS:
+            return
+        kind = event["type"].split(":", 1)[0]
+        data = event.get("data") or {}
+        item_id = data.get(f"{kind}_id")
+        if item_id is None and data.get("id"):
+            # Change-stream deletes only carry the Mongo _id
+            key = self._by_object_id.get(str(data["id"]))
+            item_id = key[1] if key else None
+        if item_id:
+            self._dirty.add((kind, item_id))
+            self._wakeup.set()
+
+    # -- loading ------------------------------------------------------------
+
+    async def _load(self, kind: str, ids: Optional[Iterable[str]] = None) -> List[dict]:
+        collection, id_field = (self._db.blogs, "blog_id") if kind == "blog" else (self._db.projects, "project_id")
+        query = {"status": "published"} if kind == "blog" else {}
+        if ids is not None:
+            query[id_field] = {"$in": list(ids)}
+        projection = {
+            "_id": 1, id_field: 1, "title": 1, "category": 1,
+            "tags": 1, "tech_stack": 1, "slug": 1, "author_username": 1, "user_username": 1,
+            # Only the part of the body the features look at
+            "content_markdown": {"$substrCP": ["$content_markdown", 0, BODY_CHARS]},
+            "description": 1,
+        }
+        return await collection.find(query, projection).to_list(None)
+
+    @staticmethod
+    def _remember(kind: str, doc: dict, meta: dict, by_object_id: dict) -> Key:
+        key = (kind, doc["blog_id"] if kind == "blog" else doc["project_id"])
+        meta[key] = {
+            "title": doc.get("title", ""),
+            "slug": doc.get("slug"),
+            "author_username": doc.get("author_username") or doc.get("user_username"),
+        }
+        by_object_id[str(doc["_id"])] = key
+        return key
+
+    @staticmethod
+    def _vector(
+        raw: Dict[str, float], idf: Dict[str, float], default_idf: float, features: Dict[str, int],
+    ) -> Dict[int, float]:
+        weighted = {}
+        for feature, weight in raw.items():
+            factor = idf.get(feature, default_idf)
+            if factor <= 0:
+                continue  # dropped as too common
+            index = features.setdefault(feature, len(features))
+            weighted[index] = weight * factor
+        norm = math.sqrt(sum(w * w for w in weighted.values())) or 1.0
+        return {i: w / norm for i, w in weighted.items()}
+
+    # -- full rebuild -------------------------------------------------------
+
+    async def rebuild(self):
+        blogs, projects = await asyncio.gather(self._load("blog"), self._load("project"))
+        self._dirty.clear()
+        await asyncio.to_thread(self._rebuild, blogs, projects)
+        self.ready = True
+        logger.info("Related content rebuilt for %d items", len(self._vectors))
+
+    def _rebuild(self, blogs: List[dict], projects: List[dict]):
+        # Built aside and swapped in at the end, so reads never see a half-built state
+        meta, by_object_id = {}, {}
+        raws: Dict[Key, Dict[str, float]] = {}
+        for kind, docs in (("blog", blogs), ("project", projects)):
+            for doc in docs:
+                raws[self._remember(kind, doc, meta, by_object_id)] = raw_features(kind, doc)
+
+        n = len(raws)
+        df = Counter(feature for raw in raws.values() for feature in raw)
+        idf = {
+            feature: (math.log((1 + n) / (1 + count)) + 1.0 if count <= max(2, MAX_DF_RATIO * n) else 0.0)
+            for feature, count in df.items()
+        }
+        default_idf = math.log(1 + n) + 1.0  # unseen until now, so maximally specific
+        features: Dict[str, int] = {}
+        keys = list(raws)
+        vectors = [self._vector(raws[key], idf, default_idf, features) for key in keys]
+
+        index = _Index(keys, vectors, len(features))
+        neighbours = {}
+        for rows in index.batches(np.arange(n)):
+            for row, top in zip(rows, _top_k(index.similarities(rows), TOP_K)):
+                neighbours[keys[row]] = [(keys[j], s) for j, s in top]
+
+        self._idf, self._default_idf, self._features = idf, default_idf, features
+        self._vectors = dict(zip(keys, vectors))
+        self._meta, self._by_object_id, self._neighbours = meta, by_object_id, neighbours
+
+    # -- incremental refresh ------------------------------------------------
+
+    async def refresh(self):
+        if not self._dirty or not self.ready:
+            return
+        dirty, self._dirty = self._dirty, set()
+        try:
+            docs = {}
+            for kind in ("blog", "project"):
+                ids = [item_id for k, item_id in dirty if k == kind]
+                if ids:
+                    docs[kind] = await self._load(kind, ids)
+            await asyncio.to_thread(self._refresh, dirty, docs)
+        except Exception:
+            self._dirty |= dirty
+            raise
+
+    def _refresh(self, dirty: set, docs: Dict[str, List[dict]]):
+        # Like _rebuild, work on copies and swap them in at the end: related()
+        # reads the lists on the event loop while this runs in a thread
+        meta, by_object_id = dict(self._meta), dict(self._by_object_id)
+        vectors, features = dict(self._vectors), dict(self._features)
+        current = {}
+        for kind, kind_docs in docs.items():
+            for doc in kind_docs:
+                current[self._remember(kind, doc, meta, by_object_id)] = raw_features(kind, doc)
+
+        # Drop the old versions of every dirty item from other lists; a list
+        # that loses an entry is recomputed below so it fills up again
+        for key in dirty:
+            vectors.pop(key, None)
+            if key not in current:
+                meta.pop(key, None)
+        neighbours, shrunk = {}, set()
+        for key, items in self._neighbours.items():
+            if key in dirty:
+                continue
+            if any(other in dirty for other, _ in items):
+                items = [(other, s) for other, s in items if other not in dirty]
+                shrunk.add(key)
+            neighbours[key] = items
+
+        for key, raw in current.items():
+            vectors[key] = self._vector(raw, self._idf, self._default_idf, features)
+
+        recompute = list(current) + [key for key in shrunk if key in vectors and key not in current]
+        if recompute:
+            keys = list(vectors)
+            index = _Index(keys, [vectors[k] for k in keys], len(features))
+            recomputed = set(recompute)
+            for rows in index.batches(np.array([index.rows[key] for key in recompute])):
+                scores = index.similarities(rows)
+                for row, top in zip(rows, _top_k(scores, TOP_K)):
+                    neighbours[keys[row]] = [(keys[j], s) for j, s in top]
+
+                # Similarity is symmetric: the same rows say where each changed
+                # item now belongs in everyone else's list
+                for row_scores, row in zip(scores, rows):
+                    key = keys[row]
+                    if key not in current:
+                        continue  # only refilled; its vector did not change
+                    for j in np.flatnonzero(row_scores > 0):
+                        other = keys[j]
+                        if other in recomputed:
+                            continue
+                        items = neighbours.get(other, [])
+                        score = float(row_scores[j])
+                        if len(items) < TOP_K or score > items[-1][1]:
+                            # A new list: the old one may be in a reader's hands
+                            neighbours[other] = sorted(items + [(key, score)], key=lambda item: -item[1])[:TOP_K]
+
+        self._features, self._vectors = features, vectors
+        self._meta, self._by_object_id, self._neighbours = meta, by_object_id, neighbours
+
+    # -- background loop ----------------------------------------------------
+
+    async def run(self, event_bus):
+        """Build once, then apply events at most every ``REFRESH_SECONDS`` and
+        rebuild every ``REBUILD_SECONDS`` until cancelled."""
+        queue = await event_bus.subscribe()
+        consumer = asyncio.create_task(self._consume(queue))
+        loop = asyncio.get_running_loop()
+        next_rebuild = loop.time()
+        try:
+            while True:
+                try:
+                    if loop.time() >= next_rebuild:
+                        await self.rebuild()
+                        next_rebuild = loop.time() + REBUILD_SECONDS
+                    else:
+                        await self.refresh()
+                except Exception as e:
+                    logger.error("Related content refresh failed: %s", e)
+                    if not self.ready:
+                        next_rebuild = loop.time() + REFRESH_SECONDS * 12
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max(next_rebuild - loop.time(), 0.0))
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                # Let a burst of events collect into one refresh
+                await asyncio.sleep(REFRESH_SECONDS)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            consumer.cancel()
+            event_bus.unsubscribe(queue)
+
+    async def _consume(self, queue: asyncio.Queue):
+        while True:
+            self.observe(await queue.get())
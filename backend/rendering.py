@@ -0,0 +1,144 @@
+import hashlib
+import re
+from collections import OrderedDict
+from typing import Optional
+
+from markdown_it import MarkdownIt
+from pygments import highlight
+from pygments.formatters import HtmlFormatter
+from pygments.lexers import get_lexer_by_name
+from pygments.util import ClassNotFound
+
+# Bump when the HTML output changes so stored renders are rebuilt on next read
+RENDER_VERSION = "1"
+WORDS_PER_MINUTE = 238
+EXCERPT_LENGTH = 200
+TOC_LEVELS = (1, 2, 3)
+
+_formatter = HtmlFormatter(style="one-dark", noclasses=True, nowrap=True)
+
+
+def _highlight(code: str, lang: str, attrs) -> str:
+    if not lang:
+        return ""
+    try:
+        lexer = get_lexer_by_name(lang)
+    except ClassNotFound:
+        return ""
+    return highlight(code, lexer, _formatter)
+
+
+# Raw HTML in the source is escaped and unsafe link schemes are rejected,
+# so the output needs no separate sanitizing pass.
+_md = (
+    MarkdownIt("commonmark", {"html": False, "highlight": _highlight})
+    .enable(["table", "strikethrough"])
+)
+
+
+def content_hash(markdown: str) -> str:
+    """Hash of the source plus the renderer version."""
+    return hashlib.sha256(f"{RENDER_VERSION}\0{markdown}".encode("utf-8")).hexdigest()
+
+
+def calculate_reading_time(word_count: int) -> int:
+    """Estimate reading time in minutes (238 wpm average)."""
+    return max(1, round(word_count / WORDS_PER_MINUTE))
+
+
+def _slugify(text: str) -> str:
+    slug = re.sub(r"[^\w\s-]", "", text.lower()).strip()
+    return re.sub(r"[\s_-]+", "-", slug) or "section"
+
+
+def _inline_text(token) -> str:
+    return "".join(
+        child.content for child in token.children or []
+        if child.type in ("text", "code_inline")
+    )
+
+
+def _excerpt(text: str) -> str:
+    text = " ".join(text.split())
+    if len(text) <= EXCERPT_LENGTH:
+        return text
+    cut = text[:EXCERPT_LENGTH].rsplit(" ", 1)[0]
+    return cut.rstrip(".,;:") + "…"
+
+
+def _render(markdown: str) -> dict:
+    env = {}
+    tokens = _md.parse(markdown, env)
+
+    toc = []
+    used_ids = {}
+    words = 0
+    excerpt = None
+    for i, token in enumerate(tokens):
+        if token.type == "heading_open":
+            level = int(token.tag[1])
+            text = _inline_text(tokens[i + 1])
+            base = _slugify(text)
+            n = used_ids.get(base, 0)
+            used_ids[base] = n + 1
+            anchor = base if n == 0 else f"{base}-{n}"
+            token.attrSet("id", anchor)
+            if level in TOC_LEVELS:
+                toc.append({"level": level, "text": text, "id": anchor})
+        elif token.type == "inline":
+            text = _inline_text(token)
+            words += len(text.split())
+            if excerpt is None and i > 0 and tokens[i - 1].type == "paragraph_open":
+                excerpt = _excerpt(text)
+        elif token.type in ("fence", "code_block"):
+            words += len(token.content.split())
+
+    return {
+        "content_html": _md.renderer.render(tokens, _md.options, env),
+        "toc": toc,
+        "excerpt": excerpt or "",
+        "word_count": words,
+        "reading_time_minutes": calculate_reading_time(words),
+    }
+
+
+class RenderCache:
+    """Size-bounded LRU of renders keyed by content hash.
+
+    Published renders are stored on the blog document, so this mostly serves
+    drafts, which are re-saved and previewed with the same content many times.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self._maxsize = maxsize
+        self._items: "OrderedDict[str, dict]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[dict]:
+        item = self._items.get(key)
+        if item is not None:
+            self._items.move_to_end(key)
+        return item
+
+    def put(self, key: str, value: dict):
+        self._items[key] = value
+        self._items.move_to_end(key)
+        while len(self._items) > self._maxsize:
+            self._items.popitem(last=False)
+
+
+_cache = RenderCache()
+
+
+def render_markdown(markdown: str) -> dict:
+    """Render Markdown to the fields stored alongside ``content_markdown``.
+
+    Returns ``content_html``, ``toc``, ``excerpt``, ``word_count``,
+    ``reading_time_minutes`` and ``content_hash``.
+    """
+    key = content_hash(markdown)
+    rendered = _cache.get(key)
+    if rendered is None:
+        rendered = _render(markdown)
+        rendered["content_hash"] = key
+        _cache.put(key, rendered)
+    return dict(rendered)
@@ -0,0 +1,317 @@
+import logging
+import os
+from datetime import datetime
+from typing import List, Optional, Tuple, Union
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_EVERY = int(os.environ.get("BLOG_SNAPSHOT_EVERY", "20"))
+COALESCE_SECONDS = float(os.environ.get("BLOG_AUTOSAVE_COALESCE_SECONDS", "30"))
+COALESCE_MAX_SECONDS = float(os.environ.get("BLOG_AUTOSAVE_COALESCE_MAX_SECONDS", "600"))
+
+# A delta is a list of ops applied left to right over the base text: a
+# positive int keeps that many characters, a negative int drops that many,
+# a str is inserted. Whatever follows the last op is kept.
+Delta = List[Union[int, str]]
+
+
+class DeltaError(ValueError):
+    pass
+
+
+class RevisionConflict(Exception):
+    """The blog moved past the revision a save was based on."""
+
+    def __init__(self, revision: int):
+        super().__init__(f"blog is at revision {revision}")
+        self.revision = revision
+
+
+def _is_count(op) -> bool:
+    return isinstance(op, int) and not isinstance(op, bool)
+
+
+def normalize(delta: Delta) -> Delta:
+    out: Delta = []
+    for op in delta:
+        if op == 0 or op == "":
+            continue
+        if out and isinstance(op, str) and isinstance(out[-1], str):
+            out[-1] += op
+        elif out and _is_count(op) and _is_count(out[-1]) and (op > 0) == (out[-1] > 0):
+            out[-1] += op
+        else:
+            out.append(op)
+    while out and _is_count(out[-1]) and out[-1] > 0:
+        out.pop()
+    return out
+
+
+def from_utf16(text: str, delta: list) -> Delta:
+    """Convert a delta counted in UTF-16 code units (JavaScript string
+    indices) over ``text`` into one counted in characters."""
+    units = text.encode("utf-16-le")
+    pos = 0
+    out: Delta = []
+    for op in delta:
+        if isinstance(op, str):
+            try:
+                op.encode("utf-8")
+            except UnicodeEncodeError:
+                raise DeltaError("inserted text contains an unpaired surrogate")
+            out.append(op)
+            continue
+        if not _is_count(op):
+            raise DeltaError("ops must be integers or strings")
+        end = pos + abs(op)
+        if end * 2 > len(units):
+            raise DeltaError("delta runs past the end of the base text")
+        try:
+            chars = len(units[pos * 2:end * 2].decode("utf-16-le"))
+        except UnicodeDecodeError:
+            raise DeltaError("delta splits a surrogate pair")
+        out.append(chars if op > 0 else -chars)
+        pos = end
+    try:
+        units[pos * 2:].decode("utf-16-le")
+    except UnicodeDecodeError:
+        raise DeltaError("delta splits a surrogate pair")
+    return normalize(out)
+
+
+def apply(text: str, delta: Delta) -> str:
+    pos = 0
+    parts = []
+    for op in delta:
+        if isinstance(op, str):
+            parts.append(op)
+            continue
+        end = pos + abs(op)
+        if end > len(text):
+            raise DeltaError("delta runs past the end of the base text")
+        if op > 0:
+            parts.append(text[pos:end])
+        pos = end
+    parts.append(text[pos:])
+    return "".join(parts)
+
+
+def diff(old: str, new: str) -> Delta:
+    """A single-edit delta from ``old`` to ``new`` (common prefix and suffix kept)."""
+    limit = min(len(old), len(new))
+    prefix = 0
+    while prefix < limit and old[prefix] == new[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < limit - prefix and old[-1 - suffix] == new[-1 - suffix]:
+        suffix += 1
+    return normalize([prefix, -(len(old) - prefix - suffix), new[prefix:len(new) - suffix]])
+
+
+def compose(first: Delta, second: Delta) -> Delta:
+    """One delta with the effect of ``first`` followed by ``second``."""
+    ops = list(first)
+    i = offset = 0
+    out: Delta = []
+
+    def pass_deletes():
+        nonlocal i
+        while i < len(ops) and _is_count(ops[i]) and ops[i] < 0:
+            out.append(ops[i])
+            i += 1
+
+    def take(n: int):
+        # Up to n characters of first's output: inserted text or a kept count
+        nonlocal i, offset
+        pass_deletes()
+        if i == len(ops):
+            return n
+        op = ops[i]
+        if isinstance(op, str):
+            piece = op[offset:offset + n]
+            size = len(piece)
+        else:
+            piece = size = min(n, op - offset)
+        offset += size
+        if offset == (len(op) if isinstance(op, str) else op):
+            i, offset = i + 1, 0
+        return piece
+
+    for op in second:
+        if isinstance(op, str):
+            out.append(op)
+            continue
+        remaining = abs(op)
+        while remaining:
+            piece = take(remaining)
+            remaining -= len(piece) if isinstance(piece, str) else piece
+            if op > 0:
+                out.append(piece)
+            elif not isinstance(piece, str):
+                out.append(-piece)
+            # Deleting text that first inserted leaves nothing behind
+    pass_deletes()
+    if i < len(ops):
+        op = ops[i]
+        out.append(op[offset:] if isinstance(op, str) else op - offset)
+        out.extend(ops[i + 1:])
+    return normalize(out)
+
+
+def _delta_size(delta: Delta) -> int:
+    return sum(len(op) if isinstance(op, str) else 4 for op in delta)
+
+
+def _parse(value: str) -> datetime:
+    return datetime.fromisoformat(value)
+
+
+class BlogRevisions:
+    """Version history of blog bodies in ``blog_revisions``.
+
+    Each save stores the delta from the previous revision; every
+    ``SNAPSHOT_EVERY`` revisions (or when a delta would be larger than half
+    the text) the full text is stored instead, so reading any version
+    replays at most that many deltas. Saves by the same author within
+    ``COALESCE_SECONDS`` of each other are folded into the last delta (for
+    at most ``COALESCE_MAX_SECONDS``), so an autosaving editor leaves one
+    version per editing burst rather than one per keystroke pause.
+
+    ``blogs.revision`` is the number of the current text; a save names the
+    revision it was made against and fails with ``RevisionConflict`` if the
+    blog has moved on. The history entry is claimed before the blog is
+    written, so of two saves against the same revision exactly one wins.
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    async def save(
+        self, blog: dict, text: str, delta: Delta, author_email: str, fields: dict, now: datetime,
+    ) -> Tuple[int, bool]:
+        """Write ``text`` (``delta`` applied to the blog's body) and ``fields``
+        to ``blog``; returns the new revision and whether it was coalesced."""
+        base = blog.get("revision", 0)
+        entries = self._db.blog_revisions
+        last = await entries.find_one({"blog_id": blog["blog_id"]}, sort=[("revision", -1)])
+        if last is not None and last["revision"] > base:
+            raise RevisionConflict(last["revision"])
+        if last is None or last["revision"] < base:
+            # History starts here (the blog predates it): keep the base text
+            await entries.update_one(
+                {"blog_id": blog["blog_id"], "revision": base},
+                {"$setOnInsert": self._entry(
+                    blog["blog_id"], base, author_email, now, content=blog.get("content_markdown", ""),
+                )},
+                upsert=True,
+            )
+            last = None
+
+        revision = base + 1
+        coalesced = (
+            last is not None
+            and last["kind"] == "delta"
+            and last["author_email"] == author_email
+            and (now - _parse(last["updated_at"])).total_seconds() <= COALESCE_SECONDS
+            and (now - _parse(last["created_at"])).total_seconds() <= COALESCE_MAX_SECONDS
+        )
+        if coalesced:
+            result = await entries.update_one(
+                {"_id": last["_id"], "revision": base},
+                {
+                    "$set": {
+                        "revision": revision,
+                        "delta": compose(last["delta"], delta),
+                        "length": len(text),
+                        "updated_at": now.isoformat(),
+                    },
+                    "$inc": {"saves": 1},
+                },
+            )
+            if not result.modified_count:
+                raise RevisionConflict(base + 1)
+        else:
+            chain = 0 if last is None or last["kind"] == "snapshot" else last["chain"] + 1
+            if chain >= SNAPSHOT_EVERY or _delta_size(delta) > len(text) // 2:
+                entry = self._entry(blog["blog_id"], revision, author_email, now, content=text)
+            else:
+                entry = self._entry(
+                    blog["blog_id"], revision, author_email, now, delta=delta, chain=chain, length=len(text),
+                )
+            try:
+                await entries.insert_one(entry)
+            except DuplicateKeyError:
+                raise RevisionConflict(revision)
+
+        match = {"blog_id": blog["blog_id"], "revision": base if base else {"$in": [0, None]}}
+        result = await self._db.blogs.update_one(
+            match, {"$set": {**fields, "content_markdown": text, "revision": revision}},
+        )
+        if not result.matched_count:
+            # Deleted or changed underneath us; give the history entry back
+            if coalesced:
+                restore = {"$set": {"revision": base, "delta": last["delta"], "updated_at": last["updated_at"]}}
+                if last.get("length") is None:
+                    # Written before delta entries carried a length
+                    restore["$unset"] = {"length": ""}
+                else:
+                    restore["$set"]["length"] = last["length"]
+                await entries.update_one(
+                    {"_id": last["_id"], "revision": revision}, {**restore, "$inc": {"saves": -1}},
+                )
+            else:
+                await entries.delete_one({"blog_id": blog["blog_id"], "revision": revision})
+            raise RevisionConflict(revision)
+        return revision, coalesced
+
+    @staticmethod
+    def _entry(blog_id: str, revision: int, author_email: str, now: datetime,
+               content: Optional[str] = None, delta: Optional[Delta] = None, chain: int = 0,
+               length: Optional[int] = None) -> dict:
+        entry = {
+            "blog_id": blog_id,
+            "revision": revision,
+            "kind": "snapshot" if content is not None else "delta",
+            "chain": chain,
+            "author_email": author_email,
+            "saves": 1,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+        }
+        if content is not None:
+            entry.update(content=content, length=len(content))
+        else:
+            entry.update(delta=delta, length=length)
+        return entry
+
+    async def history(self, blog_id: str, limit: int, before: Optional[int] = None) -> List[dict]:
+        query = {"blog_id": blog_id}
+        if before is not None:
+            query["revision"] = {"$lt": before}
+        return await (
+            self._db.blog_revisions.find(query, {"_id": 0, "delta": 0, "content": 0, "chain": 0})
+            .sort("revision", -1)
+            .limit(limit)
+            .to_list(limit)
+        )
+
+    async def content_at(self, blog_id: str, revision: int) -> Optional[str]:
+        """The body as of ``revision``, or None if that version was not kept."""
+        snapshot = await self._db.blog_revisions.find_one(
+            {"blog_id": blog_id, "kind": "snapshot", "revision": {"$lte": revision}},
+            sort=[("revision", -1)],
+        )
+        if snapshot is None:
+            return None
+        text = snapshot["content"]
+        if snapshot["revision"] == revision:
+            return text
+        last = snapshot["revision"]
+        async for entry in self._db.blog_revisions.find(
+            {"blog_id": blog_id, "revision": {"$gt": snapshot["revision"], "$lte": revision}},
+        ).sort("revision", 1):
+            text = apply(text, entry["delta"])
+            last = entry["revision"]
+        return text if last == revision else None
@@ -9,29 +9,55 @@ if not hasattr(bcrypt, "__about__"):
     bcrypt.__about__ = type("About", (object,), {"__version__": bcrypt.__version__})
 
 import asyncio
+import hashlib
 import re
+import shutil
+import time
 import uuid
 import os
 from pathlib import Path
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Literal, Optional, Union
 
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, File, UploadFile, Query
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, File, UploadFile, Query, Request, WebSocket
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 from dotenv import load_dotenv
-from pydantic import BaseModel, Field, EmailStr, ConfigDict
+from pydantic import BaseModel, Field, EmailStr, ConfigDict, StrictInt, StrictStr
 from passlib.context import CryptContext
 from jose import JWTError, jwt
+from bson import ObjectId
+from pymongo import IndexModel, UpdateOne
+from pydantic import ValidationError
+from pymongo.errors import DuplicateKeyError
 
-from database import db, client
+from database import db, client, listing_db
 
 
-from starlette.responses import StreamingResponse
+from starlette.responses import JSONResponse, PlainTextResponse, StreamingResponse
 from events import event_bus
-import json
+from cascade import CascadeDeleter, referenced_uploads
+from jobs import JobQueue
+from rendering import content_hash, render_markdown
+import revisions
+from revisions import BlogRevisions, RevisionConflict
+from portability import BulkImporter, export_ndjson, iter_ndjson
+from propagation import PROPAGATED_FIELDS, AuthorFieldPropagator
+from view_stats import ViewRecorder
+from user_stats import UserStats, blog_change_affects_stats
+from facets import FIELDS as FACET_FIELDS, FacetCounter
+from recommendations import RelatedContent
+from hot_cache import HotDocumentCache, cache_size
+import batch
+from sse import ConnectionRejected, SSEConnectionManager
+import ws_stream
+from compression import CompressionMiddleware
+from uploads import IMAGE_EXTENSIONS, IMAGE_HEAD_BYTES, UploadFiles, image_info
+from logging_config import configure_logging, shutdown_logging
+from profiling import ProfileStore, ProfilingMiddleware
+from slow_ops import slow_operations
+import metrics
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -40,10 +66,7 @@ import json
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / ".env")
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Security
@@ -53,6 +76,12 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
 
 security = HTTPBearer()
+ADMIN_EMAILS = {
+    e.strip().lower() for e in os.environ.get("ADMIN_EMAILS", "").split(",") if e.strip()
+}
+
+# Seconds after the last autosave before a draft is rendered in the background
+DRAFT_RENDER_DELAY = float(os.environ.get("DRAFT_RENDER_DELAY", "10"))
 
 # ---------------------------------------------------------------------------
 # Helpers
@@ -64,7 +93,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         # Try passlib first
         return pwd_context.verify(plain_password, hashed_password)
     except Exception as e:
-        logger.warning(f"Passlib verification failed, trying direct bcrypt: {e}")
+        logger.warning("Passlib verification failed, trying direct bcrypt: %s", e)
         try:
             # Fallback to direct bcrypt
             if isinstance(hashed_password, str):
@@ -77,7 +106,7 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
                 logger.info("Direct bcrypt verification succeeded")
             return result
         except Exception as e2:
-            logger.error(f"Direct bcrypt verification also failed: {e2}")
+            logger.error("Direct bcrypt verification also failed: %s", e2)
             return False
 
 
@@ -86,14 +115,14 @@ def get_password_hash(password: str) -> str:
         # Try passlib first
         return pwd_context.hash(password)
     except Exception as e:
-        logger.warning(f"Passlib hashing failed, trying direct bcrypt: {e}")
+        logger.warning("Passlib hashing failed, trying direct bcrypt: %s", e)
         try:
             # Fallback to direct bcrypt (returns string for DB storage)
             salt = bcrypt.gensalt()
             hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
             return hashed.decode("utf-8")
         except Exception as e2:
-            logger.error(f"Direct bcrypt hashing also failed: {e2}")
+            logger.error("Direct bcrypt hashing also failed: %s", e2)
             raise e2
 
 
@@ -111,10 +140,24 @@ def parse_datetime(value) -> datetime:
     return value
 
 
+def _batch_auth(request: Request, token: str) -> Optional[dict]:
+    """The outer request's resolved auth when this is a /api/batch sub-request."""
+    auth = request.scope.get("state", {}).get("batch_auth")
+    if auth is not None and auth["token"] == token:
+        return auth
+    return None
+
+
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
 ) -> dict:
     token = credentials.credentials
+    auth = _batch_auth(request, token)
+    if auth is not None:
+        if auth["user"] is None:
+            raise HTTPException(status_code=401, detail="Invalid authentication credentials")
+        return dict(auth["user"])
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -129,7 +172,27 @@ async def get_current_user(
     return user
 
 
+def _is_admin(user: dict) -> bool:
+    return user.get("email", "").lower() in ADMIN_EMAILS
+
+
+def _bearer_is_admin(scope: dict) -> bool:
+    """Whether the request carries a valid token for an admin (no database lookup)."""
+    for name, value in scope.get("headers", []):
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer":
+                return False
+            try:
+                payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            except JWTError:
+                return False
+            return _is_admin({"email": payload.get("sub") or ""})
+    return False
+
+
 async def get_optional_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(
         HTTPBearer(auto_error=False)
     ),
@@ -137,6 +200,9 @@ async def get_optional_user(
     """Like get_current_user but returns None instead of 401."""
     if credentials is None:
         return None
+    auth = _batch_auth(request, credentials.credentials)
+    if auth is not None:
+        return dict(auth["user"]) if auth["user"] else None
     try:
         payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
@@ -165,6 +231,10 @@ class UserLogin(BaseModel):
     password: str
 
 
+class AccountDelete(BaseModel):
+    password: str
+
+
 class UserResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
@@ -178,6 +248,8 @@ class UserResponse(BaseModel):
     website_url: Optional[str] = None
     location: Optional[str] = None
     skills: List[str] = []
+    follower_count: int = 0
+    following_count: int = 0
     created_at: datetime
 
 
@@ -252,6 +324,21 @@ class ProjectResponse(BaseModel):
     updated_at: datetime
 
 
+class FollowUser(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+
+    username: str
+    full_name: str
+    bio: Optional[str] = None
+    avatar_url: Optional[str] = None
+
+
+class FollowPage(BaseModel):
+    users: List[FollowUser]
+    total: int = 0
+    next_cursor: Optional[str] = None
+
+
 class ForgotPasswordRequest(BaseModel):
     email: EmailStr
 
@@ -296,6 +383,12 @@ class BlogUpdate(BaseModel):
     seo_description: Optional[str] = None
 
 
+class TocEntry(BaseModel):
+    level: int
+    text: str
+    id: str
+
+
 class BlogResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
 
@@ -304,6 +397,9 @@ class BlogResponse(BaseModel):
     title: str
     subtitle: Optional[str] = None
     content_markdown: str
+    content_html: str = ""
+    toc: List[TocEntry] = []
+    excerpt: str = ""
     cover_image_url: Optional[str] = None
     author_email: str
     author_username: str
@@ -320,11 +416,118 @@ class BlogResponse(BaseModel):
     view_count: int = 0
     comment_count: int = 0
     reaction_count: int = 0
+    revision: int = 0
     published_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
 
+class BlogSummary(BaseModel):
+    """A blog without its body, for list views."""
+    model_config = ConfigDict(extra="ignore")
+
+    blog_id: str
+    slug: str
+    title: str
+    subtitle: Optional[str] = None
+    excerpt: str = ""
+    cover_image_url: Optional[str] = None
+    author_username: str
+    author_full_name: str
+    tags: List[str] = []
+    category: str = "devlog"
+    status: str = "draft"
+    reading_time_minutes: int = 1
+    view_count: int = 0
+    comment_count: int = 0
+    reaction_count: int = 0
+    published_at: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class BookmarkItem(BaseModel):
+    blog_id: str
+    bookmarked_at: datetime
+    blog: Optional[BlogSummary] = None  # None when the blog has been deleted
+
+
+class BookmarkPage(BaseModel):
+    items: List[BookmarkItem]
+    next_cursor: Optional[str] = None
+
+
+class ViewPoint(BaseModel):
+    bucket: str  # hour start (ISO timestamp) or day (YYYY-MM-DD), UTC
+    views: int
+
+
+class BlogViewSeries(BaseModel):
+    blog_id: str
+    total: int
+    points: List[ViewPoint]
+
+
+class BlogViewsResponse(BaseModel):
+    granularity: str
+    start: datetime
+    end: datetime
+    series: List[BlogViewSeries]
+    totals: List[ViewPoint]
+
+
+class RelatedItem(BaseModel):
+    kind: str  # "blog" or "project"
+    id: str
+    title: str
+    slug: Optional[str] = None
+    author_username: Optional[str] = None
+    score: float
+
+
+class FacetValue(BaseModel):
+    value: str
+    count: int
+
+
+class FacetsResponse(BaseModel):
+    kind: str
+    facets: Dict[str, List[FacetValue]]
+
+
+class UserStatsResponse(BaseModel):
+    projects: int = 0
+    blogs: int = 0
+    published_blogs: int = 0
+    blog_views: int = 0
+    blog_reactions: int = 0
+    comments_received: int = 0
+    followers: int = 0
+    following: int = 0
+    updated_at: Optional[datetime] = None
+
+
+class BatchSubRequest(BaseModel):
+    id: Optional[str] = None
+    method: Literal["GET", "POST", "PUT", "PATCH", "DELETE"] = "GET"
+    path: str = Field(..., max_length=2048)  # relative to /api, may carry a query string
+    body: Optional[Any] = None
+
+
+class BatchRequest(BaseModel):
+    requests: List[BatchSubRequest] = Field(..., min_length=1, max_length=batch.MAX_REQUESTS)
+
+
+class BatchSubResponse(BaseModel):
+    id: Optional[str] = None
+    status: int
+    body: Any = None
+
+
+class BatchResponse(BaseModel):
+    responses: List[BatchSubResponse]
+
+
 class CommentCreate(BaseModel):
     content: str
     parent_comment_id: Optional[str] = None
@@ -344,6 +547,42 @@ class CommentResponse(BaseModel):
     created_at: datetime
 
 
+class MarkdownPreviewRequest(BaseModel):
+    content_markdown: str
+
+
+class BlogContentPatch(BaseModel):
+    """An edit to a blog body: ``delta`` against the text at ``base_revision``.
+
+    Ops run over the base text in UTF-16 code units (JavaScript string
+    indices): a positive count keeps, a negative count deletes, a string is
+    inserted; the rest of the text after the last op is kept.
+    """
+    base_revision: int = Field(ge=0)
+    delta: List[Union[StrictInt, StrictStr]] = Field(max_length=10000)
+
+
+class BlogContentSaved(BaseModel):
+    blog_id: str
+    revision: int
+    coalesced: bool
+    updated_at: datetime
+
+
+class BlogRevisionSummary(BaseModel):
+    revision: int
+    kind: str
+    saves: int = 1
+    length: Optional[int] = None
+    created_at: datetime
+    updated_at: datetime
+
+
+class BlogRevisionContent(BaseModel):
+    revision: int
+    content_markdown: str
+
+
 class ReactionCreate(BaseModel):
     type: str  # fire | rocket | bulb | clap | heart
 
@@ -362,12 +601,16 @@ def generate_slug(title: str) -> str:
     return f"{base}-{suffix}" if base else suffix
 
 
-def calculate_reading_time(text: str) -> int:
-    """Estimate reading time in minutes (238 wpm average)."""
-    words = len(text.split())
-    return max(1, round(words / 238))
 
 
+def _parse_cursor(cursor: Optional[str]) -> Optional[ObjectId]:
+    """Decode a keyset pagination cursor (the ``_id`` of the last item seen)."""
+    if cursor is None:
+        return None
+    if not ObjectId.is_valid(cursor):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return ObjectId(cursor)
+
 
 def _user_response(user: dict) -> UserResponse:
     """Build a UserResponse from a raw MongoDB document."""
@@ -382,13 +625,15 @@ def _user_response(user: dict) -> UserResponse:
         website_url=user.get("website_url"),
         location=user.get("location"),
         skills=user.get("skills", []),
+        follower_count=user.get("follower_count", 0),
+        following_count=user.get("following_count", 0),
         created_at=parse_datetime(user["created_at"]),
     )
 
 
 async def _developer_response(user: dict) -> DeveloperResponse:
     """Build a DeveloperResponse from a raw MongoDB document including project count."""
-    count = await db.projects.count_documents({"user_username": user["username"]})
+    count = await listing_db.projects.count_documents({"user_username": user["username"]})
     return DeveloperResponse(
         full_name=user["full_name"],
         username=user["username"],
@@ -445,55 +690,233 @@ def _serialize(doc: dict) -> dict:
 # ---------------------------------------------------------------------------
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup — verify MongoDB connection
-    try:
-        await client.admin.command("ping")
-        logger.info("Successfully connected to MongoDB")
-    except Exception as e:
-        logger.error("Failed to connect to MongoDB: %s", e)
+class StartupState:
+    """Progress of the startup pipeline, reported by the readiness probe."""
+
+    def __init__(self):
+        self.ready = False
+        self.phases: dict = {}
+        self.started = time.perf_counter()  # module import time
+        self._factories: dict = {}
+        self._retrying: Optional[asyncio.Future] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.ready and all(phase["ok"] for phase in self.phases.values())
+
+    async def run_phase(self, name: str, factory) -> bool:
+        """Await ``factory()``, recording its duration and outcome under ``name``.
+
+        The factory is kept so a failed phase can be re-run by ``retry_failed``.
+        """
+        self._factories[name] = factory
+        phase_start = time.perf_counter()
+        try:
+            await factory()
+            ok = True
+        except Exception as e:
+            logger.warning("Startup phase %s failed: %s", name, e)
+            ok = False
+        elapsed_ms = round((time.perf_counter() - phase_start) * 1000, 1)
+        self.phases[name] = {"ok": ok, "ms": elapsed_ms}
+        logger.info("Startup phase %s finished in %.1f ms", name, elapsed_ms, extra={"phase": name, "ok": ok})
+        return ok
+
+    async def retry_failed(self, timeout: float) -> None:
+        """Re-run every failed phase; concurrent probes share one attempt."""
+        failed = [name for name, phase in self.phases.items() if not phase["ok"]]
+        if not failed:
+            return
+        if self._retrying is None or self._retrying.done():
+            self._retrying = asyncio.gather(
+                *(self.run_phase(name, self._factories[name]) for name in failed)
+            )
+        # shield: a probe timing out must not cancel the retry for the next one
+        try:
+            await asyncio.wait_for(asyncio.shield(self._retrying), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
 
-    # Ensure the default admin user exists
-    try:
-        admin_email = "admin@gmail.com"
-        seed_user_data = {
-            "email": admin_email,
-            "password": get_password_hash("admin"),
-            "full_name": "Admin User",
-            "username": "adminuser",
-            "bio": "Default admin account for KudosDev",
-            "avatar_url": None,
-            "github_url": None,
-            "linkedin_url": None,
-            "website_url": None,
-            "location": None,
-            "skills": ["React", "Python", "FastAPI"],
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        }
-        await db.users.update_one(
-            {"email": admin_email},
-            {"$setOnInsert": seed_user_data},
-            upsert=True,
-        )
-        logger.info("Admin user ensured (only seeded if not already present)")
-    except Exception as e:
-        logger.warning("Could not ensure admin user: %s", e)
 
-    # Start Change Stream watchers as background tasks
-    watcher_tasks = [
+startup = StartupState()
+
+
+async def _seed_admin():
+    """Create the default admin account unless it already exists."""
+    admin_email = "admin@gmail.com"
+    if await db.users.find_one({"email": admin_email}, {"_id": 1}):
+        return
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed = await asyncio.to_thread(get_password_hash, "admin")
+    seed_user_data = {
+        "email": admin_email,
+        "password": hashed,
+        "full_name": "Admin User",
+        "username": "adminuser",
+        "bio": "Default admin account for KudosDev",
+        "avatar_url": None,
+        "github_url": None,
+        "linkedin_url": None,
+        "website_url": None,
+        "location": None,
+        "skills": ["React", "Python", "FastAPI"],
+        "follower_count": 0,
+        "following_count": 0,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    # Another worker may have seeded it in the meantime
+    await db.users.update_one({"email": admin_email}, {"$setOnInsert": seed_user_data}, upsert=True)
+    logger.info("Seeded default admin user")
+
+
+async def _ping_mongo():
+    await client.admin.command("ping")
+
+
+async def _run_startup():
+    """Run the independent startup phases concurrently, then mark the app ready."""
+    await asyncio.gather(
+        startup.run_phase("mongo_ping", _ping_mongo),
+        startup.run_phase("admin_seed", _seed_admin),
+        startup.run_phase("indexes", _ensure_indexes),
+        startup.run_phase("jobs", _enqueue_startup_jobs),
+    )
+    startup.ready = True
+    logger.info(
+        "Ready %.1f ms after import",
+        (time.perf_counter() - startup.started) * 1000,
+        extra={"phases": startup.phases},
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Serve liveness immediately; /health/ready reports 503 until startup finishes
+    background_tasks = [
+        asyncio.create_task(_run_startup()),
         asyncio.create_task(_watch_projects()),
         asyncio.create_task(_watch_blogs()),
         asyncio.create_task(_watch_comments()),
+        asyncio.create_task(job_queue.run()),
+        asyncio.create_task(view_recorder.run()),
+        asyncio.create_task(user_stats.run()),
+        asyncio.create_task(facet_counter.run()),
+        asyncio.create_task(related_content.run(event_bus)),
+        asyncio.create_task(sse_connections.run(event_bus)),
+        asyncio.create_task(slow_operations.run(db)),
     ]
-    logger.info("Change Stream watchers started for projects, blogs, comments")
+    logger.info("Startup pipeline and change stream watchers scheduled")
 
     yield
 
-    # Shutdown — cancel watchers and close DB
-    for task in watcher_tasks:
+    # Shutdown — end open streams, cancel background tasks, hand back running jobs, write out buffered views and close DB
+    sse_connections.shutdown()
+    for task in background_tasks:
         task.cancel()
+    await job_queue.shutdown()
+    try:
+        await view_recorder.flush()
+    except Exception as e:
+        logger.warning("Could not flush buffered blog views: %s", e)
+    try:
+        await user_stats.flush()
+    except Exception as e:
+        logger.warning("Could not flush user stats: %s", e)
+    upload_files.handles.close()
     client.close()
+    shutdown_logging()
+
+
+async def _ensure_indexes():
+    """Create the indexes the query paths rely on (no-op if they already exist)."""
+    await asyncio.gather(
+        db.follows.create_indexes([
+            IndexModel([("follower_email", 1), ("following_email", 1)], unique=True),
+            IndexModel([("follower_email", 1), ("_id", -1)]),
+            IndexModel([("following_email", 1), ("_id", -1)]),
+        ]),
+        db.bookmarks.create_indexes([
+            IndexModel([("user_email", 1), ("blog_id", 1)], unique=True),
+            IndexModel([("user_email", 1), ("_id", -1)]),
+        ]),
+        db.blogs.create_indexes([
+            IndexModel("blog_id", unique=True),
+            IndexModel("author_email"),
+            # Multikey on tags; serve filtered listings in published_at order
+            IndexModel([("status", 1), ("tags", 1), ("published_at", -1)]),
+            IndexModel([("status", 1), ("category", 1), ("published_at", -1)]),
+        ]),
+        db.blog_revisions.create_indexes([IndexModel([("blog_id", 1), ("revision", 1)], unique=True)]),
+        db.jobs.create_indexes([
+            IndexModel([("queue", 1), ("status", 1), ("priority", -1), ("run_at", 1)]),
+            # One pending job per dedupe key; running and failed ones don't count
+            IndexModel(
+                "dedupe_key", unique=True,
+                partialFilterExpression={"status": "pending", "dedupe_key": {"$exists": True}},
+            ),
+        ]),
+        db.comments.create_indexes([
+            # Imports upsert on comment_id/project_id, so these must be unique
+            IndexModel("comment_id", unique=True),
+            IndexModel("author_email"),
+        ]),
+        db.media.create_indexes([
+            IndexModel("filename", unique=True),
+            IndexModel("owner_email"),
+        ]),
+        db.blog_views_hourly.create_indexes([
+            IndexModel([("blog_id", 1), ("hour", 1)]),
+            IndexModel([("author_email", 1), ("hour", 1)]),
+            IndexModel([("day", 1)]),
+        ]),
+        db.user_stats.create_indexes([IndexModel("updated_at")]),
+        db.projects.create_indexes([
+            IndexModel("project_id", unique=True),
+            IndexModel("user_email"),
+            IndexModel([("tech_stack", 1), ("created_at", -1)]),
+            IndexModel([("category", 1), ("created_at", -1)]),
+            IndexModel([("status", 1), ("created_at", -1)]),
+        ]),
+        db.facet_counts.create_indexes([IndexModel([("kind", 1), ("field", 1), ("count", -1)])]),
+        db.blog_views_daily.create_indexes([
+            IndexModel([("blog_id", 1), ("day", 1)]),
+            IndexModel([("author_email", 1), ("day", 1)]),
+        ]),
+    )
+
+
+async def _enqueue_startup_jobs():
+    """Queue the one-off maintenance jobs; every worker asks, one job runs."""
+    await job_queue.enqueue("follow_counts", {}, priority=-10, dedupe_key="follow_counts")
+    await cascade_deleter.adopt_legacy_jobs()
+    await author_fields.adopt_legacy_jobs()
+
+
+async def _backfill_follow_counts(job):
+    """Populate follower/following counters on users created before they existed."""
+    async def counts(email):
+        return await asyncio.gather(
+            db.follows.count_documents({"following_email": email}),
+            db.follows.count_documents({"follower_email": email}),
+        )
+
+    async for user in db.users.find(
+        {"$or": [{"follower_count": {"$exists": False}}, {"following_count": {"$exists": False}}]},
+        {"email": 1},
+    ):
+        followers, following = await counts(user["email"])
+        result = await db.users.update_one(
+            {"_id": user["_id"], "follower_count": {"$exists": False}, "following_count": {"$exists": False}},
+            {"$set": {"follower_count": followers, "following_count": following}},
+        )
+        if not result.matched_count:
+            # A follow meanwhile $inc'ed a counter into existence, counting from
+            # zero; recount (the edge is written before the $inc) and raise it
+            followers, following = await counts(user["email"])
+            await db.users.update_one(
+                {"_id": user["_id"]},
+                {"$max": {"follower_count": followers, "following_count": following}},
+            )
 
 
 # ---------------------------------------------------------------------------
@@ -507,10 +930,14 @@ async def _watch_projects():
     """Watch the projects collection and broadcast events."""
     try:
         async with db.projects.watch(_CHANGE_PIPELINE, full_document="updateLookup") as stream:
+            project_cache.enable()
             async for change in stream:
+                metrics.observe_change("projects", change)
+                project_cache.apply_change(change)
                 op = change["operationType"]
                 doc = change.get("fullDocument")
                 if op == "insert" and doc:
+                    user_stats.mark(doc.get("user_email"))
                     await event_bus.publish({"type": "project:new", "data": _serialize(doc)})
                 elif op == "update" and doc:
                     await event_bus.publish({"type": "project:updated", "data": _serialize(doc)})
@@ -520,19 +947,34 @@ async def _watch_projects():
     except asyncio.CancelledError:
         pass
     except Exception as e:
-        logger.error(f"Projects change stream error: {e}")
+        logger.error("Projects change stream error: %s", e)
+    finally:
+        # Without the stream nothing would invalidate the cache
+        project_cache.disable()
+
+
+def _blog_update_is_public(change: dict) -> bool:
+    # Draft edits (autosaves included) are nobody else's business; a status
+    # change still goes out so clients can drop an unpublished post
+    updated = change.get("updateDescription", {}).get("updatedFields", {})
+    return change["fullDocument"].get("status") == "published" or "status" in updated
 
 
 async def _watch_blogs():
     """Watch the blogs collection and broadcast events."""
     try:
         async with db.blogs.watch(_CHANGE_PIPELINE, full_document="updateLookup") as stream:
+            blog_cache.enable()
             async for change in stream:
+                metrics.observe_change("blogs", change)
+                blog_cache.apply_change(change)
                 op = change["operationType"]
                 doc = change.get("fullDocument")
-                if op == "insert" and doc:
+                if doc and blog_change_affects_stats(change):
+                    user_stats.mark(doc.get("author_email"))
+                if op == "insert" and doc and doc.get("status") == "published":
                     await event_bus.publish({"type": "blog:new", "data": _serialize(doc)})
-                elif op == "update" and doc:
+                elif op == "update" and doc and _blog_update_is_public(change):
                     await event_bus.publish({"type": "blog:updated", "data": _serialize(doc)})
                 elif op == "delete":
                     doc_key = str(change["documentKey"]["_id"])
@@ -540,7 +982,10 @@ async def _watch_blogs():
     except asyncio.CancelledError:
         pass
     except Exception as e:
-        logger.error(f"Blogs change stream error: {e}")
+        logger.error("Blogs change stream error: %s", e)
+    finally:
+        # Without the stream nothing would invalidate the cache
+        blog_cache.disable()
 
 
 async def _watch_comments():
@@ -548,6 +993,7 @@ async def _watch_comments():
     try:
         async with db.comments.watch(_CHANGE_PIPELINE, full_document="updateLookup") as stream:
             async for change in stream:
+                metrics.observe_change("comments", change)
                 op = change["operationType"]
                 doc = change.get("fullDocument")
                 if op == "insert" and doc:
@@ -555,7 +1001,7 @@ async def _watch_comments():
     except asyncio.CancelledError:
         pass
     except Exception as e:
-        logger.error(f"Comments change stream error: {e}")
+        logger.error("Comments change stream error: %s", e)
 
 
 # ---------------------------------------------------------------------------
@@ -564,6 +1010,12 @@ async def _watch_comments():
 
 app = FastAPI(lifespan=lifespan)
 
+app.add_middleware(CompressionMiddleware)
+# Inside MetricsMiddleware: profiles read its per-request MongoDB stats
+profile_store = ProfileStore()
+app.add_middleware(ProfilingMiddleware, authorize=_bearer_is_admin, store=profile_store)
+app.add_middleware(metrics.MetricsMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -575,7 +1027,34 @@ app.add_middleware(
 # Static files for uploads
 UPLOAD_DIR = ROOT_DIR / "uploads"
 UPLOAD_DIR.mkdir(exist_ok=True)
-app.mount("/uploads", StaticFiles(directory=str(UPLOAD_DIR)), name="uploads")
+upload_files = UploadFiles(UPLOAD_DIR)
+app.mount("/uploads", upload_files, name="uploads")
+
+job_queue = JobQueue(db)
+cascade_deleter = CascadeDeleter(db, UPLOAD_DIR, job_queue)
+job_queue.register("follow_counts", _backfill_follow_counts)
+view_recorder = ViewRecorder(db)
+blog_revisions = BlogRevisions(db)
+author_fields = AuthorFieldPropagator(db, job_queue)
+user_stats = UserStats(db)
+facet_counter = FacetCounter(db)
+related_content = RelatedContent(db)
+sse_connections = SSEConnectionManager()
+
+# Read-through caches for the single-document pages; the change stream
+# watchers above keep them fresh and switch them off when they stop
+blog_cache = HotDocumentCache(
+    "blogs", "slug", lambda slug: db.blogs.find_one({"slug": slug}), cache_size("blogs", 500),
+    # Hashing the body once per load or change, not on every read
+    annotate=lambda blog: {
+        "render_stale": blog.get("content_hash") != content_hash(blog.get("content_markdown", "")),
+    },
+    # ...and not again for view_count bumps and other updates that leave both alone
+    annotate_fields=("content_hash", "content_markdown"),
+)
+project_cache = HotDocumentCache(
+    "projects", "project_id", lambda pid: db.projects.find_one({"project_id": pid}), cache_size("projects", 1000),
+)
 
 api_router = APIRouter(prefix="/api")
 
@@ -590,6 +1069,9 @@ async def register(user_data: UserRegister):
     existing_user = await db.users.find_one({"email": user_data.email})
     if existing_user:
         raise HTTPException(status_code=400, detail="Email already registered")
+    # The old account's content is still being removed by email
+    if await db.deleted_accounts.find_one({"_id": user_data.email}, {"_id": 1}):
+        raise HTTPException(status_code=409, detail="This account is still being deleted; try again shortly")
 
     existing_username = await db.users.find_one({"username": user_data.username})
     if existing_username:
@@ -607,6 +1089,8 @@ async def register(user_data: UserRegister):
         "website_url": None,
         "location": None,
         "skills": [],
+        "follower_count": 0,
+        "following_count": 0,
         "created_at": datetime.now(timezone.utc).isoformat(),
     }
 
@@ -621,25 +1105,24 @@ async def register(user_data: UserRegister):
 @api_router.post("/auth/login", response_model=Token)
 async def login(user_data: UserLogin):
     try:
-        logger.info(f"Login attempt for: {user_data.email}")
+        logger.debug("Login attempt for: %s", user_data.email)
         user = await db.users.find_one({"email": user_data.email})
         
         if not user:
-            logger.warning(f"User not found in DB: {user_data.email}")
+            logger.warning("Login failed, user not found: %s", user_data.email)
             raise HTTPException(status_code=401, detail="Incorrect email or password")
         
-        # Verify password with detailed debug logging if it fails
         if not verify_password(user_data.password, user["password"]):
-            logger.warning(f"Invalid password for: {user_data.email}. Received: '{user_data.password}'")
+            logger.warning("Login failed, invalid password for: %s", user_data.email)
             raise HTTPException(status_code=401, detail="Incorrect email or password")
 
-        logger.info(f"Login successful for: {user_data.email}")
+        logger.info("Login successful for: %s", user_data.email)
         access_token = create_access_token(data={"sub": user_data.email})
         return Token(access_token=access_token, token_type="bearer", user=_user_response(user))
     except HTTPException:
         raise
     except Exception as e:
-        logger.error(f"Internal error during login: {str(e)}")
+        logger.exception("Internal error during login: %s", e)
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
@@ -654,11 +1137,36 @@ async def update_me(user_update: UserUpdate, current_user: dict = Depends(get_cu
 
     if update_data:
         await db.users.update_one({"email": current_user["email"]}, {"$set": update_data})
+        # Copies of the name on the user's content are refreshed in the background
+        if any(current_user.get(f) != update_data[f] for f in PROPAGATED_FIELDS & update_data.keys()):
+            await author_fields.enqueue(current_user["email"])
 
     updated_user = await db.users.find_one({"email": current_user["email"]}, {"_id": 0})
     return _user_response(updated_user)
 
 
+@api_router.delete("/auth/me")
+async def delete_me(data: AccountDelete, current_user: dict = Depends(get_current_user)):
+    """Delete the current account; owned content is removed in the background.
+
+    Requires the current password. The email stays reserved by a tombstone
+    in ``deleted_accounts`` until the cascade has finished, so a new account
+    cannot be registered under it and lose its content to the cleanup.
+    """
+    user = await db.users.find_one({"email": current_user["email"]}, {"password": 1})
+    if not user or not await asyncio.to_thread(verify_password, data.password, user["password"]):
+        raise HTTPException(status_code=403, detail="Incorrect password")
+    await db.deleted_accounts.update_one(
+        {"_id": current_user["email"]},
+        {"$set": {"deleted_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+    )
+    await db.users.delete_one({"email": current_user["email"]})
+    await cascade_deleter.enqueue("user", current_user["email"])
+    logger.info("User %s deleted, cleanup of owned content scheduled", current_user["username"])
+    return {"message": "Account deleted successfully"}
+
+
 @api_router.post("/auth/forgot-password")
 async def forgot_password(request: ForgotPasswordRequest):
     user = await db.users.find_one({"email": request.email})
@@ -671,7 +1179,8 @@ async def forgot_password(request: ForgotPasswordRequest):
     reset_token = jwt.encode(token_data, SECRET_KEY, algorithm=ALGORITHM)
 
     reset_link = f"http://localhost:3000/reset-password/{reset_token}"
-    logger.info("PASSWORD RESET LINK for %s: %s", request.email, reset_link)
+    # Stand-in for email delivery, so the link is deliberately left unredacted
+    logger.info("PASSWORD RESET LINK for %s: %s", request.email, reset_link, extra={"redact": False})
 
     return {"message": "If an account exists with this email, a reset link has been sent."}
 
@@ -716,7 +1225,7 @@ async def get_developers(
             ]
         }
     
-    users_cursor = db.users.find(query, {"password": 0, "_id": 0}).skip(skip).limit(limit)
+    users_cursor = listing_db.users.find(query, {"password": 0, "_id": 0}).skip(skip).limit(limit)
     users = await users_cursor.to_list(length=limit)
     
     developers = []
@@ -729,6 +1238,7 @@ async def get_developers(
 
 @api_router.get("/users/{username}", response_model=UserResponse)
 async def get_user_by_username(username: str):
+    # Primary: the profile carries follow counts the caller may have just changed
     user = await db.users.find_one({"username": username}, {"_id": 0, "password": 0})
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
@@ -740,88 +1250,140 @@ async def get_user_by_username(username: str):
 # ---------------------------------------------------------------------------
 
 
+_FOLLOW_USER_PROJECTION = {"_id": 0, "username": 1, "full_name": 1, "bio": 1, "avatar_url": 1}
+
+
+async def _follow_page(
+    username: str,
+    match_field: str,
+    other_field: str,
+    count_field: str,
+    cursor: Optional[str],
+    limit: int,
+) -> FollowPage:
+    """Fetch one page of a follow list in a single aggregation.
+
+    Starts from the target user, joins the follow edges newest-first (keyset on
+    ``_id``) and joins each edge to a slim projection of the other user.
+    """
+    after = _parse_cursor(cursor)
+    edge_match = {"_id": {"$lt": after}} if after else {}
+    pipeline = [
+        {"$match": {"username": username}},
+        {"$project": {"_id": 0, "email": 1, count_field: 1}},
+        {"$lookup": {
+            "from": "follows",
+            "localField": "email",
+            "foreignField": match_field,
+            "pipeline": [
+                {"$match": edge_match},
+                {"$sort": {"_id": -1}},
+                {"$limit": limit + 1},
+                {"$lookup": {
+                    "from": "users",
+                    "localField": other_field,
+                    "foreignField": "email",
+                    "pipeline": [{"$project": _FOLLOW_USER_PROJECTION}],
+                    "as": "user",
+                }},
+                {"$project": {"_id": 1, "user": {"$arrayElemAt": ["$user", 0]}}},
+            ],
+            "as": "page",
+        }},
+    ]
+    docs = await db.users.aggregate(pipeline).to_list(1)
+    if not docs:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    page = docs[0]["page"]
+    next_cursor = None
+    if len(page) > limit:
+        page = page[:limit]
+        next_cursor = str(page[-1]["_id"])
+
+    return FollowPage(
+        users=[FollowUser(**edge["user"]) for edge in page if edge.get("user")],
+        total=docs[0].get(count_field, 0),
+        next_cursor=next_cursor,
+    )
+
+
 @api_router.post("/users/{username}/follow")
 async def follow_user(username: str, current_user: dict = Depends(get_current_user)):
     """Follow a user by username."""
     if current_user["username"] == username:
         raise HTTPException(status_code=400, detail="Cannot follow yourself")
 
-    target = await db.users.find_one({"username": username})
+    target = await db.users.find_one({"username": username}, {"email": 1, "username": 1})
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
 
-    # Prevent duplicate follows
-    existing = await db.follows.find_one({
-        "follower_email": current_user["email"],
-        "following_email": target["email"],
-    })
-    if existing:
+    # Upsert so a duplicate follow is a no-op rather than a second edge
+    try:
+        result = await db.follows.update_one(
+            {"follower_email": current_user["email"], "following_email": target["email"]},
+            {"$setOnInsert": {
+                "follower_username": current_user["username"],
+                "following_username": target["username"],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            }},
+            upsert=True,
+        )
+    except DuplicateKeyError:
+        return {"message": "Already following"}
+    if result.upserted_id is None:
         return {"message": "Already following"}
 
-    await db.follows.insert_one({
-        "follower_email": current_user["email"],
-        "follower_username": current_user["username"],
-        "following_email": target["email"],
-        "following_username": target["username"],
-        "created_at": datetime.now(timezone.utc).isoformat(),
-    })
+    await asyncio.gather(
+        db.users.update_one({"email": target["email"]}, {"$inc": {"follower_count": 1}}),
+        db.users.update_one({"email": current_user["email"]}, {"$inc": {"following_count": 1}}),
+    )
+    user_stats.mark(target["email"], current_user["email"])
     return {"message": "Followed successfully"}
 
 
 @api_router.delete("/users/{username}/follow")
 async def unfollow_user(username: str, current_user: dict = Depends(get_current_user)):
     """Unfollow a user by username."""
-    target = await db.users.find_one({"username": username})
+    target = await db.users.find_one({"username": username}, {"email": 1})
     if not target:
         raise HTTPException(status_code=404, detail="User not found")
 
-    await db.follows.delete_one({
+    result = await db.follows.delete_one({
         "follower_email": current_user["email"],
         "following_email": target["email"],
     })
+    if result.deleted_count:
+        await asyncio.gather(
+            db.users.update_one({"email": target["email"]}, {"$inc": {"follower_count": -1}}),
+            db.users.update_one({"email": current_user["email"]}, {"$inc": {"following_count": -1}}),
+        )
+        user_stats.mark(target["email"], current_user["email"])
     return {"message": "Unfollowed successfully"}
 
 
-@api_router.get("/users/{username}/followers")
-async def get_followers(username: str):
-    """Get list of users who follow this user."""
-    target = await db.users.find_one({"username": username})
-    if not target:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    follows = await db.follows.find(
-        {"following_email": target["email"]}, {"_id": 0}
-    ).to_list(500)
-
-    follower_emails = [f["follower_email"] for f in follows]
-    if not follower_emails:
-        return []
-
-    users = await db.users.find(
-        {"email": {"$in": follower_emails}}, {"_id": 0, "password": 0}
-    ).to_list(500)
-    return users
-
-
-@api_router.get("/users/{username}/following")
-async def get_following(username: str):
-    """Get list of users this user follows."""
-    target = await db.users.find_one({"username": username})
-    if not target:
-        raise HTTPException(status_code=404, detail="User not found")
-
-    follows = await db.follows.find(
-        {"follower_email": target["email"]}, {"_id": 0}
-    ).to_list(500)
+@api_router.get("/users/{username}/followers", response_model=FollowPage)
+async def get_followers(
+    username: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Get a page of users who follow this user, newest first."""
+    return await _follow_page(
+        username, "following_email", "follower_email", "follower_count", cursor, limit
+    )
 
-    following_emails = [f["following_email"] for f in follows]
-    if not following_emails:
-        return []
 
-    users = await db.users.find(
-        {"email": {"$in": following_emails}}, {"_id": 0, "password": 0}
-    ).to_list(500)
-    return users
+@api_router.get("/users/{username}/following", response_model=FollowPage)
+async def get_following(
+    username: str,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+):
+    """Get a page of users this user follows, newest first."""
+    return await _follow_page(
+        username, "follower_email", "following_email", "following_count", cursor, limit
+    )
 
 
 @api_router.get("/users/{username}/is-following")
@@ -838,6 +1400,20 @@ async def check_is_following(username: str, current_user: dict = Depends(get_cur
     return {"is_following": existing is not None}
 
 
+@api_router.get("/follows/status")
+async def check_following_many(
+    usernames: List[str] = Query(..., max_length=100),
+    current_user: dict = Depends(get_current_user),
+):
+    """Check in one query which of the given usernames the current user follows."""
+    follows = await db.follows.find(
+        {"follower_email": current_user["email"], "following_username": {"$in": usernames}},
+        {"_id": 0, "following_username": 1},
+    ).to_list(len(usernames))
+    followed = {f["following_username"] for f in follows}
+    return {name: name in followed for name in usernames}
+
+
 # ---------------------------------------------------------------------------
 # Project Routes
 # ---------------------------------------------------------------------------
@@ -856,6 +1432,7 @@ async def create_project(project_data: ProjectCreate, current_user: dict = Depen
     project_dict["updated_at"] = now
 
     await db.projects.insert_one(project_dict)
+    await facet_counter.apply("projects", None, project_dict)
 
     # Emit real-time event (faster than waiting for Change Stream)
     response = _project_response(project_dict)
@@ -867,47 +1444,62 @@ async def create_project(project_data: ProjectCreate, current_user: dict = Depen
     return response
 
 
+def _add_multi_filter(query: dict, field: str, values: Optional[List[str]], match: str = "any"):
+    """Filter ``field`` on any (OR) or, for list fields, all (AND) of ``values``."""
+    values = [v for v in values or [] if v]
+    if len(values) == 1:
+        query[field] = values[0]
+    elif values:
+        query[field] = {"$all" if match == "all" else "$in": values}
+
+
 @api_router.get("/projects", response_model=List[ProjectResponse])
-async def get_all_projects(category: Optional[str] = None, status: Optional[str] = None):
+async def get_all_projects(
+    category: Optional[List[str]] = Query(None, max_length=20),
+    status: Optional[List[str]] = Query(None, max_length=20),
+    tech_stack: Optional[List[str]] = Query(None, max_length=20),
+    tech_match: str = Query("any", pattern="^(any|all)$"),
+):
+    """List projects; repeat a filter to match any of its values (``tech_match=all``
+    requires every listed technology)."""
     query = {}
-    if category:
-        query["category"] = category
-    if status:
-        query["status"] = status
+    _add_multi_filter(query, "category", category)
+    _add_multi_filter(query, "status", status)
+    _add_multi_filter(query, "tech_stack", tech_stack, tech_match)
 
-    projects = await db.projects.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    projects = await listing_db.projects.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
     return [_project_response(p) for p in projects]
 
 
 @api_router.get("/projects/my", response_model=List[ProjectResponse])
 async def get_my_projects(current_user: dict = Depends(get_current_user)):
     try:
-        logger.info(f"Fetching projects for user: {current_user['email']}")
+        logger.debug("Fetching projects for user: %s", current_user["email"])
         projects = (
             await db.projects.find({"user_email": current_user["email"]}, {"_id": 0})
             .sort("created_at", -1)
             .to_list(100)
         )
-        logger.info(f"Found {len(projects)} projects for {current_user['email']}")
+        logger.debug("Found %d projects for %s", len(projects), current_user["email"])
         
         response_data = []
         for p in projects:
             try:
                 response_data.append(_project_response(p))
             except Exception as e:
-                logger.error(f"Error building ProjectResponse for project {p.get('project_id')}: {e}")
+                logger.error("Error building ProjectResponse for project %s: %s", p.get("project_id"), e)
                 # We could continue or raise
         
         return response_data
     except Exception as e:
-        logger.error(f"Unexpected error in get_my_projects: {e}")
+        logger.error("Unexpected error in get_my_projects: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @api_router.get("/projects/user/{username}", response_model=List[ProjectResponse])
 async def get_user_projects(username: str):
     projects = (
-        await db.projects.find({"user_username": username}, {"_id": 0})
+        await listing_db.projects.find({"user_username": username}, {"_id": 0})
         .sort("created_at", -1)
         .to_list(100)
     )
@@ -916,7 +1508,7 @@ async def get_user_projects(username: str):
 
 @api_router.get("/projects/{project_id}", response_model=ProjectResponse)
 async def get_project(project_id: str):
-    project = await db.projects.find_one({"project_id": project_id}, {"_id": 0})
+    project = await project_cache.get(project_id)
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     return _project_response(project)
@@ -939,8 +1531,10 @@ async def update_project(
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
 
     await db.projects.update_one({"project_id": project_id}, {"$set": update_data})
+    project_cache.discard_id(project["_id"])
 
     updated_project = await db.projects.find_one({"project_id": project_id}, {"_id": 0})
+    await facet_counter.apply("projects", project, updated_project)
     response = _project_response(updated_project)
     await event_bus.publish({
         "type": "project:updated",
@@ -951,18 +1545,23 @@ async def update_project(
 
 @api_router.delete("/projects/{project_id}")
 async def delete_project(project_id: str, current_user: dict = Depends(get_current_user)):
-    logger.info(f"Attempting to delete project: {project_id} by user: {current_user['email']}")
+    logger.debug("Attempting to delete project: %s by user: %s", project_id, current_user["email"])
     project = await db.projects.find_one({"project_id": project_id})
     if not project:
-        logger.warning(f"Project not found: {project_id}")
+        logger.warning("Project not found: %s", project_id)
         raise HTTPException(status_code=404, detail="Project not found")
 
     if project["user_email"] != current_user["email"]:
-        logger.warning(f"Unauthorized deletion attempt for project {project_id} by {current_user['email']}")
+        logger.warning("Unauthorized deletion attempt for project %s by %s", project_id, current_user["email"])
         raise HTTPException(status_code=403, detail="Not authorized to delete this project")
 
     result = await db.projects.delete_one({"project_id": project_id})
-    logger.info(f"Project deletion result for {project_id}: {result.deleted_count} documents deleted")
+    project_cache.discard_id(project["_id"])
+    if result.deleted_count:
+        await facet_counter.apply("projects", project, None)
+    # Delete events don't carry the owner, so the watcher can't do this
+    user_stats.mark(project["user_email"])
+    logger.info("Project deletion result for %s: %d documents deleted", project_id, result.deleted_count)
 
     await event_bus.publish({
         "type": "project:deleted",
@@ -999,18 +1598,31 @@ def _blog_response(blog: dict) -> BlogResponse:
     return BlogResponse(**b)
 
 
+def _blog_summary(blog: dict) -> BlogSummary:
+    """Build a BlogSummary from a raw (possibly projected) MongoDB document."""
+    b = blog.copy()
+    b.pop("_id", None)
+    b["created_at"] = parse_datetime(b.get("created_at", datetime.now(timezone.utc).isoformat()))
+    b["updated_at"] = parse_datetime(b.get("updated_at", datetime.now(timezone.utc).isoformat()))
+    if b.get("published_at"):
+        b["published_at"] = parse_datetime(b["published_at"])
+    return BlogSummary(**b)
+
+
+# List views don't show the rendered body
+_BLOG_LIST_PROJECTION = {"_id": 0, "content_html": 0, "toc": 0}
+
+
 @api_router.post("/blogs", response_model=BlogResponse)
 async def create_blog(blog_data: BlogCreate, current_user: dict = Depends(get_current_user)):
     now = datetime.now(timezone.utc).isoformat()
-    word_count = len(blog_data.content_markdown.split())
     blog_dict = blog_data.model_dump()
     blog_dict["blog_id"] = str(uuid.uuid4())
     blog_dict["slug"] = generate_slug(blog_data.title)
     blog_dict["author_email"] = current_user["email"]
     blog_dict["author_username"] = current_user["username"]
     blog_dict["author_full_name"] = current_user["full_name"]
-    blog_dict["word_count"] = word_count
-    blog_dict["reading_time_minutes"] = calculate_reading_time(blog_data.content_markdown)
+    blog_dict.update(render_markdown(blog_data.content_markdown))
     blog_dict["view_count"] = 0
     blog_dict["comment_count"] = 0
     blog_dict["reaction_count"] = 0
@@ -1021,6 +1633,7 @@ async def create_blog(blog_data: BlogCreate, current_user: dict = Depends(get_cu
     else:
         blog_dict["published_at"] = None
     await db.blogs.insert_one(blog_dict)
+    await facet_counter.apply("blogs", None, blog_dict)
 
     response = _blog_response(blog_dict)
     if blog_data.status == "published":
@@ -1035,17 +1648,20 @@ async def create_blog(blog_data: BlogCreate, current_user: dict = Depends(get_cu
 @api_router.get("/blogs", response_model=List[BlogResponse])
 async def get_all_blogs(
     tag: Optional[str] = None,
-    category: Optional[str] = None,
+    tags: Optional[List[str]] = Query(None, max_length=20),
+    tags_match: str = Query("any", pattern="^(any|all)$"),
+    category: Optional[List[str]] = Query(None, max_length=20),
     limit: int = 20,
     skip: int = 0,
 ):
+    """List published blogs; repeat ``tags``/``category`` to match any value
+    (``tags_match=all`` requires every listed tag). ``tag`` is the older
+    single-tag form."""
     query = {"status": "published"}
-    if tag:
-        query["tags"] = tag
-    if category:
-        query["category"] = category
+    _add_multi_filter(query, "tags", ([tag] if tag else []) + (tags or []), tags_match)
+    _add_multi_filter(query, "category", category)
     blogs = (
-        await db.blogs.find(query, {"_id": 0})
+        await listing_db.blogs.find(query, _BLOG_LIST_PROJECTION)
         .sort("published_at", -1)
         .skip(skip)
         .limit(limit)
@@ -1057,7 +1673,7 @@ async def get_all_blogs(
 @api_router.get("/blogs/my", response_model=List[BlogResponse])
 async def get_my_blogs(current_user: dict = Depends(get_current_user)):
     blogs = (
-        await db.blogs.find({"author_email": current_user["email"]}, {"_id": 0})
+        await db.blogs.find({"author_email": current_user["email"]}, _BLOG_LIST_PROJECTION)
         .sort("updated_at", -1)
         .to_list(100)
     )
@@ -1069,15 +1685,24 @@ async def get_blog_by_slug(
     slug: str,
     current_user: Optional[dict] = Depends(get_optional_user),
 ):
-    blog = await db.blogs.find_one({"slug": slug}, {"_id": 0})
+    blog = await blog_cache.get(slug)
     if not blog:
         raise HTTPException(status_code=404, detail="Blog not found")
 
+    # Blogs written before server-side rendering (or by an older renderer)
+    # are rendered once here and the result stored
+    if blog.pop("render_stale"):
+        rendered = render_markdown(blog.get("content_markdown", ""))
+        await db.blogs.update_one({"slug": slug}, {"$set": rendered})
+        blog.update(rendered)
+
     # Only increment view_count if the viewer is NOT the author
     is_author = current_user and current_user.get("email") == blog.get("author_email")
     if not is_author:
         await db.blogs.update_one({"slug": slug}, {"$inc": {"view_count": 1}})
         blog["view_count"] = blog.get("view_count", 0) + 1
+        view_recorder.record(blog["blog_id"], blog["author_email"])
+        user_stats.record_view(blog["author_email"])
 
     return _blog_response(blog)
 
@@ -1096,37 +1721,180 @@ async def update_blog(
 
     update_data = {k: v for k, v in blog_update.model_dump().items() if v is not None}
     if "content_markdown" in update_data:
-        update_data["word_count"] = len(update_data["content_markdown"].split())
-        update_data["reading_time_minutes"] = calculate_reading_time(update_data["content_markdown"])
-    update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
-
-    await db.blogs.update_one({"blog_id": blog_id}, {"$set": update_data})
+        # Only re-render when the body actually changed
+        if blog.get("content_hash") != content_hash(update_data["content_markdown"]):
+            update_data.update(render_markdown(update_data["content_markdown"]))
+    now = datetime.now(timezone.utc)
+    update_data["updated_at"] = now.isoformat()
+
+    text = update_data.pop("content_markdown", None)
+    if text is None or text == blog.get("content_markdown", ""):
+        await db.blogs.update_one({"blog_id": blog_id}, {"$set": update_data})
+    else:
+        # Full saves are versioned too; a concurrent save is simply overwritten
+        for attempt in range(3):
+            try:
+                old = blog.get("content_markdown", "")
+                await blog_revisions.save(
+                    blog, text, revisions.diff(old, text), current_user["email"], update_data, now,
+                )
+                break
+            except RevisionConflict as e:
+                blog = await db.blogs.find_one({"blog_id": blog_id})
+                if blog is None:
+                    raise HTTPException(status_code=404, detail="Blog not found")
+                if attempt == 2:
+                    raise HTTPException(status_code=409, detail={
+                        "message": "Blog is being saved concurrently", "revision": e.revision,
+                    })
+    blog_cache.discard_id(blog["_id"])
     updated = await db.blogs.find_one({"blog_id": blog_id}, {"_id": 0})
+    await facet_counter.apply("blogs", blog, updated)
     response = _blog_response(updated)
 
-    await event_bus.publish({
-        "type": "blog:updated",
-        "data": response.model_dump(mode="json"),
-    })
+    if updated.get("status") == "published":
+        await event_bus.publish({
+            "type": "blog:updated",
+            "data": response.model_dump(mode="json"),
+        })
 
     return response
 
 
+@api_router.patch("/blogs/{blog_id}/content", response_model=BlogContentSaved)
+async def patch_blog_content(
+    blog_id: str,
+    patch: BlogContentPatch,
+    current_user: dict = Depends(get_current_user),
+):
+    """Autosave: apply a text delta to the body at ``base_revision``.
+
+    Answers 409 with the current revision when the blog has moved on (the
+    editor then falls back to a full save). Drafts are not rendered or
+    broadcast on each save; a background job renders them once saves
+    pause for ``DRAFT_RENDER_DELAY`` seconds.
+    """
+    blog = await db.blogs.find_one({"blog_id": blog_id})
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if blog["author_email"] != current_user["email"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    current = blog.get("revision", 0)
+    if patch.base_revision != current:
+        raise HTTPException(status_code=409, detail={"message": "Stale base revision", "revision": current})
+
+    old = blog.get("content_markdown", "")
+    try:
+        delta = revisions.from_utf16(old, patch.delta)
+        text = revisions.apply(old, delta)
+    except revisions.DeltaError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid delta: {e}")
+    now = datetime.now(timezone.utc)
+    if not delta:
+        return BlogContentSaved(blog_id=blog_id, revision=current, coalesced=True, updated_at=now)
+
+    published = blog.get("status") == "published"
+    fields = {"updated_at": now.isoformat()}
+    if published:
+        fields.update(render_markdown(text))
+    try:
+        revision, coalesced = await blog_revisions.save(blog, text, delta, current_user["email"], fields, now)
+    except RevisionConflict as e:
+        raise HTTPException(status_code=409, detail={"message": "Stale base revision", "revision": e.revision})
+    blog_cache.discard_id(blog["_id"])
+
+    if published:
+        updated = await db.blogs.find_one({"blog_id": blog_id}, {"_id": 0})
+        if updated:
+            await event_bus.publish({
+                "type": "blog:updated",
+                "data": _blog_response(updated).model_dump(mode="json"),
+            })
+    else:
+        # Render once the author pauses, so publishing usually finds it done
+        await job_queue.enqueue(
+            "render", {"blog_id": blog_id}, delay=DRAFT_RENDER_DELAY, dedupe_key=f"render:{blog_id}",
+        )
+
+    return BlogContentSaved(blog_id=blog_id, revision=revision, coalesced=coalesced, updated_at=now)
+
+
+async def _render_draft(job):
+    """Render a blog body that autosave left unrendered."""
+    blog = await db.blogs.find_one(
+        {"blog_id": job.payload["blog_id"]},
+        {"_id": 1, "content_markdown": 1, "content_hash": 1, "revision": 1},
+    )
+    if not blog:
+        return
+    markdown = blog.get("content_markdown", "")
+    if blog.get("content_hash") == content_hash(markdown):
+        return
+    rendered = await asyncio.to_thread(render_markdown, markdown)
+    # Skip if the body changed meanwhile; that save queued its own render
+    result = await db.blogs.update_one(
+        {"_id": blog["_id"], "revision": blog.get("revision")}, {"$set": rendered},
+    )
+    if result.modified_count:
+        blog_cache.discard_id(blog["_id"])
+
+
+job_queue.register("render", _render_draft, concurrency=2)
+
+
+async def _own_blog(blog_id: str, current_user: dict) -> dict:
+    blog = await db.blogs.find_one({"blog_id": blog_id}, {"_id": 0, "author_email": 1})
+    if not blog:
+        raise HTTPException(status_code=404, detail="Blog not found")
+    if blog["author_email"] != current_user["email"]:
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return blog
+
+
+@api_router.get("/blogs/{blog_id}/revisions", response_model=List[BlogRevisionSummary])
+async def list_blog_revisions(
+    blog_id: str,
+    before: Optional[int] = Query(None, ge=1),
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+):
+    """Saved versions of a blog body, newest first (author only)."""
+    await _own_blog(blog_id, current_user)
+    return [BlogRevisionSummary(**entry) for entry in await blog_revisions.history(blog_id, limit, before)]
+
+
+@api_router.get("/blogs/{blog_id}/revisions/{revision}", response_model=BlogRevisionContent)
+async def get_blog_revision(blog_id: str, revision: int, current_user: dict = Depends(get_current_user)):
+    await _own_blog(blog_id, current_user)
+    text = await blog_revisions.content_at(blog_id, revision)
+    if text is None:
+        raise HTTPException(status_code=404, detail="Revision not found")
+    return BlogRevisionContent(revision=revision, content_markdown=text)
+
+
 @api_router.delete("/blogs/{blog_id}")
 async def delete_blog(blog_id: str, current_user: dict = Depends(get_current_user)):
-    logger.info(f"Attempting to delete blog: {blog_id} by user: {current_user['email']}")
+    logger.debug("Attempting to delete blog: %s by user: %s", blog_id, current_user["email"])
     blog = await db.blogs.find_one({"blog_id": blog_id})
     if not blog:
-        logger.warning(f"Blog not found: {blog_id}")
+        logger.warning("Blog not found: %s", blog_id)
         raise HTTPException(status_code=404, detail="Blog not found")
     if blog["author_email"] != current_user["email"]:
-        logger.warning(f"Unauthorized deletion attempt for blog {blog_id} by {current_user['email']}")
+        logger.warning("Unauthorized deletion attempt for blog %s by %s", blog_id, current_user["email"])
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    await db.blogs.delete_one({"blog_id": blog_id})
-    await db.comments.delete_many({"blog_id": blog_id})
-    await db.reactions.delete_many({"blog_id": blog_id})
-    logger.info(f"Blog {blog_id} and associated data deleted successfully")
+    # Remove the blog now; comments, reactions, bookmarks and media go in the background
+    result = await db.blogs.delete_one({"blog_id": blog_id})
+    blog_cache.discard_id(blog["_id"])
+    if result.deleted_count:
+        await facet_counter.apply("blogs", blog, None)
+    # Delete events don't carry the author, so the watcher can't do this
+    user_stats.mark(blog["author_email"])
+    await cascade_deleter.enqueue("blog", blog_id, {
+        "author_email": blog["author_email"],
+        "media": referenced_uploads(blog.get("cover_image_url"), blog.get("content_markdown")),
+    })
+    logger.info("Blog %s deleted, cleanup of associated data scheduled", blog_id)
 
     await event_bus.publish({
         "type": "blog:deleted",
@@ -1136,6 +1904,17 @@ async def delete_blog(blog_id: str, current_user: dict = Depends(get_current_use
     return {"message": "Blog deleted successfully"}
 
 
+@api_router.post("/blogs/preview")
+async def preview_markdown(
+    data: MarkdownPreviewRequest,
+    current_user: dict = Depends(get_current_user),
+):
+    """Render a draft body without saving it."""
+    rendered = render_markdown(data.content_markdown)
+    rendered.pop("content_hash")
+    return rendered
+
+
 @api_router.post("/blogs/upload-image")
 async def upload_blog_image(
     file: UploadFile = File(...),
@@ -1145,24 +1924,69 @@ async def upload_blog_image(
     if not file.content_type.startswith("image/"):
         raise HTTPException(status_code=400, detail="File must be an image")
 
-    # Generate unique filename
-    ext = os.path.splitext(file.filename)[1]
-    filename = f"{uuid.uuid4()}{ext}"
+    # The file is served as soon as it is written, so check what it really
+    # is first; the extension (and so the served MIME type) follows suit
+    head = await asyncio.to_thread(file.file.read, IMAGE_HEAD_BYTES)
+    info = image_info(head)
+    if info is None:
+        raise HTTPException(status_code=400, detail="File must be a PNG, GIF, JPEG or WebP image")
+    filename = f"{uuid.uuid4()}{IMAGE_EXTENSIONS[info['format']]}"
     file_path = UPLOAD_DIR / filename
 
     try:
-        with open(file_path, "wb") as f:
-            content = await file.read()
-            f.write(content)
-        
+        def write():
+            with open(file_path, "wb") as f:
+                f.write(head)
+                shutil.copyfileobj(file.file, f, 1024 * 1024)
+        await asyncio.to_thread(write)
+
         # In a real app, you'd use a full URL. For local dev:
         file_url = f"/uploads/{filename}"
+        await db.media.insert_one({
+            "filename": filename,
+            "url": file_url,
+            "owner_email": current_user["email"],
+            "status": "processing",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+        })
+        # Checking and measuring the image happens off the request
+        await job_queue.enqueue("media", {"filename": filename}, priority=5)
         return {"url": file_url}
     except Exception as e:
-        logger.error(f"Upload failed: {e}")
+        logger.error("Upload failed: %s", e)
         raise HTTPException(status_code=500, detail="Failed to upload image")
 
 
+async def _process_upload(job):
+    """Record an uploaded image's size and hash.
+
+    The upload route already checked the file's header; a file that still
+    turns out not to be a PNG, GIF, JPEG or WebP image is removed.
+    """
+    filename = job.payload["filename"]
+    path = UPLOAD_DIR / filename
+    try:
+        content = await asyncio.to_thread(path.read_bytes)
+    except FileNotFoundError:
+        return  # removed along with its blog or owner
+    info = image_info(content)
+    if info is None:
+        logger.warning("Upload %s is not a supported image; removing it", filename)
+        await asyncio.to_thread(path.unlink, missing_ok=True)
+        upload_files.handles.forget(filename)
+        await db.media.update_one({"filename": filename}, {"$set": {"status": "rejected"}})
+        return
+    digest = await asyncio.to_thread(lambda: hashlib.sha256(content).hexdigest())
+    upload_files.handles.remember(filename, digest)
+    await db.media.update_one(
+        {"filename": filename},
+        {"$set": {**info, "bytes": len(content), "sha256": digest, "status": "ready"}},
+    )
+
+
+job_queue.register("media", _process_upload, concurrency=2)
+
+
 @api_router.post("/blogs/{blog_id}/publish", response_model=BlogResponse)
 async def publish_blog(blog_id: str, current_user: dict = Depends(get_current_user)):
     blog = await db.blogs.find_one({"blog_id": blog_id})
@@ -1171,11 +1995,15 @@ async def publish_blog(blog_id: str, current_user: dict = Depends(get_current_us
     if blog["author_email"] != current_user["email"]:
         raise HTTPException(status_code=403, detail="Not authorized")
     now = datetime.now(timezone.utc).isoformat()
-    await db.blogs.update_one(
-        {"blog_id": blog_id},
-        {"$set": {"status": "published", "published_at": now, "updated_at": now}},
-    )
+    fields = {"status": "published", "published_at": now, "updated_at": now}
+    markdown = blog.get("content_markdown", "")
+    if blog.get("content_hash") != content_hash(markdown):
+        # Draft autosaves skip rendering
+        fields.update(render_markdown(markdown))
+    await db.blogs.update_one({"blog_id": blog_id}, {"$set": fields})
+    blog_cache.discard_id(blog["_id"])
     updated = await db.blogs.find_one({"blog_id": blog_id}, {"_id": 0})
+    await facet_counter.apply("blogs", blog, updated)
     response = _blog_response(updated)
 
     await event_bus.publish({
@@ -1198,7 +2026,9 @@ async def unpublish_blog(blog_id: str, current_user: dict = Depends(get_current_
         {"blog_id": blog_id},
         {"$set": {"status": "draft", "published_at": None, "updated_at": now}},
     )
+    blog_cache.discard_id(blog["_id"])
     updated = await db.blogs.find_one({"blog_id": blog_id}, {"_id": 0})
+    await facet_counter.apply("blogs", blog, updated)
     return _blog_response(updated)
 
 
@@ -1303,53 +2133,463 @@ async def toggle_bookmark(
         await db.bookmarks.delete_one({"_id": existing["_id"]})
         return {"action": "removed"}
     else:
-        await db.bookmarks.insert_one({
-            "user_email": current_user["email"],
-            "blog_id": blog_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-        })
+        try:
+            await db.bookmarks.insert_one({
+                "user_email": current_user["email"],
+                "blog_id": blog_id,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+            })
+        except DuplicateKeyError:
+            pass
         return {"action": "added"}
 
 
-@api_router.get("/bookmarks", response_model=List[BlogResponse])
-async def get_bookmarks(current_user: dict = Depends(get_current_user)):
+_BLOG_SUMMARY_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in BlogSummary.model_fields},
+}
+
+
+@api_router.get("/bookmarks", response_model=BookmarkPage)
+async def get_bookmarks(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the current user's bookmarks, most recently bookmarked first."""
+    after = _parse_cursor(cursor)
+    match = {"user_email": current_user["email"]}
+    if after:
+        match["_id"] = {"$lt": after}
+    pipeline = [
+        {"$match": match},
+        {"$sort": {"_id": -1}},
+        {"$limit": limit + 1},
+        {"$lookup": {
+            "from": "blogs",
+            "localField": "blog_id",
+            "foreignField": "blog_id",
+            "pipeline": [{"$project": _BLOG_SUMMARY_PROJECTION}],
+            "as": "blog",
+        }},
+        {"$project": {
+            "_id": 1,
+            "blog_id": 1,
+            "created_at": 1,
+            "blog": {"$arrayElemAt": ["$blog", 0]},
+        }},
+    ]
+    rows = await db.bookmarks.aggregate(pipeline).to_list(limit + 1)
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1]["_id"])
+
+    items = []
+    for row in rows:
+        blog = row.get("blog")
+        items.append(BookmarkItem(
+            blog_id=row["blog_id"],
+            bookmarked_at=parse_datetime(row["created_at"]),
+            blog=_blog_summary(blog) if blog else None,
+        ))
+    return BookmarkPage(items=items, next_cursor=next_cursor)
+
+
+@api_router.get("/bookmarks/status")
+async def check_bookmarked_many(
+    blog_ids: List[str] = Query(..., max_length=100),
+    current_user: dict = Depends(get_current_user),
+):
+    """Check in one query which of the given blogs the current user has bookmarked."""
     bookmarks = await db.bookmarks.find(
-        {"user_email": current_user["email"]}, {"_id": 0}
-    ).to_list(100)
-    blog_ids = [b["blog_id"] for b in bookmarks]
-    blogs = await db.blogs.find({"blog_id": {"$in": blog_ids}}, {"_id": 0}).to_list(100)
-    return [_blog_response(b) for b in blogs]
+        {"user_email": current_user["email"], "blog_id": {"$in": blog_ids}},
+        {"_id": 0, "blog_id": 1},
+    ).to_list(len(blog_ids))
+    bookmarked = {b["blog_id"] for b in bookmarks}
+    return {blog_id: blog_id in bookmarked for blog_id in blog_ids}
 
 
 # ---------------------------------------------------------------------------
-# SSE Stream Endpoint
+# Facet Routes
 # ---------------------------------------------------------------------------
 
 
-@api_router.get("/stream/events")
-async def sse_stream():
-    """SSE endpoint — clients subscribe to real-time updates."""
+@api_router.get("/facets/{kind}", response_model=FacetsResponse)
+async def get_facets(
+    kind: str,
+    fields: Optional[List[str]] = Query(None, max_length=10),
+    limit: int = Query(50, ge=1, le=500),
+):
+    """Value counts for the filterable fields of ``blogs`` (published only) or ``projects``."""
+    if kind not in FACET_FIELDS:
+        raise HTTPException(status_code=404, detail="Unknown facet collection")
+    fields = fields or list(FACET_FIELDS[kind])
+    unknown = set(fields) - set(FACET_FIELDS[kind])
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown facet fields: {', '.join(sorted(unknown))}")
+    facets = await facet_counter.get(kind, fields, limit)
+    return FacetsResponse(
+        kind=kind,
+        facets={field: [FacetValue(**v) for v in values] for field, values in facets.items()},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Related Content Routes
+# ---------------------------------------------------------------------------
+
+
+@api_router.get("/blogs/{blog_id}/related", response_model=List[RelatedItem])
+async def get_related_to_blog(blog_id: str, limit: int = Query(5, ge=1, le=20)):
+    """Blogs and projects most similar to a published blog, precomputed."""
+    return related_content.related("blog", blog_id, limit)
+
+
+@api_router.get("/projects/{project_id}/related", response_model=List[RelatedItem])
+async def get_related_to_project(project_id: str, limit: int = Query(5, ge=1, le=20)):
+    """Blogs and projects most similar to a project, precomputed."""
+    return related_content.related("project", project_id, limit)
+
+
+# ---------------------------------------------------------------------------
+# View Analytics Routes
+# ---------------------------------------------------------------------------
+
+_VIEW_RANGES = {"hour": (timedelta(hours=48), timedelta(days=31)), "day": (timedelta(days=30), timedelta(days=730))}
+
+
+def _parse_range_bound(value: Optional[str], name: str) -> Optional[datetime]:
+    if value is None:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {name}; expected an ISO date or timestamp")
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+@api_router.get("/analytics/blog-views", response_model=BlogViewsResponse)
+async def get_blog_views(
+    blog_ids: Optional[List[str]] = Query(None, max_length=100),
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    granularity: str = Query("day", pattern="^(hour|day)$"),
+    current_user: dict = Depends(get_current_user),
+):
+    """View counts per hour or day for the given blogs (default: all of the caller's).
+
+    Only the caller's own blogs are included unless the caller is an admin.
+    """
+    default_span, max_span = _VIEW_RANGES[granularity]
+    end_at = _parse_range_bound(end, "end") or datetime.now(timezone.utc)
+    start_at = _parse_range_bound(start, "start") or end_at - default_span
+    if start_at > end_at:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    if end_at - start_at > max_span:
+        raise HTTPException(status_code=400, detail=f"Range too large for {granularity} granularity")
+
+    author_email = None if blog_ids and _is_admin(current_user) else current_user["email"]
+    by_blog = await view_recorder.series(granularity, start_at, end_at, blog_ids, author_email)
+
+    totals: dict = {}
+    series = []
+    for blog_id, points in by_blog.items():
+        for bucket, views in points:
+            totals[bucket] = totals.get(bucket, 0) + views
+        series.append(BlogViewSeries(
+            blog_id=blog_id,
+            total=sum(views for _, views in points),
+            points=[ViewPoint(bucket=b, views=v) for b, v in points],
+        ))
+    return BlogViewsResponse(
+        granularity=granularity,
+        start=start_at,
+        end=end_at,
+        series=series,
+        totals=[ViewPoint(bucket=b, views=totals[b]) for b in sorted(totals)],
+    )
+
+
+@api_router.get("/me/stats", response_model=UserStatsResponse)
+async def get_my_stats(current_user: dict = Depends(get_current_user)):
+    """Dashboard totals for the caller, read from the ``user_stats`` read model.
+
+    Rows trail the source collections by a few seconds.
+    """
+    row = await user_stats.get(current_user["email"])
+    row.pop("_id", None)
+    return UserStatsResponse(**row)
+
+
+# ---------------------------------------------------------------------------
+# Export / Import Routes
+# ---------------------------------------------------------------------------
 
-    async def event_generator():
-        queue = await event_bus.subscribe()
+_EXPORT_TYPES = ("projects", "blogs", "comments")
+_IMPORT_ID = re.compile(r"^[\w-]{1,64}$")
+
+
+@api_router.get("/me/export")
+async def export_my_content(
+    types: List[str] = Query(list(_EXPORT_TYPES)),
+    current_user: dict = Depends(get_current_user),
+):
+    """Stream the caller's projects, blogs and comments as NDJSON."""
+    unknown = set(types) - set(_EXPORT_TYPES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown export types: {', '.join(sorted(unknown))}")
+    email = current_user["email"]
+    queries = {
+        "projects": ("project", listing_db.projects, {"user_email": email}, {"_id": 0}),
+        "blogs": ("blog", listing_db.blogs, {"author_email": email}, {"_id": 0, "content_html": 0, "toc": 0}),
+        "comments": ("comment", listing_db.comments, {"author_email": email}, {"_id": 0}),
+    }
+    sources = []
+    for name in _EXPORT_TYPES:
+        if name in types:
+            kind, collection, query, projection = queries[name]
+            sources.append((kind, collection.find(query, projection).sort("_id", 1).batch_size(200)))
+    header = {
+        "username": current_user["username"],
+        "exported_at": datetime.now(timezone.utc).isoformat(),
+    }
+    return StreamingResponse(
+        export_ndjson(header, sources),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="kudosdev-{current_user["username"]}.ndjson"'},
+    )
+
+
+def _import_id(value) -> str:
+    """Keep an exported id so re-importing is idempotent; mint one otherwise."""
+    if isinstance(value, str) and _IMPORT_ID.match(value):
+        return value
+    return str(uuid.uuid4())
+
+
+def _import_timestamp(value, default: str) -> str:
+    if isinstance(value, str):
         try:
-            # Send initial heartbeat so the client knows the connection is alive
-            yield ": connected\n\n"
-            while True:
-                try:
-                    # Wait for events with a timeout (heartbeat every 30s)
-                    event = await asyncio.wait_for(queue.get(), timeout=30.0)
-                    yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
-                except asyncio.TimeoutError:
-                    # Send heartbeat comment to keep connection alive
-                    yield ": heartbeat\n\n"
-        except asyncio.CancelledError:
+            return parse_datetime(value).isoformat()
+        except ValueError:
             pass
-        finally:
-            event_bus.unsubscribe(queue)
+    return default
+
+
+def _import_count(value) -> int:
+    return value if isinstance(value, int) and value >= 0 else 0
+
+
+def _validation_message(e: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, err['loc']))}: {err['msg']}" for err in e.errors())
+
+
+def _import_project(row: dict, owner: dict, now: str) -> dict:
+    doc = ProjectCreate.model_validate(row).model_dump()
+    doc["project_id"] = _import_id(row.get("project_id"))
+    doc["user_email"] = owner["email"]
+    doc["user_username"] = owner["username"]
+    doc["user_full_name"] = owner["full_name"]
+    doc["created_at"] = _import_timestamp(row.get("created_at"), now)
+    doc["updated_at"] = _import_timestamp(row.get("updated_at"), doc["created_at"])
+    return doc
+
+
+def _import_blog(row: dict, owner: dict, now: str) -> dict:
+    data = BlogCreate.model_validate(row)
+    if data.status not in ("draft", "published"):
+        raise ValueError("status: must be draft or published")
+    doc = data.model_dump()
+    doc["blog_id"] = _import_id(row.get("blog_id"))
+    doc["slug"] = generate_slug(data.title)
+    doc["author_email"] = owner["email"]
+    doc["author_username"] = owner["username"]
+    doc["author_full_name"] = owner["full_name"]
+    doc.update(render_markdown(data.content_markdown))
+    doc["view_count"] = _import_count(row.get("view_count"))
+    # Recounted as comments are imported; reactions are not part of the export
+    doc["comment_count"] = 0
+    doc["reaction_count"] = 0
+    doc["created_at"] = _import_timestamp(row.get("created_at"), now)
+    doc["updated_at"] = _import_timestamp(row.get("updated_at"), doc["created_at"])
+    doc["published_at"] = (
+        _import_timestamp(row.get("published_at"), now) if data.status == "published" else None
+    )
+    return doc
+
+
+def _import_comment(row: dict, owner: dict, now: str) -> dict:
+    data = CommentCreate.model_validate(row)
+    if not isinstance(row.get("blog_id"), str):
+        raise ValueError("blog_id: field required")
+    doc = {
+        "comment_id": _import_id(row.get("comment_id")),
+        "blog_id": row["blog_id"],
+        "parent_comment_id": data.parent_comment_id,
+        "author_email": owner["email"],
+        "author_username": owner["username"],
+        "author_full_name": owner["full_name"],
+        "content": data.content,
+        "upvotes": _import_count(row.get("upvotes")),
+        "created_at": _import_timestamp(row.get("created_at"), now),
+    }
+    return doc
+
+
+# row type -> (document builder, id field the upsert is keyed on)
+_IMPORTERS = {
+    "project": (_import_project, "project_id"),
+    "blog": (_import_blog, "blog_id"),
+    "comment": (_import_comment, "comment_id"),
+}
+
+
+async def _count_imported_comments(blog_ids: List[str]):
+    counts: dict = {}
+    for blog_id in blog_ids:
+        counts[blog_id] = counts.get(blog_id, 0) + 1
+    await db.blogs.bulk_write(
+        [UpdateOne({"blog_id": b}, {"$inc": {"comment_count": n}}) for b, n in counts.items()],
+        ordered=False,
+    )
+
+
+@api_router.post("/me/import")
+async def import_content(
+    request: Request,
+    username: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    """Bulk-import NDJSON (as produced by ``/me/export``) from the request body.
+
+    Rows are upserted by their id, so re-running an import is safe. Admins
+    may import into another account with ``?username=``.
+    """
+    owner = current_user
+    if username and username != current_user["username"]:
+        if not _is_admin(current_user):
+            raise HTTPException(status_code=403, detail="Only admins can import for another user")
+        owner = await db.users.find_one({"username": username}, {"_id": 0, "password": 0})
+        if not owner:
+            raise HTTPException(status_code=404, detail="User not found")
+
+    importer = BulkImporter(
+        db,
+        {"project": "projects", "blog": "blogs", "comment": "comments"},
+        # Comments are checked against blogs, which may come from the same file
+        depends_on={"comment": "blog"},
+        on_inserted={
+            "comment": _count_imported_comments,
+            "project": lambda docs: facet_counter.apply_many("projects", [(None, d) for d in docs]),
+            "blog": lambda docs: facet_counter.apply_many("blogs", [(None, d) for d in docs]),
+        },
+    )
+    known_blogs: dict = {}
+    now = datetime.now(timezone.utc).isoformat()
+    lines = 0
+    async for line, row, error in iter_ndjson(request.stream()):
+        lines = line
+        if error:
+            importer.error(line, error)
+            continue
+        kind = row.get("type")
+        if kind == "meta":
+            continue
+        if kind not in _IMPORTERS or not isinstance(row.get("data"), dict):
+            importer.error(line, "expected {\"type\": project|blog|comment, \"data\": {...}}")
+            continue
+        data = row["data"]
+        build, id_field = _IMPORTERS[kind]
+        try:
+            doc = build(data, owner, now)
+        except ValidationError as e:
+            importer.error(line, _validation_message(e))
+            continue
+        except ValueError as e:
+            importer.error(line, str(e))
+            continue
+
+        tag = doc
+        if kind == "blog":
+            known_blogs[doc["blog_id"]] = True
+        elif kind == "comment":
+            blog_id = doc["blog_id"]
+            if blog_id not in known_blogs:
+                known_blogs[blog_id] = bool(await db.blogs.find_one({"blog_id": blog_id}, {"_id": 1}))
+            if not known_blogs[blog_id]:
+                importer.error(line, f"blog {blog_id} not found")
+                continue
+            tag = blog_id
+        op = UpdateOne({id_field: doc[id_field]}, {"$setOnInsert": doc}, upsert=True)
+        await importer.add(kind, line, op, tag)
+
+    await importer.flush()
+    logger.info(
+        "Imported NDJSON for %s: %s inserted, %s errors",
+        owner["username"], importer.inserted, importer.error_count,
+    )
+    return importer.report(lines)
+
+
+# ---------------------------------------------------------------------------
+# Batch Route
+# ---------------------------------------------------------------------------
+
+batch_executor = batch.BatchExecutor(api_router)
+
+
+@api_router.post("/batch", response_model=BatchResponse)
+async def run_batch(
+    data: BatchRequest,
+    request: Request,
+    current_user: Optional[dict] = Depends(get_optional_user),
+):
+    """Run several API calls in one round trip.
+
+    Sub-requests execute concurrently (at most BATCH_CONCURRENCY at a time)
+    and share this request's authentication. Results come back in request
+    order, each with its own status; one failing does not fail the rest.
+    """
+    runnable, results = [], [None] * len(data.requests)
+    for i, sub in enumerate(data.requests):
+        problem = batch.validate_path(sub.path)
+        if problem:
+            results[i] = BatchSubResponse(id=sub.id, status=400, body={"detail": problem})
+        else:
+            runnable.append((i, sub))
+
+    credentials = request.headers.get("authorization", "")
+    scheme, _, token = credentials.partition(" ")
+    extra_state = {}
+    if scheme.lower() == "bearer" and token:
+        extra_state["batch_auth"] = {"token": token, "user": current_user}
+
+    responses = await batch_executor.run(
+        request.scope, [sub.model_dump() for _, sub in runnable], extra_state,
+    )
+    for (i, sub), response in zip(runnable, responses):
+        results[i] = BatchSubResponse(id=sub.id, status=response.status, body=response.body())
+    return BatchResponse(responses=results)
+
+
+# ---------------------------------------------------------------------------
+# SSE Stream Endpoint
+# ---------------------------------------------------------------------------
+
+
+@api_router.get("/stream/events")
+async def sse_stream(request: Request):
+    """SSE endpoint — clients subscribe to real-time updates."""
+    try:
+        conn = sse_connections.open(sse_connections.client_ip(request.scope))
+    except ConnectionRejected as e:
+        # Clients back off instead of reconnecting in a tight loop
+        raise HTTPException(status_code=e.status_code, detail=e.detail, headers={"Retry-After": "30"})
 
     return StreamingResponse(
-        event_generator(),
+        sse_connections.stream(conn),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -1359,6 +2599,207 @@ async def sse_stream():
     )
 
 
+@api_router.websocket("/stream/ws")
+async def websocket_stream(websocket: WebSocket):
+    """WebSocket alternative to /stream/events: MessagePack events, per-socket topic subscriptions."""
+    await ws_stream.serve(websocket, sse_connections)
+
+
+@api_router.get("/stream/stats")
+async def sse_stats(current_user: dict = Depends(get_current_user)):
+    """Live SSE connection counts for this worker (admin only)."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    per_ip = sse_connections.per_ip()
+    busiest = sorted(per_ip.items(), key=lambda item: item[1], reverse=True)[:20]
+    return {
+        "connections": sse_connections.count,
+        "websocket_connections": sse_connections.raw_count,
+        "max_connections": sse_connections.max_connections,
+        "max_per_ip": sse_connections.max_per_ip,
+        "distinct_ips": len(per_ip),
+        "busiest_ips": [{"ip": ip, "connections": n} for ip, n in busiest],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Request Profiles
+# ---------------------------------------------------------------------------
+
+
+@api_router.get("/admin/profiles")
+async def list_profiles(current_user: dict = Depends(get_current_user)):
+    """Stored request profiles, newest first, without their stacks (admin only).
+
+    Send ``X-Profile: 1`` with an admin token to profile a request; its id
+    comes back in ``X-Profile-Id``.
+    """
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await asyncio.to_thread(profile_store.list)
+
+
+@api_router.get("/admin/profiles/{profile_id}")
+async def get_profile(profile_id: str, current_user: dict = Depends(get_current_user)):
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return profile
+
+
+@api_router.get("/admin/profiles/{profile_id}/folded")
+async def download_profile_stacks(profile_id: str, current_user: dict = Depends(get_current_user)):
+    """Collapsed stacks for flamegraph.pl, speedscope or inferno."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    profile = await asyncio.to_thread(profile_store.get, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(
+        profile["folded"] + "\n",
+        headers={"Content-Disposition": f'attachment; filename="{profile_id}.folded"'},
+    )
+
+
+# ---------------------------------------------------------------------------
+# Slow Operations
+# ---------------------------------------------------------------------------
+
+
+@api_router.get("/admin/slow-operations")
+async def list_slow_operations(
+    sort: Literal["total_ms", "count", "max_ms"] = "total_ms",
+    limit: int = Query(20, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+):
+    """The slowest MongoDB query shapes across all workers (admin only).
+
+    Each entry is one shape (literals replaced by their type) with how often
+    it exceeded ``SLOW_OP_THRESHOLD_MS``, total, mean and max milliseconds,
+    the routes and handlers that issued it, and the plan MongoDB chose for
+    it the first time it was slow. Counts reach the report within
+    ``SLOW_OP_FLUSH_SECONDS``.
+    """
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await slow_operations.report(db, sort, limit)
+
+
+@api_router.delete("/admin/slow-operations")
+async def reset_slow_operations(current_user: dict = Depends(get_current_user)):
+    """Start a fresh report, e.g. after adding an index."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    deleted = await slow_operations.reset(db)
+    return {"message": "Slow operation report cleared", "deleted": deleted}
+
+
+# ---------------------------------------------------------------------------
+# Background Jobs
+# ---------------------------------------------------------------------------
+
+
+@api_router.get("/admin/jobs")
+async def job_queue_stats(current_user: dict = Depends(get_current_user)):
+    """Jobs per queue and status, with each queue's limits (admin only)."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await job_queue.stats()
+
+
+@api_router.get("/admin/jobs/failed")
+async def list_failed_jobs(
+    queue: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=200),
+    current_user: dict = Depends(get_current_user),
+):
+    """Jobs that used up their attempts, newest first, with their last error."""
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return await job_queue.failed(queue, limit)
+
+
+@api_router.post("/admin/jobs/{job_id}/retry")
+async def retry_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    if not _is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    if not await job_queue.retry(job_id):
+        raise HTTPException(status_code=404, detail="Failed job not found")
+    return {"message": "Job queued for retry"}
+
+
+# ---------------------------------------------------------------------------
+# Health
+# ---------------------------------------------------------------------------
+
+
+@app.get("/health/live", include_in_schema=False)
+async def liveness():
+    """The process is up and serving; says nothing about its dependencies."""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready", include_in_schema=False)
+async def readiness():
+    """Ready for traffic once every startup phase has finished successfully."""
+    if startup.ready and not startup.ok:
+        # Some phase failed (MongoDB down, index build error...); re-run it so
+        # the instance recovers once the cause is gone
+        await startup.retry_failed(timeout=2.0)
+    ready = startup.ok
+    return JSONResponse(
+        {"status": "ready" if ready else "starting", "phases": startup.phases},
+        status_code=200 if ready else 503,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Metrics
+# ---------------------------------------------------------------------------
+
+metrics.registry.register(metrics.Gauge(
+    "sse_subscribers", "Connected real-time clients, SSE and WebSocket.",
+    function=lambda: sse_connections.count,
+))
+metrics.registry.register(metrics.Gauge(
+    "ws_subscribers", "Connected WebSocket event clients (also counted in sse_subscribers).",
+    function=lambda: sse_connections.raw_count,
+))
+metrics.registry.register(metrics.Gauge(
+    "sse_client_ips", "Distinct client addresses with an open SSE connection.",
+    function=lambda: len(sse_connections.per_ip()),
+))
+metrics.registry.register(metrics.Gauge(
+    "sse_connections_per_ip_max", "Open SSE connections from the busiest client address.",
+    function=lambda: max(sse_connections.per_ip().values(), default=0),
+))
+metrics.registry.register(metrics.Gauge(
+    "sse_queue_depth_total", "Frames waiting in all SSE connection queues.",
+    function=lambda: sum(sse_connections.queue_depths()),
+))
+metrics.registry.register(metrics.Gauge(
+    "sse_queue_depth_max", "Frames waiting in the most backed-up SSE connection queue.",
+    function=lambda: max(sse_connections.queue_depths(), default=0),
+))
+# The in-process bus the SSE fan-out and other consumers subscribe to
+metrics.registry.register(metrics.Gauge(
+    "event_bus_subscribers", "Queues subscribed to the in-process event bus.",
+    function=lambda: event_bus.subscriber_count,
+))
+metrics.registry.register(metrics.Gauge(
+    "event_bus_queue_depth_max", "Events waiting in the most backed-up event bus queue.",
+    function=lambda: max(event_bus.queue_depths(), default=0),
+))
+
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    """Prometheus scrape endpoint."""
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # ---------------------------------------------------------------------------
 # Mount router
 # ---------------------------------------------------------------------------
@@ -0,0 +1,296 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from pymongo import UpdateOne, monitoring
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+THRESHOLD_MS = float(os.environ.get("SLOW_OP_THRESHOLD_MS", "100"))
+FLUSH_SECONDS = float(os.environ.get("SLOW_OP_FLUSH_SECONDS", "10"))
+EXPLAIN = os.environ.get("SLOW_OP_EXPLAIN", "true").lower() in ("1", "true", "yes")
+_MAX_PENDING_EXPLAINS = 100
+_MAX_BUFFERED_SHAPES = 1000
+
+COLLECTION = "slow_operations"
+
+# Commands whose shape and plan are worth recording, and where the query is
+_QUERY_FIELDS = {
+    "find": ("filter", "sort", "projection"),
+    "aggregate": ("pipeline",),
+    "count": ("query",),
+    "distinct": ("key", "query"),
+    "findAndModify": ("query", "sort", "update"),
+    "update": ("updates",),
+    "delete": ("deletes",),
+}
+# Driver bookkeeping that explain either rejects or does not need
+_SESSION_FIELDS = {"lsid", "txnNumber", "$clusterTime", "$db", "$readPreference", "readConcern", "writeConcern", "cursor"}
+
+SLOW_COMMANDS = metrics.registry.register(metrics.Counter(
+    "mongo_slow_commands_total", "MongoDB commands slower than SLOW_OP_THRESHOLD_MS.", ("command",),
+))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def query_shape(value: Any) -> Any:
+    """``value`` with every literal replaced by its type, keeping field names and operators."""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        # $in / $nin lists: one element shows the type, the length is data
+        shapes = []
+        for item in value:
+            shape = query_shape(item)
+            if shape not in shapes:
+                shapes.append(shape)
+        return shapes
+    if value is None:
+        return None
+    return f"<{type(value).__name__}>"
+
+
+def _shape_of(command_name: str, command: dict) -> dict:
+    shape = {}
+    for field in _QUERY_FIELDS[command_name]:
+        value = command.get(field)
+        if field in ("updates", "deletes") and isinstance(value, list) and value:
+            value = value[0]
+        if field == "key":
+            shape[field] = value  # a field name, not data
+        elif value is not None:
+            shape[field] = query_shape(value)
+    return shape
+
+
+def _summarize_plan(stage: dict) -> dict:
+    """The stage tree without bounds or filters (which hold query values)."""
+    summary = {"stage": stage.get("stage", "?")}
+    for key in ("indexName", "keyPattern", "direction", "isMultiKey"):
+        if key in stage:
+            summary[key] = stage[key]
+    children = [stage["inputStage"]] if "inputStage" in stage else stage.get("inputStages", [])
+    if children:
+        summary["inputs"] = [_summarize_plan(child) for child in children]
+    return summary
+
+
+def _find_key(document: Any, key: str) -> Optional[Any]:
+    if isinstance(document, dict):
+        if key in document:
+            return document[key]
+        values = document.values()
+    elif isinstance(document, list):
+        values = document
+    else:
+        return None
+    for value in values:
+        found = _find_key(value, key)
+        if found is not None:
+            return found
+    return None
+
+
+def _stages(plan: dict) -> List[str]:
+    names = [plan["stage"]]
+    for child in plan.get("inputs", []):
+        names.extend(_stages(child))
+    return names
+
+
+def summarize_explain(explain: dict) -> dict:
+    planner = _find_key(explain, "queryPlanner") or {}
+    winning = planner.get("winningPlan", {})
+    # Slot-based engine plans nest the classic tree under queryPlan
+    plan = _summarize_plan(winning.get("queryPlan", winning))
+    stages = _stages(plan)
+    return {
+        "plan": plan,
+        "collscan": "COLLSCAN" in stages,
+        "indexes": sorted({name for name in _indexes(plan)}),
+        "rejected_plans": len(planner.get("rejectedPlans", [])),
+    }
+
+
+def _indexes(plan: dict):
+    if "indexName" in plan:
+        yield plan["indexName"]
+    for child in plan.get("inputs", []):
+        yield from _indexes(child)
+
+
+class SlowOperationRecorder(monitoring.CommandListener):
+    """Collects MongoDB commands slower than ``THRESHOLD_MS``.
+
+    As a pymongo command listener it keeps each query command until it
+    completes; a slow one is reduced to its shape (field names and
+    operators, literals replaced by their type) and counted under that
+    shape, together with the route and handler of the request that issued
+    it (``background`` outside requests). ``run()`` flushes the counts into
+    ``slow_operations`` every ``FLUSH_SECONDS``, one document per shape
+    shared by all workers, and the first time a worker sees a shape it
+    also runs ``explain`` (queryPlanner only, nothing executes) on the
+    original command and stores a summary of the winning plan.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, tuple] = {}
+        self._buffer: Dict[str, dict] = {}
+        self._explain_queue: List[tuple] = []
+        self._explained: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    # -- pymongo listener (called on driver threads) ------------------------
+
+    def started(self, event):
+        if event.command_name not in _QUERY_FIELDS or event.command.get(event.command_name) == COLLECTION:
+            return
+        request = metrics.current_request.get()
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (
+                event.command, event.database_name, request,
+            )
+
+    def succeeded(self, event):
+        self._finish(event)
+
+    def failed(self, event):
+        self._finish(event)
+
+    def _finish(self, event):
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        ms = event.duration_micros / 1000
+        if ms < THRESHOLD_MS:
+            return
+        command, database, request = pending
+        try:
+            self._record(event.command_name, command, database, request, ms)
+        except Exception as e:
+            logger.warning("Could not record slow %s: %s", event.command_name, e)
+
+    def _record(self, name: str, command: dict, database: str, request, ms: float):
+        SLOW_COMMANDS.inc(command=name)
+        collection = command.get(name)
+        shape = {"command": name, "collection": collection, **_shape_of(name, command)}
+        key = hashlib.sha1(json.dumps(shape, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        scope = getattr(request, "scope", None) or {}
+        route = getattr(scope.get("route"), "path", None)
+        source = f"{scope['method']} {route}" if route else "background"
+        endpoint = scope.get("endpoint")
+        handler = getattr(endpoint, "__name__", None) or "background"
+
+        with self._lock:
+            entry = self._buffer.get(key)
+            if entry is None:
+                if len(self._buffer) >= _MAX_BUFFERED_SHAPES:
+                    return  # flush is behind; the next slow run of this shape counts
+                entry = self._buffer[key] = {
+                    "shape": shape, "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+                    "sources": {}, "handlers": {},
+                }
+            entry["count"] += 1
+            entry["total_ms"] += ms
+            entry["max_ms"] = max(entry["max_ms"], ms)
+            entry["sources"][source] = entry["sources"].get(source, 0) + 1
+            entry["handlers"][handler] = entry["handlers"].get(handler, 0) + 1
+            wants_explain = (
+                EXPLAIN and key not in self._explained and len(self._explain_queue) < _MAX_PENDING_EXPLAINS
+            )
+            if wants_explain:
+                self._explained.add(key)
+                self._explain_queue.append((key, name, command, database))
+        if wants_explain and self._loop is not None and self._wakeup is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+
+    # -- worker ---------------------------------------------------------------
+
+    async def run(self, db):
+        """Flush counts into ``db`` and capture plans until cancelled."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        try:
+            while True:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=FLUSH_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                try:
+                    await self.flush(db)
+                except Exception as e:
+                    logger.error("Slow operation flush failed: %s", e)
+        except asyncio.CancelledError:
+            pass
+
+    async def flush(self, db):
+        with self._lock:
+            buffer, self._buffer = self._buffer, {}
+            explains, self._explain_queue = self._explain_queue, []
+
+        now = _now()
+        ops = []
+        for key, entry in buffer.items():
+            inc = {"count": entry["count"], "total_ms": entry["total_ms"]}
+            for field in ("sources", "handlers"):
+                for name, n in entry[field].items():
+                    # Route templates may contain dots, which field names cannot
+                    inc[f"{field}.{name.replace('.', '_').replace('$', '_')}"] = n
+            ops.append(UpdateOne(
+                {"_id": key},
+                {
+                    "$inc": inc,
+                    "$max": {"max_ms": entry["max_ms"]},
+                    "$set": {"last_seen": now},
+                    "$setOnInsert": {"shape": entry["shape"], "first_seen": now},
+                },
+                upsert=True,
+            ))
+        if ops:
+            await db[COLLECTION].bulk_write(ops, ordered=False)
+
+        for key, name, command, database in explains:
+            if await db[COLLECTION].count_documents({"_id": key, "explain": {"$exists": True}}, limit=1):
+                continue  # another worker already captured it
+            explainable = {k: v for k, v in command.items() if k not in _SESSION_FIELDS}
+            try:
+                result = await db.client[database].command(
+                    {"explain": explainable, "verbosity": "queryPlanner"}
+                )
+                explain = summarize_explain(result)
+            except Exception as e:
+                explain = {"error": str(e)}
+            explain["captured_at"] = now
+            await db[COLLECTION].update_one({"_id": key}, {"$set": {"explain": explain}})
+
+    async def report(self, db, sort: str, limit: int) -> List[dict]:
+        """The top ``limit`` shapes by ``sort`` (total_ms, count or max_ms)."""
+        docs = await db[COLLECTION].find({}).sort(sort, -1).limit(limit).to_list(limit)
+        for doc in docs:
+            doc["shape_id"] = doc.pop("_id")
+            doc["mean_ms"] = round(doc["total_ms"] / doc["count"], 2) if doc.get("count") else 0.0
+        return docs
+
+    async def reset(self, db) -> int:
+        with self._lock:
+            self._buffer.clear()
+            self._explained.clear()
+        result = await db[COLLECTION].delete_many({})
+        return result.deleted_count
+
+
+slow_operations = SlowOperationRecorder()
@@ -0,0 +1,221 @@
+import asyncio
+import json
+import logging
+import os
+from collections import Counter
+from typing import Dict, Iterable, Optional, Set
+
+import metrics
+
+logger = logging.getLogger(__name__)
+
+MAX_CONNECTIONS = int(os.environ.get("SSE_MAX_CONNECTIONS", "2000"))
+MAX_PER_IP = int(os.environ.get("SSE_MAX_PER_IP", "10"))
+HEARTBEAT_SECONDS = float(os.environ.get("SSE_HEARTBEAT_SECONDS", "15"))
+# A client that has not finished a write for this long is treated as gone
+STALL_SECONDS = float(os.environ.get("SSE_STALL_SECONDS", str(HEARTBEAT_SECONDS * 3)))
+QUEUE_SIZE = int(os.environ.get("SSE_QUEUE_SIZE", "256"))
+# Required behind a reverse proxy: otherwise every client shares the proxy's
+# IP and MAX_PER_IP caps the whole site. Only enable it when the proxy sets
+# X-Forwarded-For, since clients can forge the header otherwise.
+TRUST_FORWARDED = os.environ.get("SSE_TRUST_FORWARDED", "false").lower() in ("1", "true", "yes")
+
+CONNECTED = ": connected\n\n"
+HEARTBEAT = ": heartbeat\n\n"
+# Queued to a connection the manager has dropped; its stream ends on reading it
+CLOSED = object()
+
+SSE_REJECTED = metrics.registry.register(metrics.Counter(
+    "sse_rejected_total", "SSE connections refused at the cap.", ("reason",),
+))
+SSE_CLOSED = metrics.registry.register(metrics.Counter(
+    "sse_closed_total", "SSE connections ended, by cause.", ("reason",),
+))
+
+
+class ConnectionRejected(Exception):
+    def __init__(self, reason: str, detail: str, status_code: int):
+        super().__init__(detail)
+        self.reason = reason
+        self.detail = detail
+        self.status_code = status_code
+
+
+class SSEConnection:
+    """One live client. ``raw`` connections receive event dicts and encode
+    them themselves (the WebSocket transport); others receive SSE frames.
+    ``topics`` None means every event type."""
+
+    __slots__ = ("ip", "queue", "last_progress", "closed", "raw", "topics")
+
+    def __init__(self, ip: str, now: float, raw: bool = False, topics: Optional[Set[str]] = None):
+        self.ip = ip
+        self.queue: asyncio.Queue = asyncio.Queue(QUEUE_SIZE)
+        self.last_progress = now
+        self.closed = False
+        self.raw = raw
+        self.topics = topics
+
+    def wants(self, event_type: str) -> bool:
+        if self.topics is None:
+            return True
+        return (
+            event_type in self.topics
+            or "*" in self.topics
+            or f"{event_type.partition(':')[0]}:*" in self.topics
+        )
+
+    def offer(self, frame) -> bool:
+        """Queue ``frame`` without waiting; False if the client has fallen too far behind."""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            return False
+
+
+class SSEConnectionManager:
+    """Owns every SSE connection of this worker.
+
+    A single subscription to the event bus fans each event out to all
+    connections (SSE ones get one frame encoded once for all of them), and a single ticker queues
+    heartbeats for all of them, so an idle connection costs a queue and no
+    timers. The ticker also reaps clients that stop reading: one whose
+    queue overflows or that has not completed a write for
+    ``STALL_SECONDS`` is unregistered at once (freeing its slot) and its
+    stream ends the next time it runs. Connections of both transports are
+    capped together, per worker and per client IP.
+    """
+
+    def __init__(self, max_connections: int = MAX_CONNECTIONS, max_per_ip: int = MAX_PER_IP):
+        self.max_connections = max_connections
+        self.max_per_ip = max_per_ip
+        self._connections: Set[SSEConnection] = set()
+        self._per_ip: Counter = Counter()
+        self.accepting = True
+
+    # -- accounting ---------------------------------------------------------
+
+    @property
+    def count(self) -> int:
+        return len(self._connections)
+
+    @property
+    def raw_count(self) -> int:
+        return sum(1 for c in self._connections if c.raw)
+
+    def per_ip(self) -> Dict[str, int]:
+        return dict(self._per_ip)
+
+    def queue_depths(self):
+        return [c.queue.qsize() for c in self._connections]
+
+    @staticmethod
+    def client_ip(scope: dict) -> str:
+        if TRUST_FORWARDED:
+            for key, value in scope.get("headers", []):
+                if key == b"x-forwarded-for":
+                    return value.decode("latin-1").split(",")[0].strip()
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    # -- connection lifecycle -----------------------------------------------
+
+    def open(self, ip: str, raw: bool = False, topics: Optional[Iterable[str]] = None) -> SSEConnection:
+        if not self.accepting:
+            raise self._reject("shutdown", "Server is shutting down", 503)
+        if len(self._connections) >= self.max_connections:
+            raise self._reject("global", "Too many live connections on this server; retry shortly", 503)
+        if self._per_ip[ip] >= self.max_per_ip:
+            raise self._reject("per_ip", "Too many live connections from this address", 429)
+        conn = SSEConnection(
+            ip, asyncio.get_running_loop().time(), raw, None if topics is None else set(topics)
+        )
+        self._connections.add(conn)
+        self._per_ip[ip] += 1
+        return conn
+
+    def close(self, conn: SSEConnection, reason: str):
+        if conn.closed:
+            return
+        conn.closed = True
+        self._connections.discard(conn)
+        self._per_ip[conn.ip] -= 1
+        if self._per_ip[conn.ip] <= 0:
+            del self._per_ip[conn.ip]
+        if not conn.offer(CLOSED):
+            # Full queue (the "slow" case): the stream must still see the
+            # close, as nothing else will wake it once it is unregistered.
+            # Give up the oldest frame for it; the client reconnects anyway.
+            conn.queue.get_nowait()
+            conn.queue.put_nowait(CLOSED)
+        SSE_CLOSED.inc(reason=reason)
+
+    @staticmethod
+    def _reject(reason: str, detail: str, status_code: int) -> ConnectionRejected:
+        SSE_REJECTED.inc(reason=reason)
+        return ConnectionRejected(reason, detail, status_code)
+
+    async def stream(self, conn: SSEConnection):
+        """The response body for ``conn``: frames until the client or the server goes away."""
+        loop = asyncio.get_running_loop()
+        reason = "client"
+        try:
+            yield CONNECTED
+            while True:
+                # Resumed only after the previous frame was handed to the transport
+                conn.last_progress = loop.time()
+                frame = await conn.queue.get()
+                if frame is CLOSED:
+                    reason = None
+                    return
+                yield frame
+        finally:
+            if reason:
+                self.close(conn, reason)
+
+    # -- shared tasks -------------------------------------------------------
+
+    def broadcast(self, event: dict):
+        frame = None
+        for conn in list(self._connections):
+            if not conn.wants(event["type"]):
+                continue
+            if not conn.raw and frame is None:
+                frame = f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+            if not conn.offer(event if conn.raw else frame):
+                self.close(conn, "slow")
+
+    async def run(self, event_bus):
+        """Fan out event-bus events and tick heartbeats until cancelled."""
+        queue = await event_bus.subscribe()
+        ticker = asyncio.create_task(self._tick())
+        try:
+            while True:
+                event = await queue.get()
+                try:
+                    self.broadcast(event)
+                except (KeyError, TypeError, ValueError) as e:
+                    logger.warning("Dropping unencodable SSE event: %s", e)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            ticker.cancel()
+            event_bus.unsubscribe(queue)
+
+    async def _tick(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(HEARTBEAT_SECONDS)
+            stalled_before = loop.time() - STALL_SECONDS
+            for conn in list(self._connections):
+                if conn.last_progress < stalled_before and not conn.queue.empty():
+                    self.close(conn, "stalled")
+                elif not conn.offer(HEARTBEAT):
+                    self.close(conn, "slow")
+
+    def shutdown(self):
+        """Stop accepting and end every open stream."""
+        self.accepting = False
+        for conn in list(self._connections):
+            self.close(conn, "shutdown")
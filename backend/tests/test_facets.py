@@ -0,0 +1,109 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from mongomock_motor import AsyncMongoMockClient
+
+import facets
+from facets import FacetCounter, facet_values
+
+
+# -- facet_values -------------------------------------------------------------
+
+
+def test_blog_values():
+    doc = {"status": "published", "category": "Go", "tags": ["db", "perf", "db", "", 3]}
+    assert facet_values("blogs", doc) == {("category", "Go"), ("tags", "db"), ("tags", "perf")}
+
+
+def test_unpublished_blog_and_missing_doc_count_nothing():
+    assert facet_values("blogs", {"status": "draft", "category": "Go", "tags": ["db"]}) == set()
+    assert facet_values("blogs", None) == set()
+
+
+def test_project_values_ignore_status_gate():
+    doc = {"category": "web", "tech_stack": ["react", "fastapi"], "status": "completed", "tags": ["x"]}
+    assert facet_values("projects", doc) == {
+        ("category", "web"), ("tech_stack", "react"), ("tech_stack", "fastapi"), ("status", "completed"),
+    }
+
+
+# -- FacetCounter ---------------------------------------------------------------
+
+
+def _blog(category, tags, status="published"):
+    return {"status": status, "category": category, "tags": tags}
+
+
+async def _counts(db, kind="blogs"):
+    return {(d["field"], d["value"]): d["count"] async for d in db.facet_counts.find({"kind": kind})}
+
+
+def test_apply_many_increments_only_changed_values():
+    async def run():
+        db = AsyncMongoMockClient()["facets_test"]
+        counter = FacetCounter(db)
+        a, b = _blog("Go", ["db", "perf"]), _blog("Go", ["db"])
+        await counter.apply_many("blogs", [(None, a), (None, b)])
+        assert await _counts(db) == {("category", "Go"): 2, ("tags", "db"): 2, ("tags", "perf"): 1}
+
+        # Retag one, unpublish the other; an unchanged write is a no-op
+        await counter.apply_many("blogs", [
+            (a, _blog("Go", ["db", "rust"])),
+            (b, _blog("Go", ["db"], status="draft")),
+            (a, a),
+        ])
+        assert await _counts(db) == {
+            ("category", "Go"): 1, ("tags", "db"): 1, ("tags", "perf"): 0, ("tags", "rust"): 1,
+        }
+
+        result = await counter.get("blogs", ["tags", "category"], limit=10)
+        assert result["category"] == [{"value": "Go", "count": 1}]
+        assert sorted(v["value"] for v in result["tags"]) == ["db", "rust"]  # zero counts omitted
+        assert len((await counter.get("blogs", ["tags"], limit=1))["tags"]) == 1
+
+    asyncio.run(run())
+
+
+def test_apply_many_opposite_changes_cancel():
+    async def run():
+        db = AsyncMongoMockClient()["facets_test"]
+        doc = _blog("Go", ["db"])
+        await FacetCounter(db).apply_many("blogs", [(None, doc), (doc, None)])
+        assert await db.facet_counts.count_documents({}) == 0
+
+    asyncio.run(run())
+
+
+def test_rebuild_recounts_and_sweeps_stale_values():
+    async def run():
+        db = AsyncMongoMockClient()["facets_test"]
+        counter = FacetCounter(db)
+        await db.blogs.insert_many([
+            _blog("Go", ["db", "perf"]), _blog("Go", ["db"]), _blog("Rust", ["db"], status="draft"),
+        ])
+        # Drifted and stale counters, plus another collection's, which must survive
+        await db.facet_counts.insert_many([
+            {"_id": "blogs|tags|db", "kind": "blogs", "field": "tags", "value": "db", "count": 7},
+            {"_id": "blogs|tags|old", "kind": "blogs", "field": "tags", "value": "old", "count": 1},
+            {"_id": "projects|status|done", "kind": "projects", "field": "status", "value": "done", "count": 1},
+        ])
+        assert await counter.rebuild("blogs") is True
+        assert await _counts(db) == {("category", "Go"): 2, ("tags", "db"): 2, ("tags", "perf"): 1}
+        assert await _counts(db, "projects") == {("status", "done"): 1}
+
+        # Rebuilt moments ago, so a max_age rebuild is skipped
+        assert await counter.rebuild("blogs", max_age=60) is False
+
+    asyncio.run(run())
+
+
+def test_rebuild_skipped_while_lease_held():
+    async def run():
+        db = AsyncMongoMockClient()["facets_test"]
+        until = datetime.now(timezone.utc) + timedelta(seconds=facets.LEASE_SECONDS)
+        await db.facet_rebuilds.insert_one({"_id": "blogs", "owner": "other", "locked_until": until.isoformat()})
+        await db.blogs.insert_one(_blog("Go", ["db"]))
+        assert await FacetCounter(db).rebuild("blogs") is False
+        assert await db.facet_counts.count_documents({}) == 0
+
+    asyncio.run(run())
@@ -0,0 +1,186 @@
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+from pymongo import IndexModel
+
+import revisions
+from revisions import BlogRevisions, DeltaError, RevisionConflict, apply, compose, diff, from_utf16, normalize
+
+
+# -- pure delta functions ---------------------------------------------------
+
+
+def test_normalize_merges_and_trims():
+    assert normalize([2, 3, 0, "a", "", "b", -1, -2, 4]) == [5, "ab", -3]
+
+
+def test_apply_keep_delete_insert():
+    assert apply("hello world", [6, -5, "there"]) == "hello there"
+    assert apply("abc", []) == "abc"
+
+
+def test_apply_past_end():
+    with pytest.raises(DeltaError):
+        apply("abc", [2, -5])
+
+
+@pytest.mark.parametrize("old,new", [
+    ("", ""), ("", "abc"), ("abc", ""), ("abc", "abc"),
+    ("hello world", "hello brave world"), ("aaaa", "aa"), ("abcabc", "abXabc"),
+])
+def test_diff_round_trips(old, new):
+    assert apply(old, diff(old, new)) == new
+
+
+def test_compose_matches_sequential_apply():
+    rng = random.Random(7)
+    for _ in range(500):
+        a = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 12)))
+        b = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 12)))
+        c = "".join(rng.choice("abcde") for _ in range(rng.randint(0, 12)))
+        first, second = diff(a, b), diff(b, c)
+        assert apply(a, compose(first, second)) == c, (a, b, c)
+
+
+def test_from_utf16_counts_astral_characters_once():
+    text = "a😀b"  # the emoji is two UTF-16 code units, one character
+    assert from_utf16(text, [3, "!"]) == [2, "!"]
+    assert apply(text, from_utf16(text, [1, -2])) == "ab"
+
+
+@pytest.mark.parametrize("delta", [[2], [1, -1], [5], [1.5], [True]])
+def test_from_utf16_rejects_bad_deltas(delta):
+    # [2] and [1, -1] split the surrogate pair; [5] runs past the end
+    with pytest.raises(DeltaError):
+        from_utf16("a😀b", delta)
+
+
+def test_from_utf16_rejects_lone_surrogate_insert():
+    with pytest.raises(DeltaError):
+        from_utf16("abc", [1, "\ud800"])
+
+
+# -- BlogRevisions.save -----------------------------------------------------
+
+BODY = "The quick brown fox jumps over the lazy dog."
+
+
+async def _setup(**blog_fields):
+    db = AsyncMongoMockClient()["revisions_test"]
+    await db.blog_revisions.create_indexes([IndexModel([("blog_id", 1), ("revision", 1)], unique=True)])
+    await db.blogs.insert_one({"blog_id": "b1", "content_markdown": BODY, "revision": 0, **blog_fields})
+    return db, BlogRevisions(db)
+
+
+async def _save(db, store, text, when, author="a@x.io", blog=None):
+    blog = blog or await db.blogs.find_one({"blog_id": "b1"})
+    old = blog["content_markdown"]
+    return await store.save(blog, text, diff(old, text), author, {}, when)
+
+
+def test_save_then_coalesce_and_read_back():
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        assert await _save(db, store, BODY + " One.", now) == (1, False)
+        assert await _save(db, store, BODY + " One. Two.", now + timedelta(seconds=5)) == (2, True)
+        # Another author starts a new entry
+        assert await _save(db, store, BODY + " Three.", now + timedelta(seconds=6), author="b@x.io") == (3, False)
+
+        assert await store.content_at("b1", 0) == BODY
+        assert await store.content_at("b1", 1) is None  # folded into revision 2
+        assert await store.content_at("b1", 2) == BODY + " One. Two."
+        assert await store.content_at("b1", 3) == BODY + " Three."
+        history = await store.history("b1", 10)
+        assert [(h["revision"], h["saves"], h["length"]) for h in history] == [
+            (3, 1, len(BODY) + 7), (2, 2, len(BODY) + 10), (0, 1, len(BODY)),
+        ]
+
+    asyncio.run(run())
+
+
+def test_save_against_stale_revision_conflicts():
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        stale = await db.blogs.find_one({"blog_id": "b1"})
+        await _save(db, store, BODY + " Mine.", now)
+        with pytest.raises(RevisionConflict) as e:
+            await _save(db, store, BODY + " Theirs.", now, blog=stale)
+        assert e.value.revision == 1
+        assert (await db.blogs.find_one({"blog_id": "b1"}))["content_markdown"] == BODY + " Mine."
+
+    asyncio.run(run())
+
+
+def test_concurrent_insert_of_same_revision_conflicts():
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        blog = await db.blogs.find_one({"blog_id": "b1"})
+        await _save(db, store, BODY + " One.", now)
+        # Same base, different author (no coalescing): the history insert collides
+        blog["revision"] = 1
+        blog["content_markdown"] = BODY + " One."
+        await db.blog_revisions.insert_one({"blog_id": "b1", "revision": 2, "kind": "delta"})
+        with pytest.raises(RevisionConflict):
+            await _save(db, store, BODY + " Two.", now, author="b@x.io", blog=blog)
+
+    asyncio.run(run())
+
+
+def test_rollback_of_new_entry_when_blog_moved():
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        blog = await db.blogs.find_one({"blog_id": "b1"})
+        await db.blogs.update_one({"blog_id": "b1"}, {"$set": {"revision": 9}})
+        with pytest.raises(RevisionConflict):
+            await _save(db, store, BODY + " Lost.", now, blog=blog)
+        assert [e["revision"] for e in await db.blog_revisions.find({}).to_list(None)] == [0]
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("legacy", [False, True])
+def test_rollback_of_coalesced_entry_when_blog_moved(legacy):
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        await _save(db, store, BODY + " One.", now)
+        if legacy:
+            # Delta entries written before they carried a length
+            await db.blog_revisions.update_one({"revision": 1}, {"$unset": {"length": ""}})
+        before = await db.blog_revisions.find_one({"revision": 1}, {"_id": 0})
+
+        blog = await db.blogs.find_one({"blog_id": "b1"})
+        await db.blogs.update_one({"blog_id": "b1"}, {"$set": {"revision": 9}})
+        with pytest.raises(RevisionConflict):
+            await _save(db, store, BODY + " One. Two.", now + timedelta(seconds=5), blog=blog)
+
+        after = await db.blog_revisions.find_one({"revision": 1}, {"_id": 0})
+        assert after == before
+        assert await db.blog_revisions.count_documents({"revision": 2}) == 0
+
+    asyncio.run(run())
+
+
+def test_snapshot_every(monkeypatch):
+    monkeypatch.setattr(revisions, "SNAPSHOT_EVERY", 2)
+
+    async def run():
+        db, store = await _setup()
+        now = datetime.now(timezone.utc)
+        text = BODY
+        for i in range(5):
+            text += f" {i}."
+            # Far enough apart not to coalesce
+            await _save(db, store, text, now + timedelta(minutes=i))
+        kinds = [e["kind"] for e in await db.blog_revisions.find({}).sort("revision", 1).to_list(None)]
+        assert kinds == ["snapshot", "delta", "delta", "snapshot", "delta", "delta"]
+        assert await store.content_at("b1", 5) == text
+
+    asyncio.run(run())
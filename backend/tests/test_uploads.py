@@ -0,0 +1,92 @@
+import struct
+
+import pytest
+
+from uploads import image_info, parse_range
+
+
+# -- parse_range --------------------------------------------------------------
+
+
+@pytest.mark.parametrize("header,expected", [
+    ("bytes=0-99", (0, 99)),
+    ("bytes=10-", (10, 999)),
+    ("bytes=990-5000", (990, 999)),  # end clamped to the file
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),  # suffix longer than the file
+    (" bytes=5-5 ", (5, 5)),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=-", "bytes=0-1,5-6", "items=0-1", "bytes=a-b", ""])
+def test_parse_range_ignored(header):
+    assert parse_range(header, 1000) is None
+
+
+@pytest.mark.parametrize("header,size", [
+    ("bytes=1000-", 1000), ("bytes=5-4", 1000), ("bytes=-0", 1000), ("bytes=-1", 0), ("bytes=0-", 0),
+])
+def test_parse_range_unsatisfiable(header, size):
+    with pytest.raises(ValueError):
+        parse_range(header, size)
+
+
+# -- image_info ---------------------------------------------------------------
+
+
+def _png(width, height):
+    return b"\x89PNG\r\n\x1a\n" + struct.pack(">I", 13) + b"IHDR" + struct.pack(">II", width, height) + b"\x08\x02\0\0\0"
+
+
+def _jpeg(width, height, app_bytes=16):
+    soi = b"\xff\xd8"
+    app0 = b"\xff\xe0" + struct.pack(">H", app_bytes + 2) + b"\0" * app_bytes
+    sof = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\0" * 10
+    return soi + app0 + b"\xff" + sof  # with a fill byte before the frame marker
+
+
+def _webp(chunk, body):
+    return b"RIFF" + struct.pack("<I", 100) + b"WEBP" + chunk + struct.pack("<I", len(body)) + body
+
+
+def test_png():
+    assert image_info(_png(640, 480)) == {"format": "png", "width": 640, "height": 480}
+
+
+def test_gif():
+    data = b"GIF89a" + struct.pack("<HH", 32, 16) + b"\0" * 4
+    assert image_info(data) == {"format": "gif", "width": 32, "height": 16}
+
+
+def test_jpeg_after_metadata_segment():
+    assert image_info(_jpeg(1024, 768, app_bytes=5000)) == {"format": "jpeg", "width": 1024, "height": 768}
+
+
+def test_jpeg_truncated_before_frame_header():
+    assert image_info(_jpeg(10, 10)[:20]) is None
+
+
+def test_webp_lossy():
+    body = b"\0" * 6 + struct.pack("<HH", 300, 200) + b"\0" * 4
+    assert image_info(_webp(b"VP8 ", body)) == {"format": "webp", "width": 300, "height": 200}
+
+
+def test_webp_lossless():
+    bits = (300 - 1) | ((200 - 1) << 14)
+    body = b"\x2f" + struct.pack("<I", bits) + b"\0" * 8
+    assert image_info(_webp(b"VP8L", body)) == {"format": "webp", "width": 300, "height": 200}
+
+
+def test_webp_extended():
+    body = b"\0" * 4 + (300 - 1).to_bytes(3, "little") + (200 - 1).to_bytes(3, "little") + b"\0" * 4
+    assert image_info(_webp(b"VP8X", body)) == {"format": "webp", "width": 300, "height": 200}
+
+
+@pytest.mark.parametrize("data", [
+    b"", b"<svg xmlns='http://www.w3.org/2000/svg'/>", b"GIF8", b"\x89PNG\r\n\x1a\n",
+    b"RIFF\0\0\0\0WEBPABCD" + b"\0" * 20,
+])
+def test_not_an_image(data):
+    assert image_info(data) is None
@@ -0,0 +1,307 @@
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Tuple
+
+from starlette.datastructures import Headers
+
+CACHE_CONTROL = b"public, max-age=31536000, immutable"
+CHUNK_SIZE = 256 * 1024
+MAX_OPEN_FILES = int(os.environ.get("UPLOADS_MAX_OPEN_FILES", "256"))
+
+_FILENAME = re.compile(r"^[\w-][\w.-]*$")
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+class _OpenFile:
+    """An open descriptor plus what is needed to answer requests for it."""
+
+    __slots__ = ("fd", "size", "identity", "etag", "content_type", "refs", "evicted")
+
+    def __init__(self, fd: int, stat: os.stat_result, etag: bytes, content_type: bytes):
+        self.fd = fd
+        self.size = stat.st_size
+        self.identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self.etag = etag
+        self.content_type = content_type
+        self.refs = 0
+        self.evicted = False
+
+    def fileno(self) -> int:
+        return self.fd
+
+
+class FileHandleCache:
+    """LRU of open upload files with their content hash.
+
+    Reads use ``os.pread``, so one descriptor serves concurrent requests.
+    A descriptor evicted while a response is still streaming from it is
+    closed when that response finishes.
+    """
+
+    def __init__(self, max_open: int = MAX_OPEN_FILES):
+        self._max_open = max_open
+        self._entries: "OrderedDict[str, _OpenFile]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._known_hashes = {}  # filename -> etag, primed at upload time
+
+    def remember(self, filename: str, hexdigest: str):
+        """Record the SHA-256 of an uploaded file so serving it never re-reads it."""
+        with self._lock:
+            self._known_hashes[filename] = _etag(hexdigest)
+
+    def forget(self, filename: str):
+        with self._lock:
+            self._known_hashes.pop(filename, None)
+            entry = self._entries.pop(filename, None)
+            if entry is not None:
+                self._evict(entry)
+
+    def acquire(self, path: Path) -> Optional[_OpenFile]:
+        """Open (or reuse) ``path``; the caller must ``release()`` the result."""
+        try:
+            stat = os.stat(path)
+        except (FileNotFoundError, NotADirectoryError):
+            self.forget(path.name)
+            return None
+        identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            entry = self._entries.get(path.name)
+            if entry is not None and entry.identity == identity:
+                self._entries.move_to_end(path.name)
+                entry.refs += 1
+                return entry
+            etag = self._known_hashes.get(path.name)
+
+        fd = os.open(path, os.O_RDONLY)
+        if etag is None:
+            etag = _etag(_hash_fd(fd, stat.st_size))
+        content_type = (mimetypes.guess_type(path.name)[0] or "application/octet-stream").encode("latin-1")
+        entry = _OpenFile(fd, os.fstat(fd), etag, content_type)
+        with self._lock:
+            old = self._entries.pop(path.name, None)
+            if old is not None:
+                self._evict(old)
+            self._entries[path.name] = entry
+            self._known_hashes[path.name] = etag
+            entry.refs += 1
+            while len(self._entries) > self._max_open:
+                _, evicted = self._entries.popitem(last=False)
+                self._evict(evicted)
+        return entry
+
+    def release(self, entry: _OpenFile):
+        with self._lock:
+            entry.refs -= 1
+            if entry.evicted and entry.refs == 0:
+                os.close(entry.fd)
+
+    def _evict(self, entry: _OpenFile):
+        entry.evicted = True
+        if entry.refs == 0:
+            os.close(entry.fd)
+
+    def close(self):
+        with self._lock:
+            for entry in self._entries.values():
+                self._evict(entry)
+            self._entries.clear()
+
+
+def _hash_fd(fd: int, size: int) -> str:
+    digest = hashlib.sha256()
+    offset = 0
+    while offset < size:
+        chunk = os.pread(fd, min(CHUNK_SIZE, size - offset), offset)
+        if not chunk:
+            break
+        digest.update(chunk)
+        offset += len(chunk)
+    return digest.hexdigest()
+
+
+def _etag(hexdigest: str) -> bytes:
+    return f'"{hexdigest[:32]}"'.encode("latin-1")
+
+
+# Enough of a file for image_info(): JPEG metadata segments before the
+# frame header are at most 64 KiB each
+IMAGE_HEAD_BYTES = 1024 * 1024
+IMAGE_EXTENSIONS = {"png": ".png", "gif": ".gif", "jpeg": ".jpg", "webp": ".webp"}
+
+# JPEG start-of-frame markers (the others carry no dimensions)
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_info(data: bytes) -> Optional[dict]:
+    """Format and pixel size of a PNG, GIF, JPEG or WebP image, read from
+    its headers; None if ``data`` is not one of those."""
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and data[12:16] == b"IHDR":
+        return {"format": "png", "width": int.from_bytes(data[16:20], "big"), "height": int.from_bytes(data[20:24], "big")}
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        return {"format": "gif", "width": int.from_bytes(data[6:8], "little"), "height": int.from_bytes(data[8:10], "little")}
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8 ":
+            width, height = int.from_bytes(data[26:28], "little") & 0x3FFF, int.from_bytes(data[28:30], "little") & 0x3FFF
+        elif chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            width, height = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+        elif chunk == b"VP8X":
+            width, height = int.from_bytes(data[24:27], "little") + 1, int.from_bytes(data[27:30], "little") + 1
+        else:
+            return None
+        return {"format": "webp", "width": width, "height": height}
+    if data[:2] == b"\xff\xd8":
+        pos = 2
+        while pos + 4 <= len(data) and data[pos] == 0xFF:
+            marker = data[pos + 1]
+            if marker == 0xFF:  # fill byte
+                pos += 1
+                continue
+            length = int.from_bytes(data[pos + 2:pos + 4], "big")
+            if marker in _JPEG_SOF and pos + 9 <= len(data):
+                return {
+                    "format": "jpeg",
+                    "width": int.from_bytes(data[pos + 7:pos + 9], "big"),
+                    "height": int.from_bytes(data[pos + 5:pos + 7], "big"),
+                }
+            pos += 2 + length
+        return None
+    return None
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Return the inclusive ``(start, end)`` of a single byte range.
+
+    Returns None for a header we choose to ignore (multiple ranges or
+    malformed), which means "send the whole file"; raises ValueError if the
+    range cannot be satisfied.
+    """
+    match = _RANGE.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        length = int(last)
+        if length == 0 or size == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+def _matches(header: str, etag: bytes) -> bool:
+    value = etag.decode("latin-1")
+    candidates = [c.strip() for c in header.split(",")]
+    return "*" in candidates or value in candidates or f"W/{value}" in candidates
+
+
+class UploadFiles:
+    """ASGI app serving ``/uploads``.
+
+    Upload names are random and files are never rewritten, so responses carry
+    a content-hash ETag and a one-year ``immutable`` Cache-Control. Supports
+    conditional GETs, single byte ranges (with If-Range) and HEAD. When the
+    server offers the ``http.response.zerocopysend`` extension the file is
+    handed to it as a descriptor; otherwise it is read with ``pread`` in a
+    worker thread.
+    """
+
+    def __init__(self, directory: Path, handles: Optional[FileHandleCache] = None):
+        self.directory = Path(directory)
+        self.handles = handles or FileHandleCache()
+
+    async def __call__(self, scope, receive, send):
+        assert scope["type"] == "http"
+        if scope["method"] not in ("GET", "HEAD"):
+            await _send_empty(send, 405, [(b"allow", b"GET, HEAD")])
+            return
+        name = scope["path"].rsplit("/", 1)[-1]
+        if not _FILENAME.match(name):
+            await _send_empty(send, 404)
+            return
+
+        entry = await asyncio.to_thread(self.handles.acquire, self.directory / name)
+        if entry is None:
+            await _send_empty(send, 404)
+            return
+        try:
+            await self._respond(scope, send, entry)
+        finally:
+            self.handles.release(entry)
+
+    async def _respond(self, scope, send, entry: _OpenFile):
+        request = Headers(scope=scope)
+        headers = [
+            (b"etag", entry.etag),
+            (b"cache-control", CACHE_CONTROL),
+            (b"accept-ranges", b"bytes"),
+        ]
+        if_none_match = request.get("if-none-match")
+        if if_none_match is not None and _matches(if_none_match, entry.etag):
+            await _send_empty(send, 304, headers)
+            return
+
+        start, end, status = 0, entry.size - 1, 200
+        range_header = request.get("range")
+        if_range = request.get("if-range")
+        if range_header and (if_range is None or if_range.strip() == entry.etag.decode("latin-1")):
+            try:
+                byte_range = parse_range(range_header, entry.size)
+            except ValueError:
+                await _send_empty(send, 416, headers + [(b"content-range", f"bytes */{entry.size}".encode())])
+                return
+            if byte_range is not None:
+                start, end = byte_range
+                status = 206
+                headers.append((b"content-range", f"bytes {start}-{end}/{entry.size}".encode()))
+
+        length = end - start + 1 if entry.size else 0
+        headers += [
+            (b"content-type", entry.content_type),
+            (b"content-length", str(length).encode()),
+        ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        if scope["method"] == "HEAD" or length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            await send({
+                "type": "http.response.zerocopysend",
+                "file": entry,
+                "offset": start,
+                "count": length,
+            })
+            return
+
+        offset = start
+        while offset <= end:
+            size = min(CHUNK_SIZE, end - offset + 1)
+            chunk = await asyncio.to_thread(os.pread, entry.fd, size, offset)
+            if not chunk:
+                break
+            offset += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": offset <= end})
+        if offset <= end:
+            # File shrank underneath us; end the response rather than hang
+            await send({"type": "http.response.body", "body": b""})
+
+
+async def _send_empty(send, status: int, headers=None):
+    headers = list(headers or [])
+    if status != 304:
+        headers.append((b"content-length", b"0"))
+    await send({"type": "http.response.start", "status": status, "headers": headers})
+    await send({"type": "http.response.body", "body": b""})
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from pymongo import DeleteOne, UpdateOne
+
+logger = logging.getLogger(__name__)
+
+REFRESH_SECONDS = float(os.environ.get("USER_STATS_REFRESH_SECONDS", "2"))
+RECONCILE_SECONDS = float(os.environ.get("USER_STATS_RECONCILE_SECONDS", str(6 * 3600)))
+_BATCH = 500
+
+# Blog fields whose changes move a user's totals; updates touching only
+# view_count are counted through record_view() instead
+_BLOG_STAT_FIELDS = {"status", "comment_count", "reaction_count", "author_email"}
+
+STAT_FIELDS = (
+    "projects",
+    "blogs",
+    "published_blogs",
+    "blog_views",
+    "blog_reactions",
+    "comments_received",
+    "followers",
+    "following",
+)
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def blog_change_affects_stats(change: dict) -> bool:
+    if change["operationType"] != "update":
+        return True
+    updated = change.get("updateDescription", {})
+    fields = set(updated.get("updatedFields", {})) | set(updated.get("removedFields", []))
+    return bool(fields & _BLOG_STAT_FIELDS)
+
+
+class UserStats:
+    """Per-user dashboard totals kept in ``user_stats`` (one document per email).
+
+    Writers call ``mark(email)`` when something a user's totals depend on
+    changes; marked users are recomputed from the source collections every
+    ``REFRESH_SECONDS``, batched into one aggregation per collection. Blog
+    views arrive far too often for that and are applied as buffered ``$inc``
+    deltas instead. ``reconcile()`` rebuilds every row, catching anything an
+    incremental path missed (deletes seen by another process, cascade
+    cleanups), and drops rows of users that no longer exist.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._dirty: set = set()
+        self._views: Counter = Counter()  # email -> views not yet written
+
+    def mark(self, *emails: Optional[str]):
+        self._dirty.update(e for e in emails if e)
+
+    def record_view(self, email: str):
+        self._views[email] += 1
+
+    async def get(self, email: str) -> dict:
+        """The stats row for ``email``, computing it first if there is none yet."""
+        row = await self._db.user_stats.find_one({"_id": email})
+        if row is None:
+            await self.rebuild([email])
+            row = await self._db.user_stats.find_one({"_id": email}) or {}
+        return row
+
+    async def flush(self):
+        """Apply buffered views, then recompute the users marked since the last flush."""
+        if self._views:
+            # No upsert: a user without a row gets one built from source on first read
+            views, self._views = list(self._views.items()), Counter()
+            ops = [
+                UpdateOne({"_id": email}, {"$inc": {"blog_views": n}})
+                for email, n in views
+            ]
+            try:
+                for i in range(0, len(ops), _BATCH):
+                    await self._db.user_stats.bulk_write(ops[i:i + _BATCH], ordered=False)
+            except Exception:
+                # A rebuild below or the next reconcile covers anything partially written
+                self._dirty.update(email for email, _ in views)
+                raise
+
+        if self._dirty:
+            dirty, self._dirty = list(self._dirty), set()
+            try:
+                for i in range(0, len(dirty), _BATCH):
+                    await self.rebuild(dirty[i:i + _BATCH])
+            except Exception:
+                self._dirty.update(dirty)
+                raise
+
+    async def rebuild(self, emails: List[str]):
+        """Recompute the rows for ``emails`` from users, projects and blogs."""
+        # record_view() runs after the blog's view_count $inc, so every view
+        # buffered by now is already in the sum below; drop it so the next
+        # flush doesn't add it a second time
+        for email in emails:
+            self._views.pop(email, None)
+        rows = {
+            u["email"]: {
+                "followers": u.get("follower_count", 0),
+                "following": u.get("following_count", 0),
+            }
+            for u in await self._db.users.find(
+                {"email": {"$in": emails}}, {"_id": 0, "email": 1, "follower_count": 1, "following_count": 1}
+            ).to_list(None)
+        }
+
+        projects = self._db.projects.aggregate([
+            {"$match": {"user_email": {"$in": list(rows)}}},
+            {"$group": {"_id": "$user_email", "projects": {"$sum": 1}}},
+        ])
+        blogs = self._db.blogs.aggregate([
+            {"$match": {"author_email": {"$in": list(rows)}}},
+            {"$group": {
+                "_id": "$author_email",
+                "blogs": {"$sum": 1},
+                "published_blogs": {"$sum": {"$cond": [{"$eq": ["$status", "published"]}, 1, 0]}},
+                "blog_views": {"$sum": {"$ifNull": ["$view_count", 0]}},
+                "blog_reactions": {"$sum": {"$ifNull": ["$reaction_count", 0]}},
+                "comments_received": {"$sum": {"$ifNull": ["$comment_count", 0]}},
+            }},
+        ])
+        for cursor in (projects, blogs):
+            async for group in cursor:
+                email = group.pop("_id")
+                rows[email].update(group)
+
+        now = _now().isoformat()
+        ops = []
+        for email in emails:
+            if email in rows:
+                values = {field: rows[email].get(field, 0) for field in STAT_FIELDS}
+                ops.append(UpdateOne({"_id": email}, {"$set": {**values, "updated_at": now}}, upsert=True))
+            else:
+                ops.append(DeleteOne({"_id": email}))
+        if ops:
+            await self._db.user_stats.bulk_write(ops, ordered=False)
+
+    async def reconcile(self):
+        """Rebuild every user's row and drop rows for deleted users."""
+        started = _now().isoformat()
+        batch = []
+        async for user in self._db.users.find({}, {"_id": 0, "email": 1}):
+            batch.append(user["email"])
+            if len(batch) >= _BATCH:
+                await self.rebuild(batch)
+                batch = []
+        if batch:
+            await self.rebuild(batch)
+        result = await self._db.user_stats.delete_many({"updated_at": {"$lt": started}})
+        await self._db.user_stats_state.update_one(
+            {"_id": "reconcile"}, {"$set": {"reconciled_at": started, "dropped": result.deleted_count}},
+            upsert=True,
+        )
+
+    async def run(self):
+        """Flush every ``REFRESH_SECONDS``; reconcile when the last run is ``RECONCILE_SECONDS`` old."""
+        loop = asyncio.get_running_loop()
+        try:
+            next_reconcile = loop.time() + await self._seconds_until_reconcile()
+            while True:
+                await asyncio.sleep(REFRESH_SECONDS)
+                try:
+                    await self.flush()
+                    if loop.time() >= next_reconcile:
+                        await self.reconcile()
+                        next_reconcile = loop.time() + RECONCILE_SECONDS
+                except Exception as e:
+                    logger.error("User stats refresh failed: %s", e)
+        except asyncio.CancelledError:
+            pass
+
+    async def _seconds_until_reconcile(self) -> float:
+        # Restarts (and extra workers) pick up the shared schedule instead of
+        # each reconciling on boot
+        try:
+            state = await self._db.user_stats_state.find_one({"_id": "reconcile"})
+        except Exception:
+            return 0.0
+        if not state:
+            return 0.0
+        elapsed = (_now() - datetime.fromisoformat(state["reconciled_at"])).total_seconds()
+        return max(0.0, RECONCILE_SECONDS - elapsed)
@@ -0,0 +1,174 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from datetime import datetime, timezone, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+logger = logging.getLogger(__name__)
+
+FLUSH_SECONDS = float(os.environ.get("VIEW_FLUSH_SECONDS", "5"))
+ROLLUP_SECONDS = float(os.environ.get("VIEW_ROLLUP_SECONDS", "600"))
+HOURLY_RETENTION_DAYS = int(os.environ.get("VIEW_HOURLY_RETENTION_DAYS", "14"))
+_WRITE_BATCH = 500
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def hour_key(when: datetime) -> str:
+    """ISO timestamp of the start of ``when``'s hour (UTC); sorts chronologically."""
+    return when.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0).isoformat()
+
+
+def day_key(when: datetime) -> str:
+    return when.astimezone(timezone.utc).date().isoformat()
+
+
+class ViewRecorder:
+    """Per-blog view counts bucketed by hour and rolled up by day.
+
+    Views are counted in memory and flushed every ``FLUSH_SECONDS`` as one
+    ``$inc`` upsert per (blog, hour) into ``blog_views_hourly``, so a burst of
+    traffic on a post costs one write rather than one per view. A rollup pass
+    folds the hourly buckets into ``blog_views_daily`` and prunes hours older
+    than ``HOURLY_RETENTION_DAYS``. Daily totals trail the hourly ones by at
+    most one rollup interval.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._pending: Counter = Counter()  # (blog_id, author_email, hour) -> views
+
+    def record(self, blog_id: str, author_email: str, when: Optional[datetime] = None):
+        self._pending[(blog_id, author_email, hour_key(when or _now()))] += 1
+
+    async def flush(self):
+        """Write buffered views to the hourly buckets."""
+        if not self._pending:
+            return
+        items, self._pending = list(self._pending.items()), Counter()
+        for i in range(0, len(items), _WRITE_BATCH):
+            batch = items[i:i + _WRITE_BATCH]
+            ops = [
+                UpdateOne(
+                    {"_id": f"{blog_id}|{hour}"},
+                    {
+                        "$inc": {"views": views},
+                        "$setOnInsert": {
+                            "blog_id": blog_id,
+                            "author_email": author_email,
+                            "hour": hour,
+                            "day": hour[:10],
+                        },
+                    },
+                    upsert=True,
+                )
+                for (blog_id, author_email, hour), views in batch
+            ]
+            try:
+                await self._db.blog_views_hourly.bulk_write(ops, ordered=False)
+            except BulkWriteError as e:
+                # Unordered: every op without a write error was applied, so
+                # re-queue only the failed ones (and the batches not yet sent)
+                failed = {err["index"] for err in e.details.get("writeErrors", [])}
+                self._pending.update(dict(batch[j] for j in sorted(failed)))
+                self._pending.update(dict(items[i + _WRITE_BATCH:]))
+                raise
+            except Exception:
+                # Put the unwritten counts back so the next flush retries them
+                self._pending.update(dict(items[i:]))
+                raise
+
+    async def rollup(self):
+        """Recompute daily totals for days that may still be changing, then prune."""
+        now = _now()
+        state = await self._db.view_rollups.find_one({"_id": "daily"})
+        match = {"day": {"$gte": state["since"]}} if state else {}
+        pipeline = [
+            {"$match": match},
+            {"$group": {
+                "_id": {"blog_id": "$blog_id", "day": "$day"},
+                "author_email": {"$first": "$author_email"},
+                "views": {"$sum": "$views"},
+            }},
+        ]
+        ops = []
+        async for row in self._db.blog_views_hourly.aggregate(pipeline):
+            blog_id, day = row["_id"]["blog_id"], row["_id"]["day"]
+            ops.append(UpdateOne(
+                {"_id": f"{blog_id}|{day}"},
+                {"$set": {
+                    "blog_id": blog_id,
+                    "author_email": row["author_email"],
+                    "day": day,
+                    "views": row["views"],
+                }},
+                upsert=True,
+            ))
+            if len(ops) >= _WRITE_BATCH:
+                await self._db.blog_views_daily.bulk_write(ops, ordered=False)
+                ops = []
+        if ops:
+            await self._db.blog_views_daily.bulk_write(ops, ordered=False)
+
+        # A late flush can still add to the previous hour, so re-roll its day next time
+        since = day_key(now - timedelta(hours=1))
+        await self._db.view_rollups.update_one(
+            {"_id": "daily"}, {"$set": {"since": since, "rolled_at": now.isoformat()}}, upsert=True
+        )
+        cutoff = hour_key(now - timedelta(days=HOURLY_RETENTION_DAYS))
+        await self._db.blog_views_hourly.delete_many({"hour": {"$lt": cutoff}, "day": {"$lt": since}})
+
+    async def run(self):
+        """Flush every ``FLUSH_SECONDS`` and roll up every ``ROLLUP_SECONDS`` until cancelled."""
+        loop = asyncio.get_running_loop()
+        next_rollup = loop.time()
+        try:
+            while True:
+                await asyncio.sleep(FLUSH_SECONDS)
+                try:
+                    await self.flush()
+                    if loop.time() >= next_rollup:
+                        await self.rollup()
+                        next_rollup = loop.time() + ROLLUP_SECONDS
+                except Exception as e:
+                    logger.error("View stats flush/rollup failed: %s", e)
+        except asyncio.CancelledError:
+            pass
+
+    async def series(
+        self,
+        granularity: str,
+        start: datetime,
+        end: datetime,
+        blog_ids: Optional[List[str]] = None,
+        author_email: Optional[str] = None,
+    ) -> Dict[str, List[Tuple[str, int]]]:
+        """Return ``{blog_id: [(bucket, views), ...]}`` for the buckets containing
+        ``start`` through ``end``, in one query.
+
+        Restricted to ``blog_ids`` and/or the blogs of ``author_email``.
+        Buckets without views are omitted.
+        """
+        if granularity == "hour":
+            collection, field = self._db.blog_views_hourly, "hour"
+            bounds = {"$gte": hour_key(start), "$lte": hour_key(end)}
+        else:
+            collection, field = self._db.blog_views_daily, "day"
+            bounds = {"$gte": day_key(start), "$lte": day_key(end)}
+        query = {field: bounds}
+        if blog_ids is not None:
+            query["blog_id"] = {"$in": blog_ids}
+        if author_email is not None:
+            query["author_email"] = author_email
+
+        result: Dict[str, List[Tuple[str, int]]] = {}
+        cursor = collection.find(query, {"_id": 0, "blog_id": 1, field: 1, "views": 1})
+        async for doc in cursor.sort([("blog_id", 1), (field, 1)]):
+            result.setdefault(doc["blog_id"], []).append((doc[field], doc["views"]))
+        return result
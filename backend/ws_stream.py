@@ -0,0 +1,198 @@
+"""WebSocket transport for ``event_bus``, alongside the SSE stream.
+
+One socket carries every event type the client subscribes to, encoded as
+MessagePack instead of JSON text. Connections go through the same
+``SSEConnectionManager`` as SSE streams, so they share its fan-out, caps
+and slow-client reaping.
+
+Protocol (subprotocol ``kudos.events.msgpack.v1``). Client to server, as a
+MessagePack or JSON map::
+
+    {"op": "subscribe", "topics": ["blog:*", "comment:new"]}
+    {"op": "unsubscribe", "topics": ["blog:*"]}
+
+Topics are an event type, ``<prefix>:*`` or ``*``; initial ones can also be
+given as ``?topics=blog:*,project:*``. Server to client, MessagePack
+arrays::
+
+    [1, new_strings, type, data]   event
+    [2, topics]                    current subscriptions, after each request
+    [3, message]                   rejected request
+
+Each connection has its own string dictionary: the first time an event
+type or map key is sent it is appended to ``new_strings`` and gets the
+next integer id (from 0), and from then on only the id is sent. Clients
+append ``new_strings`` to their table before decoding; a ``type`` or map
+key that is an int is looked up in it, a str (the dictionary is full) is
+used as is.
+
+Compression is negotiated by the server (uvicorn offers permessage-deflate
+unless started with ``--ws-per-message-deflate false``), with its context
+kept across messages, so repeated values compress as well. Keepalive is
+the protocol's own ping/pong, so no heartbeat messages are sent.
+"""
+
+import asyncio
+import json
+import logging
+import os
+from typing import Any, List, Optional
+
+import msgpack
+from starlette.websockets import WebSocket, WebSocketDisconnect
+
+from sse import CLOSED, HEARTBEAT, ConnectionRejected, SSEConnection, SSEConnectionManager
+
+logger = logging.getLogger(__name__)
+
+PROTOCOL = "kudos.events.msgpack.v1"
+DICTIONARY_SIZE = int(os.environ.get("WS_DICTIONARY_SIZE", "1024"))
+MAX_TOPICS = 64
+_MAX_CONTROL_BYTES = 4096
+
+OP_EVENT = 1
+OP_TOPICS = 2
+OP_ERROR = 3
+
+
+class FieldDictionary:
+    """A connection's table of event types and map keys already sent."""
+
+    def __init__(self, max_size: int = DICTIONARY_SIZE):
+        self.max_size = max_size
+        self._ids = {}
+
+    def ref(self, value: str, new: List[str]):
+        ref = self._ids.get(value)
+        if ref is None:
+            if len(self._ids) >= self.max_size:
+                return value
+            ref = self._ids[value] = len(self._ids)
+            new.append(value)
+        return ref
+
+    def compact(self, value: Any, new: List[str]) -> Any:
+        if isinstance(value, dict):
+            return {self.ref(str(k), new): self.compact(v, new) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.compact(v, new) for v in value]
+        return value
+
+    def encode(self, event: dict) -> bytes:
+        new: List[str] = []
+        type_ref = self.ref(event["type"], new)
+        data = self.compact(event["data"], new)
+        return msgpack.packb([OP_EVENT, new, type_ref, data], use_bin_type=True)
+
+
+def decode(message: bytes, table: List[str]) -> Optional[tuple]:
+    """Client-side inverse of ``FieldDictionary.encode``: ``(type, data)``, or None for non-events.
+
+    ``table`` is the connection's string table and is extended in place.
+    """
+    frame = msgpack.unpackb(message, raw=False, strict_map_key=False)
+    if frame[0] != OP_EVENT:
+        return None
+    _, new, type_ref, data = frame
+    table.extend(new)
+
+    def expand(value):
+        if isinstance(value, dict):
+            return {(table[k] if isinstance(k, int) else k): expand(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [expand(v) for v in value]
+        return value
+
+    return (table[type_ref] if isinstance(type_ref, int) else type_ref), expand(data)
+
+
+def _valid_topic(topic: Any) -> bool:
+    if not isinstance(topic, str) or not 0 < len(topic) <= 64:
+        return False
+    prefix, sep, rest = topic.partition(":")
+    return topic == "*" or (bool(prefix) and bool(sep) and bool(rest))
+
+
+def _reply(*frame) -> bytes:
+    return msgpack.packb(list(frame), use_bin_type=True)
+
+
+def _apply_control(conn: SSEConnection, message: dict) -> bytes:
+    raw = message.get("bytes")
+    text = message.get("text")
+    if len(raw or text or "") > _MAX_CONTROL_BYTES:
+        return _reply(OP_ERROR, "message too large")
+    try:
+        request = msgpack.unpackb(raw, raw=False) if raw is not None else json.loads(text)
+    except (ValueError, msgpack.UnpackException):
+        return _reply(OP_ERROR, "message is not valid MessagePack or JSON")
+    if not isinstance(request, dict) or request.get("op") not in ("subscribe", "unsubscribe"):
+        return _reply(OP_ERROR, "op must be 'subscribe' or 'unsubscribe'")
+    topics = request.get("topics")
+    if not isinstance(topics, list) or not all(_valid_topic(t) for t in topics):
+        return _reply(OP_ERROR, "topics must be a list of event types, '<prefix>:*' or '*'")
+    if request["op"] == "subscribe":
+        if len(conn.topics | set(topics)) > MAX_TOPICS:
+            return _reply(OP_ERROR, f"at most {MAX_TOPICS} topics per connection")
+        conn.topics.update(topics)
+    else:
+        conn.topics.difference_update(topics)
+    return _reply(OP_TOPICS, sorted(conn.topics))
+
+
+async def _send_loop(websocket: WebSocket, conn: SSEConnection):
+    loop = asyncio.get_running_loop()
+    dictionary = FieldDictionary()
+    try:
+        while True:
+            # Resumed only after the previous message was written
+            conn.last_progress = loop.time()
+            item = await conn.queue.get()
+            if item is CLOSED:
+                await websocket.close(code=1001)
+                return
+            if item is HEARTBEAT:
+                continue
+            if isinstance(item, bytes):
+                await websocket.send_bytes(item)
+                continue
+            try:
+                payload = dictionary.encode(item)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning("Dropping unencodable WebSocket event: %s", e)
+                continue
+            await websocket.send_bytes(payload)
+    except (OSError, RuntimeError, WebSocketDisconnect):
+        # The client went away; the receive loop sees the disconnect
+        pass
+
+
+async def serve(websocket: WebSocket, manager: SSEConnectionManager):
+    """Run one WebSocket connection until either side closes it."""
+    initial = [t for t in websocket.query_params.get("topics", "").split(",") if t]
+    subprotocol = PROTOCOL if PROTOCOL in websocket.scope.get("subprotocols", []) else None
+    if len(initial) > MAX_TOPICS or not all(_valid_topic(t) for t in initial):
+        await websocket.accept(subprotocol)
+        await websocket.close(code=1008, reason="invalid topics")
+        return
+    try:
+        conn = manager.open(manager.client_ip(websocket.scope), raw=True, topics=initial)
+    except ConnectionRejected as e:
+        # 1013: try again later; 1008 for the per-address limit
+        await websocket.accept(subprotocol)
+        await websocket.close(code=1008 if e.reason == "per_ip" else 1013, reason=e.detail)
+        return
+
+    await websocket.accept(subprotocol)
+    sender = asyncio.create_task(_send_loop(websocket, conn))
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            conn.offer(_apply_control(conn, message))
+    except (WebSocketDisconnect, RuntimeError):
+        pass
+    finally:
+        sender.cancel()
+        manager.close(conn, "client")
@@ -4,7 +4,7 @@ import remarkGfm from 'remark-gfm';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { oneDark } from 'react-syntax-highlighter/dist/esm/styles/prism';
 
-export default function MarkdownPreview({ content }) {
+export default function MarkdownPreview({ content, html }) {
     return (
         <div className="prose prose-lg max-w-none
             prose-headings:font-heading prose-headings:text-foreground prose-headings:font-bold
@@ -20,6 +20,10 @@ export default function MarkdownPreview({ content }) {
             prose-th:text-foreground prose-th:border-border prose-th:px-4 prose-th:py-2
             prose-td:text-foreground/90 prose-td:border-border prose-td:px-4 prose-td:py-2
         ">
+            {html ? (
+                // Pre-rendered and sanitized by the backend
+                <div dangerouslySetInnerHTML={{ __html: html }} />
+            ) : (
             <ReactMarkdown
                 remarkPlugins={[remarkGfm]}
                 components={{
@@ -45,6 +49,7 @@ export default function MarkdownPreview({ content }) {
             >
                 {content || ''}
             </ReactMarkdown>
+            )}
         </div>
     );
 }
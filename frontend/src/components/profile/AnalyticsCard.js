@@ -6,14 +6,20 @@ import {
 } from 'lucide-react';
 
 // ─── Mini sparkline component ───────────────────────────────────────────────
-const Sparkline = ({ color = '#6366f1', seed = 1 }) => {
-    const points = [];
-    let v = 30 + (seed * 7) % 20;
-    for (let i = 0; i < 7; i++) {
-        v = Math.max(10, Math.min(50, v + ((seed * (i + 1) * 13) % 21) - 10));
-        points.push(v);
+// Draws `data` when given (real series), otherwise a decorative placeholder
+const Sparkline = ({ color = '#6366f1', seed = 1, data }) => {
+    let points = [];
+    let max = 55;
+    if (data && data.length > 1) {
+        const peak = Math.max(...data, 1);
+        points = data.map(d => 5 + (d / peak) * 45);
+    } else {
+        let v = 30 + (seed * 7) % 20;
+        for (let i = 0; i < 7; i++) {
+            v = Math.max(10, Math.min(50, v + ((seed * (i + 1) * 13) % 21) - 10));
+            points.push(v);
+        }
     }
-    const max = 55;
     const w = 80, h = 32;
     const pathData = points
         .map((p, i) => `${i === 0 ? 'M' : 'L'} ${(i / (points.length - 1)) * w} ${h - (p / max) * h}`)
@@ -100,7 +106,7 @@ const UserListModal = ({ title, users, onClose }) => {
     );
 };
 
-export const AnalyticsCard = ({ stats, isOwnProfile, followerList = [], followingList = [] }) => {
+export const AnalyticsCard = ({ stats, isOwnProfile, followerList = [], followingList = [], trends = {} }) => {
     const [animatedStats, setAnimatedStats] = useState({});
     const [hasAnimated, setHasAnimated] = useState(false);
     const [activeSection, setActiveSection] = useState(null); // 'followers' | 'following'
@@ -222,7 +228,7 @@ export const AnalyticsCard = ({ stats, isOwnProfile, followerList = [], followin
                                         `}
                                     >
                                         <div className="absolute bottom-0 right-0">
-                                            <Sparkline color={config.accent} seed={sIdx * 3 + index + 1} />
+                                            <Sparkline color={config.accent} seed={sIdx * 3 + index + 1} data={trends[key]} />
                                         </div>
 
                                         <div className={`
@@ -29,6 +29,7 @@ export const authAPI = {
     login: (data) => api.post('/api/auth/login', data),
     getMe: () => api.get('/api/auth/me'),
     updateMe: (data) => api.put('/api/auth/me', data),
+    deleteMe: (password) => api.delete('/api/auth/me', { data: { password } }),
     forgotPassword: (data) => api.post('/api/auth/forgot-password', data),
     resetPassword: (data) => api.post('/api/auth/reset-password', data),
 };
@@ -38,30 +39,49 @@ export const userAPI = {
     getByUsername: (username) => api.get(`/api/users/${username}`),
     follow: (username) => api.post(`/api/users/${username}/follow`),
     unfollow: (username) => api.delete(`/api/users/${username}/follow`),
-    getFollowers: (username) => api.get(`/api/users/${username}/followers`),
-    getFollowing: (username) => api.get(`/api/users/${username}/following`),
+    getFollowers: (username, params) => api.get(`/api/users/${username}/followers`, { params }),
+    getFollowing: (username, params) => api.get(`/api/users/${username}/following`, { params }),
     isFollowing: (username) => api.get(`/api/users/${username}/is-following`),
+    followStatus: (usernames) => api.get('/api/follows/status', {
+        params: { usernames },
+        paramsSerializer: { indexes: null },
+    }),
     getDevelopers: (params) => api.get('/api/developers', { params }),
+    getMyStats: () => api.get('/api/me/stats'),
 };
 
 // Project APIs
 export const projectAPI = {
     create: (data) => api.post('/api/projects', data),
-    getAll: (params) => api.get('/api/projects', { params }),
+    getAll: (params) => api.get('/api/projects', {
+        params,
+        paramsSerializer: { indexes: null },
+    }),
     getMy: () => api.get('/api/projects/my'),
     getByUsername: (username) => api.get(`/api/projects/user/${username}`),
     getById: (id) => api.get(`/api/projects/${id}`),
     update: (id, data) => api.put(`/api/projects/${id}`, data),
     delete: (id) => api.delete(`/api/projects/${id}`),
+    getRelated: (id, params) => api.get(`/api/projects/${id}/related`, { params }),
+    getFacets: (params) => api.get('/api/facets/projects', {
+        params,
+        paramsSerializer: { indexes: null },
+    }),
 };
 
 // Blog APIs
 export const blogAPI = {
     create: (data) => api.post('/api/blogs', data),
-    getAll: (params) => api.get('/api/blogs', { params }),
+    getAll: (params) => api.get('/api/blogs', {
+        params,
+        paramsSerializer: { indexes: null },
+    }),
     getMy: () => api.get('/api/blogs/my'),
     getBySlug: (slug) => api.get(`/api/blogs/${slug}`),
     update: (id, data) => api.put(`/api/blogs/${id}`, data),
+    patchContent: (id, data) => api.patch(`/api/blogs/${id}/content`, data),
+    getRevisions: (id, params) => api.get(`/api/blogs/${id}/revisions`, { params }),
+    getRevision: (id, revision) => api.get(`/api/blogs/${id}/revisions/${revision}`),
     delete: (id) => api.delete(`/api/blogs/${id}`),
     publish: (id) => api.post(`/api/blogs/${id}/publish`),
     unpublish: (id) => api.post(`/api/blogs/${id}/unpublish`),
@@ -70,7 +90,20 @@ export const blogAPI = {
     getReactions: (id) => api.get(`/api/blogs/${id}/reactions`),
     react: (id, data) => api.post(`/api/blogs/${id}/reactions`, data),
     toggleBookmark: (id) => api.post(`/api/blogs/${id}/bookmark`),
-    getBookmarks: () => api.get('/api/bookmarks'),
+    getBookmarks: (params) => api.get('/api/bookmarks', { params }),
+    bookmarkStatus: (blogIds) => api.get('/api/bookmarks/status', {
+        params: { blog_ids: blogIds },
+        paramsSerializer: { indexes: null },
+    }),
+    getRelated: (id, params) => api.get(`/api/blogs/${id}/related`, { params }),
+    getFacets: (params) => api.get('/api/facets/blogs', {
+        params,
+        paramsSerializer: { indexes: null },
+    }),
+    getViewSeries: (params) => api.get('/api/analytics/blog-views', {
+        params,
+        paramsSerializer: { indexes: null },
+    }),
     uploadImage: (formData) => api.post('/api/blogs/upload-image', formData, {
         headers: {
             'Content-Type': 'multipart/form-data',
@@ -78,6 +111,13 @@ export const blogAPI = {
     }),
 };
 
+// Batch API: several calls in one round trip. `requests` is a list of
+// { id, method, path, body } with paths relative to /api; resolves to
+// { responses: [{ id, status, body }] } in the same order.
+export const batchAPI = {
+    run: (requests) => api.post('/api/batch', { requests }),
+};
+
 // Analytics APIs (separate microservice on port 4000)
 const ANALYTICS_BASE_URL = process.env.REACT_APP_ANALYTICS_URL || 'http://localhost:4000';
 
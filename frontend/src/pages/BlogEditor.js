@@ -10,6 +10,57 @@ import {
     Eye, EyeOff, Save, Send, ArrowLeft, Clock, Hash, X, Tag
 } from 'lucide-react';
 
+// Where newText differs from oldText: keep the common prefix and suffix,
+// replace `removed` code units at `start` with `inserted`. Indices are
+// UTF-16 code units; never cut a surrogate pair in half.
+function changedRegion(oldText, newText) {
+    const limit = Math.min(oldText.length, newText.length);
+    let prefix = 0;
+    while (prefix < limit && oldText[prefix] === newText[prefix]) prefix++;
+    if (prefix > 0 && /[\uD800-\uDBFF]/.test(oldText[prefix - 1])) prefix--;
+    let suffix = 0;
+    while (
+        suffix < limit - prefix &&
+        oldText[oldText.length - 1 - suffix] === newText[newText.length - 1 - suffix]
+    ) suffix++;
+    if (suffix > 0 && /[\uDC00-\uDFFF]/.test(oldText[oldText.length - suffix])) suffix--;
+    return {
+        start: prefix,
+        removed: oldText.length - prefix - suffix,
+        inserted: newText.slice(prefix, newText.length - suffix),
+    };
+}
+
+// Delta from oldText to newText for PATCH /blogs/{id}/content: keep the
+// common prefix, delete the changed middle, insert its replacement.
+function textDelta(oldText, newText) {
+    const { start, removed, inserted } = changedRegion(oldText, newText);
+    const delta = [];
+    if (start) delta.push(start);
+    if (removed) delta.push(-removed);
+    if (inserted) delta.push(inserted);
+    return delta;
+}
+
+// Replay the local edit (base -> mine) on top of a newer server body
+// (base -> theirs). Edits to separate parts of the text merge; overlapping
+// ones return null.
+function rebaseText(base, mine, theirs) {
+    if (mine === base || mine === theirs) return theirs;
+    if (theirs === base) return mine;
+    const ours = changedRegion(base, mine);
+    const other = changedRegion(base, theirs);
+    if (ours.start + ours.removed < other.start) {
+        return theirs.slice(0, ours.start) + ours.inserted + theirs.slice(ours.start + ours.removed);
+    }
+    if (other.start + other.removed < ours.start) {
+        const shift = other.inserted.length - other.removed;
+        return theirs.slice(0, ours.start + shift) + ours.inserted
+            + theirs.slice(ours.start + ours.removed + shift);
+    }
+    return null;
+}
+
 export default function BlogEditor() {
     const navigate = useNavigate();
     const { blogId } = useParams();
@@ -29,6 +80,24 @@ export default function BlogEditor() {
     const [publishing, setPublishing] = useState(false);
     const [lastSaved, setLastSaved] = useState(null);
     const [existingBlogId, setExistingBlogId] = useState(null);
+    // Set when the body was changed elsewhere in a way autosave can't merge
+    const [conflict, setConflict] = useState(false);
+    // What the server holds, so autosaves can send just the difference
+    const revisionRef = useRef(0);
+    const savedContentRef = useRef('');
+    const savedMetaRef = useRef('');
+
+    const rememberSaved = (blog) => {
+        revisionRef.current = blog.revision || 0;
+        savedContentRef.current = blog.content_markdown || '';
+        savedMetaRef.current = JSON.stringify({
+            title: blog.title,
+            subtitle: blog.subtitle || '',
+            cover_image_url: blog.cover_image_url || null,
+            tags: blog.tags || [],
+            category: blog.category || 'devlog',
+        });
+    };
 
     // Load existing blog if editing
     useEffect(() => {
@@ -50,6 +119,7 @@ export default function BlogEditor() {
                 setTags(blog.tags || []);
                 setCategory(blog.category || 'devlog');
                 setExistingBlogId(blog.blog_id);
+                rememberSaved(blog);
             }
         } catch {
             toast.error('Failed to load blog');
@@ -60,18 +130,59 @@ export default function BlogEditor() {
     const wordCount = content.trim() ? content.trim().split(/\s+/).length : 0;
     const readingTime = Math.max(1, Math.round(wordCount / 238));
 
-    // Auto-save every 30 seconds
+    // Save the body as a delta. If the server has moved on (another tab or
+    // device), fetch its text and rebase the local edit onto it; when the
+    // edits overlap, stop autosaving and let the author decide.
+    const saveContent = async (text) => {
+        let base = savedContentRef.current;
+        let revision = revisionRef.current;
+        let target = text;
+        for (let attempt = 0; attempt < 3; attempt++) {
+            try {
+                const res = await blogAPI.patchContent(existingBlogId, {
+                    base_revision: revision,
+                    delta: textDelta(base, target),
+                });
+                revisionRef.current = res.data.revision;
+                savedContentRef.current = target;
+                if (target !== text) {
+                    // Typing may have continued while this was in flight
+                    setContent(current => current === text ? target : (rebaseText(text, current, target) ?? target));
+                }
+                return true;
+            } catch (err) {
+                if (![409, 422].includes(err.response?.status)) throw err;
+            }
+            const latest = (await blogAPI.getRevisions(existingBlogId, { limit: 1 })).data[0];
+            const theirs = latest && (await blogAPI.getRevision(existingBlogId, latest.revision)).data.content_markdown;
+            const merged = latest ? rebaseText(base, target, theirs) : null;
+            if (merged === null) break;
+            base = theirs;
+            revision = latest.revision;
+            target = merged;
+        }
+        setConflict(true);
+        toast.error('This post was changed elsewhere. Autosave is paused: reload to get the latest version, or Save Draft to overwrite it.');
+        return false;
+    };
+
+    // Auto-save every 30 seconds: metadata as a partial update (never the
+    // body, which a full save would overwrite), the body as a delta
     const autoSave = useCallback(async () => {
-        if (!title.trim() || !existingBlogId) return;
+        if (!title.trim() || !existingBlogId || conflict) return;
+        const meta = { title, subtitle, cover_image_url: coverImageUrl || null, tags, category };
+        const metaChanged = JSON.stringify(meta) !== savedMetaRef.current;
+        const contentChanged = content !== savedContentRef.current;
+        if (!metaChanged && !contentChanged) return;
         try {
-            await blogAPI.update(existingBlogId, {
-                title, subtitle, content_markdown: content,
-                cover_image_url: coverImageUrl || null,
-                tags, category,
-            });
+            if (metaChanged) {
+                await blogAPI.update(existingBlogId, meta);
+                savedMetaRef.current = JSON.stringify(meta);
+            }
+            if (contentChanged && !(await saveContent(content))) return;
             setLastSaved(new Date());
         } catch { }
-    }, [title, subtitle, content, coverImageUrl, tags, category, existingBlogId]);
+    }, [title, subtitle, content, coverImageUrl, tags, category, existingBlogId, conflict]);
 
     useEffect(() => {
         const interval = setInterval(autoSave, 30000);
@@ -100,11 +211,13 @@ export default function BlogEditor() {
         setSaving(true);
         try {
             if (existingBlogId) {
-                await blogAPI.update(existingBlogId, {
+                const res = await blogAPI.update(existingBlogId, {
                     title, subtitle, content_markdown: content,
                     cover_image_url: coverImageUrl || null,
                     tags, category,
                 });
+                rememberSaved(res.data);
+                setConflict(false);
             } else {
                 const res = await blogAPI.create({
                     title, subtitle, content_markdown: content,
@@ -112,6 +225,7 @@ export default function BlogEditor() {
                     tags, category, status: 'draft',
                 });
                 setExistingBlogId(res.data.blog_id);
+                rememberSaved(res.data);
             }
             setLastSaved(new Date());
             toast.success('Draft saved!');
@@ -22,6 +22,7 @@ export default function BlogPost() {
     const [blog, setBlog] = useState(null);
     const [loading, setLoading] = useState(true);
     const [bookmarked, setBookmarked] = useState(false);
+    const [related, setRelated] = useState([]);
 
     useEffect(() => {
         fetchBlog();
@@ -31,6 +32,14 @@ export default function BlogPost() {
         try {
             const res = await blogAPI.getBySlug(slug);
             setBlog(res.data);
+            blogAPI.getRelated(res.data.blog_id, { limit: 4 })
+                .then(r => setRelated(r.data || []))
+                .catch(() => setRelated([]));
+            if (isAuthenticated) {
+                blogAPI.bookmarkStatus([res.data.blog_id])
+                    .then(status => setBookmarked(Boolean(status.data?.[res.data.blog_id])))
+                    .catch(() => {});
+            }
         } catch {
             toast.error('Blog not found');
         } finally {
@@ -202,7 +211,7 @@ export default function BlogPost() {
 
                 {/* Content */}
                 <article className="mb-12">
-                    <MarkdownPreview content={blog.content_markdown} />
+                    <MarkdownPreview content={blog.content_markdown} html={blog.content_html} />
                 </article>
 
                 {/* Engagement Bar */}
@@ -223,6 +232,31 @@ export default function BlogPost() {
                     </div>
                 </div>
 
+                {/* Related */}
+                {related.length > 0 && (
+                    <section className="mb-8">
+                        <h2 className="text-sm font-semibold text-foreground mb-3">Related</h2>
+                        <ul className="grid grid-cols-1 sm:grid-cols-2 gap-3">
+                            {related.map(item => (
+                                <li key={`${item.kind}:${item.id}`}>
+                                    <Link
+                                        to={item.kind === 'blog' ? `/blog/${item.slug}` : `/profile/${item.author_username}`}
+                                        className="block p-3 rounded-lg border border-border hover:bg-muted transition-colors"
+                                    >
+                                        <span className="text-xs text-muted-foreground uppercase tracking-wide">
+                                            {item.kind}
+                                        </span>
+                                        <p className="text-sm font-medium text-foreground line-clamp-2">{item.title}</p>
+                                        {item.author_username && (
+                                            <span className="text-xs text-muted-foreground">@{item.author_username}</span>
+                                        )}
+                                    </Link>
+                                </li>
+                            ))}
+                        </ul>
+                    </section>
+                )}
+
                 {/* Comments */}
                 <CommentSection blogId={blog.blog_id} />
             </main>
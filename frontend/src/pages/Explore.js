@@ -11,7 +11,7 @@ import {
     ExternalLink, Github, Users, Code2, Briefcase, PenSquare
 } from 'lucide-react';
 
-// Tech stack options for filtering
+// Tech stack options for filtering, until facet counts have loaded
 const TECH_STACKS = [
     'React', 'Vue', 'Angular', 'Next.js', 'Node.js',
     'Python', 'Django', 'FastAPI', 'Go', 'Rust',
@@ -41,12 +41,21 @@ export default function Explore() {
     const [blogs, setBlogs] = useState([]);
     const [loading, setLoading] = useState(true);
     const [activeCategory, setActiveCategory] = useState('all');
+    const [techFacets, setTechFacets] = useState([]);
+
+    useEffect(() => {
+        projectAPI.getFacets({ fields: ['tech_stack'], limit: 30 })
+            .then(res => setTechFacets(res.data?.facets?.tech_stack || []))
+            .catch(() => { /* fall back to the static list */ });
+    }, []);
 
     const fetchData = useCallback(async () => {
         setLoading(true);
         try {
             if (activeTab === 'projects') {
-                const response = await projectAPI.getAll();
+                const params = {};
+                if (selectedTech.length > 0) params.tech_stack = selectedTech;
+                const response = await projectAPI.getAll(params);
                 setProjects(response.data || []);
             } else if (activeTab === 'blogs') {
                 const params = {};
@@ -64,7 +73,7 @@ export default function Explore() {
         } finally {
             setLoading(false);
         }
-    }, [activeTab, activeCategory, searchQuery]);
+    }, [activeTab, activeCategory, searchQuery, selectedTech]);
 
     useEffect(() => {
         fetchData();
@@ -256,7 +265,10 @@ export default function Explore() {
                     <div className="mb-6 p-4 rounded-lg border border-border bg-card">
                         <h3 className="text-sm font-medium text-foreground mb-3">Tech Stack</h3>
                         <div className="flex flex-wrap gap-2">
-                            {TECH_STACKS.map(tech => (
+                            {(techFacets.length > 0
+                                ? techFacets
+                                : TECH_STACKS.map(value => ({ value }))
+                            ).map(({ value: tech, count }) => (
                                 <button
                                     key={tech}
                                     onClick={() => toggleTech(tech)}
@@ -268,6 +280,9 @@ export default function Explore() {
                                     `}
                                 >
                                     {tech}
+                                    {count !== undefined && (
+                                        <span className="ml-1 opacity-60">{count}</span>
+                                    )}
                                 </button>
                             ))}
                         </div>
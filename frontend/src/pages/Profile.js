@@ -3,7 +3,7 @@ import { useParams, Link } from 'react-router-dom';
 import { Header } from '../components/layout/Header';
 import { Footer } from '../components/layout/Footer';
 import { useAuth } from '../context/AuthContext';
-import { projectAPI, blogAPI, userAPI, analyticsAPI } from '../lib/api';
+import { blogAPI, userAPI, analyticsAPI, batchAPI } from '../lib/api';
 import { toast } from 'sonner';
 import {
     ProfileHeader,
@@ -30,7 +30,15 @@ export default function Profile() {
     const [isFollowing, setIsFollowing] = useState(false);
     const [followers, setFollowers] = useState([]);
     const [following, setFollowing] = useState([]);
+    const [followersCursor, setFollowersCursor] = useState(null);
+    const [followingCursor, setFollowingCursor] = useState(null);
+    const [loadingMoreUsers, setLoadingMoreUsers] = useState(false);
+    const [followedByMe, setFollowedByMe] = useState({}); // username -> bool, for the listed users
+    const [followerCount, setFollowerCount] = useState(0);
+    const [followingCount, setFollowingCount] = useState(0);
     const [profileVisits, setProfileVisits] = useState(0);
+    const [blogViewTrend, setBlogViewTrend] = useState(null);
+    const [ownStats, setOwnStats] = useState(null);
     const [showShareCard, setShowShareCard] = useState(false);
     const [showUserList, setShowUserList] = useState(null); // 'followers' | 'following' | null
 
@@ -40,30 +48,57 @@ export default function Profile() {
     const fetchProfileData = useCallback(async () => {
         setLoading(true);
         try {
-            // Fetch user profile from real API
+            // Profile, projects and follow data in one round trip
+            const name = encodeURIComponent(username);
+            const requests = [
+                { id: 'projects', path: `/projects/user/${name}` },
+                { id: 'followers', path: `/users/${name}/followers` },
+                { id: 'following', path: `/users/${name}/following` },
+            ];
             if (isOwnProfile) {
-                setProfileUser(currentUser);
+                requests.push({ id: 'stats', path: '/me/stats' });
             } else {
-                try {
-                    const userRes = await userAPI.getByUsername(username);
-                    setProfileUser(userRes.data);
-                } catch {
-                    setProfileUser({
-                        username: username,
-                        full_name: username.charAt(0).toUpperCase() + username.slice(1),
-                        bio: '',
-                        skills: [],
-                        created_at: new Date().toISOString()
-                    });
+                requests.push({ id: 'user', path: `/users/${name}` });
+                if (isAuthenticated) {
+                    requests.push({ id: 'isFollowing', path: `/follows/status?usernames=${name}` });
                 }
             }
+            let results = {};
+            try {
+                const batchRes = await batchAPI.run(requests);
+                results = Object.fromEntries(
+                    (batchRes.data?.responses || [])
+                        .filter(r => r.status === 200)
+                        .map(r => [r.id, r.body])
+                );
+            } catch {
+                // Fall through with empty results
+            }
 
-            // Fetch user's projects
-            const projectsRes = await projectAPI.getAll();
-            const userProjects = (projectsRes.data || []).filter(
-                p => p.user_username === username
-            );
-            setProjects(userProjects);
+            if (isOwnProfile) {
+                setProfileUser(currentUser);
+            } else if (results.user) {
+                setProfileUser(results.user);
+            } else {
+                setProfileUser({
+                    username: username,
+                    full_name: username.charAt(0).toUpperCase() + username.slice(1),
+                    bio: '',
+                    skills: [],
+                    created_at: new Date().toISOString()
+                });
+            }
+
+            setProjects(results.projects || []);
+            setOwnStats(results.stats || null);
+
+            setFollowers(results.followers?.users || []);
+            setFollowing(results.following?.users || []);
+            setFollowersCursor(results.followers?.next_cursor || null);
+            setFollowingCursor(results.following?.next_cursor || null);
+            setFollowerCount(results.followers?.total || 0);
+            setFollowingCount(results.following?.total || 0);
+            setIsFollowing(results.isFollowing?.[username] || false);
 
             // Fetch blog data
             try {
@@ -81,6 +116,24 @@ export default function Profile() {
                 // Blog fetch is non-critical
             }
 
+            // Daily blog views for the last two weeks (own profile only)
+            if (isOwnProfile) {
+                try {
+                    const days = 14;
+                    const start = new Date(Date.now() - (days - 1) * 86400000);
+                    const res = await blogAPI.getViewSeries({ granularity: 'day', start: start.toISOString().slice(0, 10) });
+                    const byDay = Object.fromEntries((res.data?.totals || []).map(p => [p.bucket, p.views]));
+                    const trend = [];
+                    for (let i = 0; i < days; i++) {
+                        const day = new Date(start.getTime() + i * 86400000).toISOString().slice(0, 10);
+                        trend.push(byDay[day] || 0);
+                    }
+                    setBlogViewTrend(trend);
+                } catch {
+                    // Non-critical
+                }
+            }
+
             // Track this profile visit & get analytics
             try {
                 await analyticsAPI.track(`/profile/${username}`);
@@ -89,28 +142,6 @@ export default function Profile() {
             } catch {
                 // Analytics is non-critical
             }
-
-            // Fetch followers & following
-            try {
-                const [followersRes, followingRes] = await Promise.all([
-                    userAPI.getFollowers(username),
-                    userAPI.getFollowing(username),
-                ]);
-                setFollowers(followersRes.data || []);
-                setFollowing(followingRes.data || []);
-            } catch {
-                // Non-critical
-            }
-
-            // Check if current user follows this profile
-            if (isAuthenticated && !isOwnProfile) {
-                try {
-                    const res = await userAPI.isFollowing(username);
-                    setIsFollowing(res.data?.is_following || false);
-                } catch {
-                    // Non-critical
-                }
-            }
         } catch (error) {
             console.error('Failed to fetch profile:', error);
         } finally {
@@ -122,17 +153,62 @@ export default function Profile() {
         fetchProfileData();
     }, [fetchProfileData]);
 
+    // Which of the listed users the viewer follows, one request per page of users
+    const loadFollowStatus = useCallback(async (users) => {
+        if (!isAuthenticated) return;
+        const names = users.map(u => u.username).filter(n => n && !(n in followedByMe));
+        if (names.length === 0) return;
+        try {
+            const res = await userAPI.followStatus(names);
+            setFollowedByMe(prev => ({ ...prev, ...res.data }));
+        } catch {
+            // Badges are non-critical
+        }
+    }, [isAuthenticated, followedByMe]);
+
+    useEffect(() => {
+        if (showUserList) {
+            loadFollowStatus(showUserList === 'followers' ? followers : following);
+        }
+    }, [showUserList, followers, following, loadFollowStatus]);
+
+    const loadMoreUsers = async () => {
+        const isFollowers = showUserList === 'followers';
+        const cursor = isFollowers ? followersCursor : followingCursor;
+        if (!cursor || loadingMoreUsers) return;
+        setLoadingMoreUsers(true);
+        try {
+            const res = isFollowers
+                ? await userAPI.getFollowers(username, { cursor })
+                : await userAPI.getFollowing(username, { cursor });
+            const page = res.data?.users || [];
+            if (isFollowers) {
+                setFollowers(prev => [...prev, ...page]);
+                setFollowersCursor(res.data?.next_cursor || null);
+            } else {
+                setFollowing(prev => [...prev, ...page]);
+                setFollowingCursor(res.data?.next_cursor || null);
+            }
+        } catch {
+            toast.error('Failed to load more users');
+        } finally {
+            setLoadingMoreUsers(false);
+        }
+    };
+
     const handleFollow = async () => {
         try {
             if (isFollowing) {
                 await userAPI.unfollow(username);
                 setIsFollowing(false);
-                setFollowers(prev => prev.filter(f => f.email !== currentUser?.email));
+                setFollowers(prev => prev.filter(f => f.username !== currentUser?.username));
+                setFollowerCount(prev => Math.max(0, prev - 1));
                 toast.success(`Unfollowed @${username}`);
             } else {
                 await userAPI.follow(username);
                 setIsFollowing(true);
-                setFollowers(prev => [...prev, currentUser]);
+                setFollowers(prev => [currentUser, ...prev]);
+                setFollowerCount(prev => prev + 1);
                 toast.success(`Following @${username}`);
             }
         } catch (error) {
@@ -141,15 +217,26 @@ export default function Profile() {
     };
 
     // Real stats — computed from actual data
-    const stats = {
+    // Own profile: totals come precomputed from /me/stats
+    const stats = ownStats ? {
+        projects: ownStats.projects,
+        blogPosts: ownStats.blogs,
+        blogViews: ownStats.blog_views,
+        blogReactions: ownStats.blog_reactions,
+        views: 0,
+        stars: 0,
+        followers: ownStats.followers,
+        following: ownStats.following,
+        profileVisits: profileVisits,
+    } : {
         projects: projects.length,
         blogPosts: blogs.length,
         blogViews: blogs.reduce((sum, b) => sum + (b.view_count || 0), 0),
         blogReactions: blogs.reduce((sum, b) => sum + (b.reaction_count || 0), 0),
         views: 0,
         stars: 0,
-        followers: followers.length,
-        following: following.length,
+        followers: followerCount,
+        following: followingCount,
         profileVisits: profileVisits,
     };
 
@@ -242,6 +329,7 @@ export default function Profile() {
                     isOwnProfile={isOwnProfile}
                     followerList={followers}
                     followingList={following}
+                    trends={blogViewTrend ? { blogViews: blogViewTrend } : {}}
                 />
 
                 {/* Two Column Layout for Skills + Activity */}
@@ -416,6 +504,9 @@ export default function Profile() {
                                             </p>
                                             <p className="text-xs text-muted-foreground truncate">@{u.username}</p>
                                         </div>
+                                        {followedByMe[u.username] && u.username !== currentUser?.username && (
+                                            <span className="text-xs text-muted-foreground">Following</span>
+                                        )}
                                     </a>
                                 ))
                             ) : (
@@ -424,6 +515,15 @@ export default function Profile() {
                                     <p className="text-sm">No {showUserList} yet</p>
                                 </div>
                             )}
+                            {(showUserList === 'followers' ? followersCursor : followingCursor) && (
+                                <button
+                                    onClick={loadMoreUsers}
+                                    disabled={loadingMoreUsers}
+                                    className="w-full py-2 text-sm text-accent hover:underline disabled:opacity-50"
+                                >
+                                    {loadingMoreUsers ? 'Loading...' : 'Load more'}
+                                </button>
+                            )}
                         </div>
                     </div>
                 </div>
@@ -38,6 +38,8 @@ export default function Settings() {
     // Bookmarks State
     const [bookmarkedBlogs, setBookmarkedBlogs] = useState([]);
     const [bookmarksLoading, setBookmarksLoading] = useState(false);
+    const [bookmarksCursor, setBookmarksCursor] = useState(null);
+    const [bookmarksLoadingMore, setBookmarksLoadingMore] = useState(false);
 
     // Profile State
     const [profileData, setProfileData] = useState({
@@ -148,7 +150,8 @@ export default function Settings() {
         setBookmarksLoading(true);
         try {
             const res = await blogAPI.getBookmarks();
-            setBookmarkedBlogs(res.data || []);
+            setBookmarkedBlogs((res.data?.items || []).filter(item => item.blog).map(item => item.blog));
+            setBookmarksCursor(res.data?.next_cursor || null);
         } catch (error) {
             console.error('Failed to fetch bookmarks:', error);
             toast.error('Failed to load bookmarks');
@@ -157,6 +160,21 @@ export default function Settings() {
         }
     };
 
+    const loadMoreBookmarks = async () => {
+        if (!bookmarksCursor || bookmarksLoadingMore) return;
+        setBookmarksLoadingMore(true);
+        try {
+            const res = await blogAPI.getBookmarks({ cursor: bookmarksCursor });
+            const page = (res.data?.items || []).filter(item => item.blog).map(item => item.blog);
+            setBookmarkedBlogs(prev => [...prev, ...page]);
+            setBookmarksCursor(res.data?.next_cursor || null);
+        } catch (error) {
+            toast.error('Failed to load more bookmarks');
+        } finally {
+            setBookmarksLoadingMore(false);
+        }
+    };
+
     const handleRemoveBookmark = async (blogId) => {
         try {
             await blogAPI.toggleBookmark(blogId);
@@ -604,6 +622,15 @@ export default function Settings() {
                                                 </button>
                                             </div>
                                         ))}
+                                        {bookmarksCursor && (
+                                            <button
+                                                onClick={loadMoreBookmarks}
+                                                disabled={bookmarksLoadingMore}
+                                                className="w-full py-2 text-sm text-accent hover:underline font-medium disabled:opacity-50"
+                                            >
+                                                {bookmarksLoadingMore ? 'Loading...' : 'Load more'}
+                                            </button>
+                                        )}
                                     </div>
                                 ) : (
                                     <div className="text-center py-12">